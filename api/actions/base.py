@@ -4,6 +4,10 @@ from dataclasses import dataclass
 from django.db.models import Model, QuerySet
 from api.permissions import require_model_permission
 
+class ActionCancelled(Exception):
+    """Levantada por report_progress quando o job teve o cancelamento pedido."""
+
+
 @dataclass
 class ActionResult:
     ok: bool
@@ -21,11 +25,18 @@ class BaseAction:
       - models: Tuple[str, ...] | None  (None => global, vale para todas)
     E implemente:
       - run(self, request, helper, model_cls, base_qs, items) -> ActionResult
+    Actions que operam sobre um conjunto (sem listar IDs) marcam accepts_filter = True
+    e implementam run_filtered: o qs já chega filtrado pelo pipeline da ListView.
+    Com run_async = True a action vira um ActionJob (resposta 202) e roda no
+    `run_action_jobs`; em loops longos, chame report_progress a cada bloco.
     """
     name: str = ""
     http_methods: Tuple[str, ...] = ("POST",)
     required_method: str = "POST"
     models: Optional[Tuple[str, ...]] = None 
+    accepts_filter: bool = False
+    run_async: bool = False
+    read_only: bool = False  # não escreve: a ActionView não invalida o cache do model
 
     def check_perm(
         self,
@@ -45,6 +56,15 @@ class BaseAction:
             allow_all=allow_all,
         )
 
+    def report_progress(self, request, done: int, total: Optional[int] = None) -> None:
+        """
+        Em job, grava o progresso e levanta ActionCancelled se o cancelamento foi pedido.
+        Fora de job (request síncrona) não faz nada.
+        """
+        job = getattr(request, "action_job", None)
+        if job is not None:
+            job.report(done, total)
+
     def run(
         self,
         request,
@@ -54,3 +74,13 @@ class BaseAction:
         items: list[Any],
     ) -> ActionResult:
         raise NotImplementedError("Implemente em subclasses.")
+
+    def run_filtered(
+        self,
+        request,
+        helper,
+        model_cls: type[Model],
+        qs: QuerySet,
+        spec: Dict[str, Any],
+    ) -> ActionResult:
+        raise NotImplementedError("Implemente em subclasses com accepts_filter = True.")
@@ -1,36 +1,170 @@
 from __future__ import annotations
-from typing import Any, List
-from django.db import transaction
+from typing import Any, List, Tuple
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from api.helpers.deletion import chunked_delete, estimate_delete
 from .base import BaseAction, ActionResult
 from .decorators import action_global
 
+# bloqueados devolvidos na resposta do modo filtro (o conjunto pode ser grande)
+MAX_REPORTED_PKS = 100
+
+
+def _delete_batch_size() -> int:
+    return int(getattr(settings, "API_BULK_DELETE_BATCH_SIZE", 200))
+
+
+def _normalize_ids(model_cls, items: List[Any]) -> Tuple[list, list]:
+    """IDs do payload convertidos para o tipo da pk; os que não convertem voltam em `invalid`."""
+    pk_field = model_cls._meta.pk
+    ids, invalid = [], []
+    for it in items:
+        if isinstance(it, dict):
+            it = it.get("id")
+        if it is None:
+            continue
+        try:
+            ids.append(pk_field.to_python(it))
+        except DjangoValidationError:
+            invalid.append(it)
+    return ids, invalid
+
+
 @action_global(name="bulk_delete", http_methods=("POST",), required_method="DELETE")
 class BulkDeleteAction(BaseAction):
     """
-    Recebe payload como array (obrigatório). Ex.: [1,2,3] ou ["uuid1","uuid2"]
+    Recebe payload como array de IDs. Ex.: [1,2,3] ou ["uuid1","uuid2"]
+    Ou um filtro ({"filter": {...}} / {"all": true}).
+    Apaga em blocos de API_BULK_DELETE_BATCH_SIZE, um bloco por transação, para
+    não carregar toda a cascata em memória nem segurar locks pela operação inteira.
+    Itens protegidos (PROTECT/RESTRICT) são pulados e devolvidos em `protected`.
+    """
+    accepts_filter = True
+
+    def _delete(self, request, model_cls, qs):
+        total = qs.count()
+        self.report_progress(request, 0, total)
+        return chunked_delete(
+            model_cls,
+            qs,
+            batch_size=_delete_batch_size(),
+            on_progress=lambda done: self.report_progress(request, done, total),
+        )
+
+    def _detail(self, model_cls, result) -> str:
+        detail = f"{model_cls.__name__}: {result.deleted} item(ns) deletado(s)."
+        if result.blocked_pks:
+            detail += f" {len(result.blocked_pks)} protegido(s) por outros registros."
+        return detail
+
+    def _cascade(self, model_cls, result) -> dict:
+        return {label: n for label, n in result.per_model.items() if label != model_cls._meta.label}
+
+    def run(self, request, helper, model_cls, base_qs, items: List[Any]) -> ActionResult:
+        ids, invalid = _normalize_ids(model_cls, items)
+        if not ids and not invalid:
+            return ActionResult(False, status.HTTP_400_BAD_REQUEST, detail="Envie uma lista de IDs no payload.")
+
+        result = self._delete(request, model_cls, base_qs.filter(pk__in=ids)) if ids else None
+        deleted = [str(pk) for pk in (result.deleted_pks if result else [])]
+        blocked = [str(pk) for pk in (result.blocked_pks if result else [])]
+        seen = set(deleted) | set(blocked)
+        not_found = [str(i) for i in ids if str(i) not in seen] + invalid
+
+        return ActionResult(
+            ok=True,
+            http_status=status.HTTP_200_OK,
+            detail=self._detail(model_cls, result) if result else f"{model_cls.__name__}: 0 item(ns) deletado(s).",
+            payload={
+                "deleted_ids": deleted,
+                "not_found": not_found,
+                "protected": blocked,
+                "cascade": self._cascade(model_cls, result) if result else {},
+            },
+        )
+
+    def run_filtered(self, request, helper, model_cls, qs, spec) -> ActionResult:
+        result = self._delete(request, model_cls, qs)
+        return ActionResult(
+            ok=True,
+            http_status=status.HTTP_200_OK,
+            detail=self._detail(model_cls, result),
+            payload={
+                "deleted": result.deleted,
+                "protected": [str(pk) for pk in result.blocked_pks[:MAX_REPORTED_PKS]],
+                "protected_total": len(result.blocked_pks),
+                "cascade": self._cascade(model_cls, result),
+                "chunks": result.chunks,
+                "filter": spec,
+            },
+        )
+
+
+@action_global(name="bulk_delete_estimate", http_methods=("POST",), required_method="DELETE")
+class BulkDeleteEstimateAction(BaseAction):
+    """
+    Mesmo payload do bulk_delete, sem apagar nada: quantos registros seriam apagados,
+    a cascata por relacionamento (CASCADE / SET_NULL / bloqueios por PROTECT),
+    linhas de histórico/auditoria geradas e em quantos blocos a exclusão rodaria.
     """
+    accepts_filter = True
+    read_only = True
+
+    def _estimate(self, model_cls, qs) -> ActionResult:
+        return ActionResult(
+            ok=True,
+            http_status=status.HTTP_200_OK,
+            detail=f"{model_cls.__name__}: estimativa de exclusão.",
+            payload={"estimate": estimate_delete(model_cls, qs, batch_size=_delete_batch_size())},
+        )
+
     def run(self, request, helper, model_cls, base_qs, items: List[Any]) -> ActionResult:
-        ids = []
-        for it in items:
-            if isinstance(it, dict):
-                it = it.get("id")
-            if it is not None:
-                ids.append(it)
+        ids, _ = _normalize_ids(model_cls, items)
         if not ids:
             return ActionResult(False, status.HTTP_400_BAD_REQUEST, detail="Envie uma lista de IDs no payload.")
+        return self._estimate(model_cls, base_qs.filter(pk__in=ids))
+
+    def run_filtered(self, request, helper, model_cls, qs, spec) -> ActionResult:
+        return self._estimate(model_cls, qs)
 
-        qs = base_qs.filter(id__in=ids).only("id")
-        found_ids = set(qs.values_list("id", flat=True))
-        not_found = [i for i in ids if i not in found_ids]
 
-        with transaction.atomic():
-            to_delete = list(found_ids)
-            qs.delete()
+@action_global(name="bulk_set", http_methods=("POST",), required_method="PUT")
+class BulkSetAction(BaseAction):
+    """
+    Aplica {"set": {campo: valor}} a uma lista de IDs ({"ids": [...], "set": {...}})
+    ou a um filtro ({"filter": {...}, "set": {...}} / {"all": true, "set": {...}}).
+    Um único UPDATE no tenant, updated_at junto e histórico gravado em lote
+    (ver api.helpers.bulk.BulkSetter).
+    """
+    accepts_filter = True
 
+    def _set(self, request, helper, model_cls, qs) -> ActionResult:
+        data = request.data if isinstance(request.data, dict) else {}
+        values = data.get("set")
+        try:
+            updated = helper.bulk_set(
+                model_cls.__name__,
+                qs,
+                values,
+                batch_size=int(getattr(settings, "API_BULK_BATCH_SIZE", 500)),
+                on_progress=lambda done, total: self.report_progress(request, done, total),
+            )
+        except ValidationError as exc:
+            return ActionResult(False, status.HTTP_400_BAD_REQUEST, detail="Dados inválidos.", payload={"errors": exc.detail})
         return ActionResult(
             ok=True,
             http_status=status.HTTP_200_OK,
-            detail=f"{model_cls.__name__}: {len(to_delete)} item(ns) deletado(s).",
-            payload={"deleted_ids": to_delete, "not_found": not_found},
+            detail=f"{model_cls.__name__}: {updated} item(ns) atualizado(s).",
+            payload={"updated": updated, "fields": sorted(values)},
         )
+
+    def run(self, request, helper, model_cls, base_qs, items: List[Any]) -> ActionResult:
+        ids, _ = _normalize_ids(model_cls, items)
+        if not ids:
+            return ActionResult(False, status.HTTP_400_BAD_REQUEST, detail="Envie uma lista de IDs no payload.")
+        return self._set(request, helper, model_cls, base_qs.filter(pk__in=ids))
+
+    def run_filtered(self, request, helper, model_cls, qs, spec) -> ActionResult:
+        return self._set(request, helper, model_cls, qs)
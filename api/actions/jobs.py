@@ -0,0 +1,337 @@
+"""
+Jobs de actions em segundo plano (ActionJob).
+
+Fluxo:
+- a ActionView valida permissão e payload e grava o job como "queued" (202);
+- o comando `run_action_jobs` reivindica jobs com UPDATE condicional
+  (status=queued -> running), o que dispensa SELECT ... FOR UPDATE e funciona
+  igual no SQLite e no Postgres com vários processos;
+- a action roda com uma request mínima (user/account do job);
+- report_progress grava o progresso e, no mesmo UPDATE, descobre se o
+  cancelamento foi pedido;
+- enquanto a action roda, uma thread (JobHeartbeat) renova heartbeat_at a cada
+  ACTION_JOB_HEARTBEAT_INTERVAL, reporte a action progresso ou não. Progresso
+  reportado de dentro de uma transação da action (ex.: bulk_set) é gravado por
+  essa thread, em conexão própria, para aparecer antes do commit; aí o
+  cancelamento levanta ActionCancelled no report seguinte (desfazendo a transação);
+- jobs "running" sem heartbeat há mais de ACTION_JOB_STALE_AFTER voltam para a
+  fila (ou falham, após ACTION_JOB_MAX_ATTEMPTS tentativas), exceto quando o
+  worker dono está nesta máquina e o processo dele ainda existe (ex.: heartbeat
+  barrado por um lock longo do SQLite).
+"""
+
+from __future__ import annotations
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+from typing import Optional, Tuple
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import OperationalError, connection
+from django.db.models import F, Q
+from django.http import QueryDict
+from django.utils import timezone
+from api.models import ActionJob
+from core.utils.account_cache import get_account_by_id, get_user_account
+from .base import ActionCancelled, BaseAction
+from .registry import get_action
+from .runner import ActionPayloadError, ActionTarget, execute_action, resolve_action_target
+
+logger = logging.getLogger(__name__)
+
+
+def _progress_interval() -> float:
+    return float(getattr(settings, "ACTION_JOB_PROGRESS_INTERVAL", 1))
+
+
+def _heartbeat_interval() -> float:
+    return float(getattr(settings, "ACTION_JOB_HEARTBEAT_INTERVAL", 30))
+
+
+def worker_name() -> str:
+    """host:pid do processo atual; é o que requeue_stale_jobs usa para saber se o dono ainda vive."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _worker_alive(worker: str) -> Optional[bool]:
+    """True/False para workers desta máquina; None quando não dá para saber (outro host, nome livre)."""
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobHeartbeat(threading.Thread):
+    """
+    Renova heartbeat_at do job enquanto ele roda e grava o progresso enviado por
+    push(), numa conexão própria (fora de qualquer transação da action).
+    `cancelled` fica True quando o cancelamento foi pedido ou o job deixou de ser deste worker.
+    """
+
+    def __init__(self, job: ActionJob):
+        super().__init__(name=f"heartbeat-{job.pk}", daemon=True)
+        self.job = job
+        self.cancelled = False
+        self._progress: Optional[Tuple[int, Optional[int]]] = None
+        self._wake = threading.Event()
+        self._done = threading.Event()
+
+    def push(self, done: int, total: Optional[int]) -> None:
+        self._progress = (done, total)
+        self._wake.set()
+
+    def run(self) -> None:
+        try:
+            while True:
+                self._wake.wait(_heartbeat_interval())
+                self._wake.clear()
+                if self._done.is_set():
+                    return
+                self._beat()
+        finally:
+            connection.close()  # conexão própria desta thread
+
+    def _beat(self) -> None:
+        fields = {"heartbeat_at": timezone.now()}
+        progress, self._progress = self._progress, None
+        if progress is not None:
+            fields["progress_done"], fields["progress_total"] = progress
+        try:
+            alive = ActionJob.objects.filter(
+                pk=self.job.pk, status=ActionJob.STATUS_RUNNING, worker=self.job.worker, cancel_requested=False
+            ).update(**fields)
+        except OperationalError:
+            # banco ocupado pela própria action (SQLite); tenta no próximo ciclo
+            return
+        if not alive:
+            self.cancelled = True
+
+    def stop(self) -> None:
+        self._done.set()
+        self._wake.set()
+        self.join()
+
+
+class JobContext:
+    """Progresso/cancelamento do job em execução (exposto como request.action_job)."""
+
+    def __init__(self, job: ActionJob, heartbeat: Optional[JobHeartbeat] = None):
+        self.job = job
+        self.heartbeat = heartbeat
+        self.done = 0
+        self.total: Optional[int] = None
+        self._last_write = 0.0
+
+    def report(self, done: int, total: Optional[int] = None) -> None:
+        self.done = done
+        if total is not None:
+            self.total = total
+        now = time.monotonic()
+        if now - self._last_write < _progress_interval():
+            return
+        self._last_write = now
+        if self.heartbeat is not None and connection.in_atomic_block:
+            # a conexão da action está numa transação: o UPDATE só apareceria no commit
+            self.heartbeat.push(self.done, self.total)
+            if self.heartbeat.cancelled:
+                raise ActionCancelled()
+            return
+        updated = ActionJob.objects.filter(pk=self.job.pk, cancel_requested=False).update(
+            progress_done=self.done, progress_total=self.total, heartbeat_at=timezone.now()
+        )
+        if not updated:
+            raise ActionCancelled()
+
+
+class JobRequest:
+    """Request mínima para rodar a action fora do ciclo HTTP."""
+
+    method = "POST"
+
+    def __init__(self, job: ActionJob, user, account, heartbeat: Optional[JobHeartbeat] = None):
+        self.user = user or AnonymousUser()
+        self.account = account
+        self.data = job.payload
+        self.query_params = QueryDict()
+        self.GET = self.query_params
+        self.META = {}
+        self.action_job = JobContext(job, heartbeat)
+
+
+def enqueue_action_job(request, model_cls, action: BaseAction, target: ActionTarget) -> ActionJob:
+    account = getattr(request, "account", None)
+    user = getattr(request, "user", None)
+    return ActionJob.objects.create(
+        account_id=getattr(account, "id", None),
+        user=user if getattr(user, "is_authenticated", False) else None,
+        model_name=model_cls.__name__,
+        action_name=action.name,
+        payload=target.payload,
+    )
+
+
+def claim_next_job(worker: str, *, scan: int = 10) -> Optional[ActionJob]:
+    """Reivindica o job mais antigo da fila; outro worker que chegue junto perde o UPDATE e tenta o próximo."""
+    candidates = list(
+        ActionJob.objects.filter(status=ActionJob.STATUS_QUEUED)
+        .order_by("created_at")
+        .values_list("pk", flat=True)[:scan]
+    )
+    for pk in candidates:
+        now = timezone.now()
+        claimed = ActionJob.objects.filter(pk=pk, status=ActionJob.STATUS_QUEUED).update(
+            status=ActionJob.STATUS_RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return ActionJob.objects.get(pk=pk)
+    return None
+
+
+def requeue_stale_jobs(current_worker: Optional[str] = None) -> int:
+    """
+    Devolve à fila jobs cujo worker morreu; os que esgotaram as tentativas falham.
+    Heartbeat velho só basta quando não dá para checar o processo dono (outro host).
+    `current_worker`: o worker que chama, entre um job e outro; jobs ainda em nome
+    dele ficaram órfãos (ex.: o desfecho não pôde ser gravado) e voltam já.
+    """
+    stale_after = int(getattr(settings, "ACTION_JOB_STALE_AFTER", 300))
+    max_attempts = int(getattr(settings, "ACTION_JOB_MAX_ATTEMPTS", 3))
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    orphaned = Q(heartbeat_at__lt=cutoff)
+    if current_worker:
+        orphaned |= Q(worker=current_worker)
+    candidates = ActionJob.objects.filter(orphaned, status=ActionJob.STATUS_RUNNING)
+
+    recovered = 0
+    for pk, worker, attempts in candidates.values_list("pk", "worker", "attempts"):
+        own = worker == current_worker
+        if not own and _worker_alive(worker):
+            continue
+        # só se nada mudou desde a leitura (heartbeat renovado ou job finalizado nesse meio tempo)
+        current = ActionJob.objects.filter(pk=pk, status=ActionJob.STATUS_RUNNING, worker=worker)
+        if not own:
+            current = current.filter(heartbeat_at__lt=cutoff)
+        if attempts >= max_attempts:
+            recovered += current.update(
+                status=ActionJob.STATUS_FAILED, error="Worker interrompido.", finished_at=timezone.now()
+            )
+        else:
+            recovered += current.update(status=ActionJob.STATUS_QUEUED, worker="")
+    return recovered
+
+
+def _finish(job: ActionJob, ctx: Optional[JobContext], status: str, **fields) -> None:
+    if status == ActionJob.STATUS_SUCCEEDED:
+        fields.setdefault("error", "")
+    if ctx is not None:
+        fields.setdefault("progress_done", ctx.done)
+        if ctx.total is not None:
+            fields.setdefault("progress_total", ctx.total)
+    # só quem detém o job escreve o desfecho (ele pode ter sido devolvido à fila e pego por outro)
+    ActionJob.objects.filter(pk=job.pk, status=ActionJob.STATUS_RUNNING, worker=job.worker).update(
+        status=status, finished_at=timezone.now(), heartbeat_at=timezone.now(), **fields
+    )
+
+
+def _user_owns_account(user, account_id) -> bool:
+    """O job só roda no Account do próprio usuário (superusuário: em qualquer um)."""
+    if user is None or not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    account = get_user_account(user)
+    return account is not None and str(account.pk) == str(account_id)
+
+
+def run_job(job: ActionJob) -> None:
+    """Executa um job já reivindicado (status=running) e grava o desfecho."""
+    heartbeat = JobHeartbeat(job)
+    heartbeat.start()
+    try:
+        _run_job(job, heartbeat)
+    finally:
+        heartbeat.stop()
+
+
+def _run_job(job: ActionJob, heartbeat: JobHeartbeat) -> None:
+    ctx = None
+    try:
+        user = get_user_model().objects.filter(pk=job.user_id).first() if job.user_id else None
+        if not _user_owns_account(user, job.account_id):
+            _finish(job, None, ActionJob.STATUS_FAILED, error="Job fora do Account do usuário.")
+            return
+        account = get_account_by_id(job.account_id)
+        request = JobRequest(job, user, account, heartbeat)
+        ctx = request.action_job
+
+        from api.helpers import ModelHelper
+        from api.views.actions import ActionView
+
+        helper = ModelHelper(request)
+        model_cls = helper.resolve_model(job.model_name)
+        action = get_action(job.model_name, job.action_name) if model_cls else None
+        if action is None:
+            _finish(job, ctx, ActionJob.STATUS_FAILED, error="Modelo ou ação inexistente.")
+            return
+        # permissão pode ter mudado desde o enfileiramento
+        # mesma checagem da ActionView (o allow_all vem da view, nunca do job)
+        action.check_perm(
+            request, job.model_name, obj=None, allow_self=False, allow_all=ActionView.ALLOWED_PERMISSIONS
+        )
+
+        target = resolve_action_target(helper, request, model_cls, job.payload, action)
+        if target.qs is None:
+            _finish(job, ctx, ActionJob.STATUS_SUCCEEDED, result={"detail": "Sem tenant.", "processed": 0})
+            return
+        result = execute_action(action, request, helper, model_cls, target)
+    except ActionCancelled:
+        _finish(job, ctx, ActionJob.STATUS_CANCELLED)
+        return
+    except ActionPayloadError as exc:
+        _finish(job, ctx, ActionJob.STATUS_FAILED, error=exc.detail)
+        return
+    except OperationalError as exc:
+        # banco ocupado (ex.: "database is locked" no SQLite): volta para a fila enquanto houver tentativas
+        if job.attempts < int(getattr(settings, "ACTION_JOB_MAX_ATTEMPTS", 3)):
+            ActionJob.objects.filter(pk=job.pk, status=ActionJob.STATUS_RUNNING, worker=job.worker).update(
+                status=ActionJob.STATUS_QUEUED, worker="", error=str(exc)
+            )
+        else:
+            _finish(job, ctx, ActionJob.STATUS_FAILED, error=str(exc))
+        return
+    except Exception as exc:
+        logger.exception("Falha no job %s (%s.%s)", job.pk, job.model_name, job.action_name)
+        _finish(job, ctx, ActionJob.STATUS_FAILED, error=str(exc) or exc.__class__.__name__)
+        return
+
+    body = {"detail": result.detail, "http_status": result.http_status, **(result.payload or {})}
+    if result.ok:
+        _finish(job, ctx, ActionJob.STATUS_SUCCEEDED, result=body)
+    else:
+        _finish(job, ctx, ActionJob.STATUS_FAILED, result=body, error=result.detail or "Falha na action.")
+
+
+def cancel_job(job: ActionJob) -> ActionJob:
+    """Na fila: cancela na hora. Executando: marca o pedido; a action para num dos próximos report_progress."""
+    now = timezone.now()
+    cancelled = ActionJob.objects.filter(pk=job.pk, status=ActionJob.STATUS_QUEUED).update(
+        status=ActionJob.STATUS_CANCELLED, cancel_requested=True, finished_at=now
+    )
+    if not cancelled:
+        ActionJob.objects.filter(pk=job.pk, status=ActionJob.STATUS_RUNNING).update(cancel_requested=True)
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,106 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from django.db.models import QuerySet
+from rest_framework import status
+from api.helpers.cache_versions import bump_model_version
+from api.helpers.listing import build_list_query, params_from_spec
+from .base import ActionResult, BaseAction
+
+
+class ActionPayloadError(Exception):
+    """Corpo da action inválido (vira 400 na ActionView e falha no job)."""
+
+    def __init__(self, detail: str, http_status: int = status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.http_status = http_status
+
+
+@dataclass
+class ActionTarget:
+    """
+    Alvo de uma action: lista de itens (IDs) ou filtro da listagem. qs=None => sem tenant.
+    `options` são as demais chaves do corpo (ex.: {"set": {...}} do bulk_set).
+    """
+    qs: Optional[QuerySet]
+    items: Optional[List[Any]] = None
+    spec: Optional[Dict[str, Any]] = None
+    all_rows: bool = False
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        """Corpo normalizado, aceito de novo por resolve_action_target (é o que o job guarda)."""
+        if self.spec is not None:
+            return {**self.options, "filter": self.spec, "all": self.all_rows}
+        return {**self.options, "ids": self.items}
+
+
+TARGET_KEYS = ("ids", "filter", "all", "async")
+
+
+def _parse_payload(data, action: BaseAction):
+    spec = None
+    all_rows = isinstance(data, dict) and data.get("all") is True
+    options = {k: v for k, v in data.items() if k not in TARGET_KEYS} if isinstance(data, dict) else {}
+    if isinstance(data, dict) and "ids" in data:
+        data = data["ids"]
+    elif isinstance(data, dict) and ("filter" in data or "all" in data):
+        spec = data.get("filter") or {}
+        if not isinstance(spec, dict):
+            raise ActionPayloadError("Payload inválido: 'filter' deve ser um objeto.")
+        if not spec and not all_rows:
+            raise ActionPayloadError('Filtro vazio: envie {"all": true} para aplicar a todos os registros.')
+        if not action.accepts_filter:
+            raise ActionPayloadError("Esta action aceita apenas uma lista de IDs.")
+    if spec is None and not isinstance(data, list):
+        raise ActionPayloadError("Payload inválido: envie um array.")
+    return data, spec, all_rows, options
+
+
+def resolve_action_target(helper, request, model_cls, data, action: BaseAction) -> ActionTarget:
+    """
+    Interpreta o corpo da action e monta o queryset do tenant:
+      - IDs: [1,2,3], [{"id":1}, {"id":2}] ou {"ids": [1,2,3]}
+      - filtro: {"filter": {...}} pelo pipeline da listagem em modo estrito
+      - tudo do tenant: {"all": true}
+    """
+    items, spec, all_rows, options = _parse_payload(data, action)
+
+    if spec is not None:
+        lq = build_list_query(helper, request, model_cls, params_from_spec(spec), strict=True)
+        if lq.unknown_fields:
+            raise ActionPayloadError(f"Campos inválidos em 'fields': {', '.join(lq.unknown_fields)}")
+        if lq.invalid_filters:
+            raise ActionPayloadError(f"Filtros inválidos: {', '.join(lq.invalid_filters)}")
+        if lq.qs is None and not (helper.resolver.find_account_fk_field(model_cls) and not lq.account_id):
+            raise ActionPayloadError("Queryset indisponível para o modelo.")
+        if lq.qs is not None and not lq.narrowed and not all_rows:
+            raise ActionPayloadError('Filtro vazio: envie {"all": true} para aplicar a todos os registros.')
+        return ActionTarget(qs=lq.qs, spec=spec, all_rows=all_rows, options=options)
+
+    qs = helper.get_queryset(model_cls.__name__)
+    if qs is None:
+        raise ActionPayloadError("Queryset indisponível para o modelo.")
+
+    account = getattr(request, "account", None)
+    account_id = getattr(account, "id", None)
+    account_field = helper.resolver.find_account_fk_field(model_cls)
+    if account_field:
+        if not account_id:
+            return ActionTarget(qs=None, items=items, options=options)
+        qs = qs.filter(**{f"{account_field}_id": account_id})
+    return ActionTarget(qs=qs, items=items, options=options)
+
+
+def execute_action(action: BaseAction, request, helper, model_cls, target: ActionTarget) -> ActionResult:
+    """Roda a action sobre o alvo (mesmo caminho na request e no job)."""
+    try:
+        if target.spec is not None:
+            return action.run_filtered(request, helper, model_cls, target.qs, target.spec)
+        return action.run(request, helper, model_cls, target.qs, target.items)
+    finally:
+        # actions em lote podem escrever via qs.update()/delete() sem sinal por linha
+        if not action.read_only:
+            bump_model_version(model_cls)
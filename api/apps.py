@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from .signals import (
+            connect_cache_invalidation,
+            connect_search_index,
+            install_search_index_on_migrate,
+        )
+        connect_cache_invalidation()
+        connect_search_index()
+
+        from .helpers.drf_adapter import warm_serializer_cache
+        warm_serializer_cache()
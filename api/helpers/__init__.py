@@ -10,23 +10,44 @@ class ModelHelper:
     def resolve_model(self, model_name: str):
         return self.resolver.resolve_model(model_name)
 
-    def get_queryset(self, model_name: str):
-        return self.service.get_queryset(model_name)
+    def get_queryset(self, model_name: str, *, optimize: bool = False, fields=None):
+        return self.service.get_queryset(model_name, optimize=optimize, fields=fields)
 
-    def get_one(self, model_name: str, pk):
-        return self.service.get_one(model_name, pk)
+    def get_query_plan(self, model_cls, fields=None):
+        return self.service.get_query_plan(model_cls, fields)
+
+    def get_one(self, model_name: str, pk, *, optimize: bool = False, fields=None):
+        return self.service.get_one(model_name, pk, optimize=optimize, fields=fields)
 
     def create_one(self, model_name: str, payload: dict):
         return self.service.create_one(model_name, payload)
 
+    def bulk_create(self, model_name: str, items: list, *, batch_size: int = 500):
+        return self.service.bulk_create(model_name, items, batch_size=batch_size)
+
+    def bulk_update(self, model_name: str, items: list, *, batch_size: int = 500):
+        return self.service.bulk_update(model_name, items, batch_size=batch_size)
+
+    def bulk_set(self, model_name: str, queryset, values: dict, *, batch_size: int = 500, on_progress=None):
+        return self.service.bulk_set(model_name, queryset, values, batch_size=batch_size, on_progress=on_progress)
+
     def update_one(self, model_name: str, pk, payload: dict):
         return self.service.update_one(model_name, pk, payload)
 
     def delete_one(self, model_name: str, pk):
         return self.service.delete_one(model_name, pk)
 
-    def serialize_instance(self, model_name: str, instance):
-        return self.service.serialize_instance(model_name, instance)
+    def serialize_instance(self, model_name: str, instance, fields=None):
+        return self.service.serialize_instance(model_name, instance, fields=fields)
+
+    def serialize_many(self, model_name: str, instances, fields=None):
+        return self.service.serialize_many(model_name, instances, fields=fields)
 
     def get_serializer_fields(self, model_cls) -> list[str]:
         return self.service.get_serializer_fields(model_cls)
+
+    def get_readable_fields(self, model_cls) -> list[str]:
+        return self.service.get_readable_fields(model_cls)
+
+    def get_field_catalog(self, model_cls):
+        return self.service.get_field_catalog(model_cls)
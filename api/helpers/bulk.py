@@ -0,0 +1,522 @@
+"""
+Escrita em lote: POST /<model>/bulk_add e PATCH /<model>/bulk_update.
+
+Criação (BulkCreator):
+1. Valida todos os itens com um único serializer many=True (BulkListSerializer
+   guarda o resultado de cada item, válido ou não).
+2. Monta as instâncias sem salvar: hook `build_instance` do serializer, ou o
+   construtor genérico quando o serializer declara `BULK_CREATE = True`
+   (create() que só injeta o tenant). Depois aplica o que o save() do model
+   faria: códigos PREFIX-N em lote (CODE_PREFIX) e `prepare_save()`.
+3. Grava com bulk_create em lotes (bulk_create_with_history quando o model tem
+   histórico). Um lote que viola constraint é refeito item a item, cada um no
+   seu savepoint, para apontar só os itens com problema.
+4. Faz o que os signals fariam: documentos de busca e versão do model.
+
+Serializers com create() de efeitos colaterais (usuário, arquivos, grupos,
+endereço aninhado...) caem no caminho item a item com serializer.create(),
+ainda com uma única validação e uma única request. Quando o efeito colateral
+depende só de algumas chaves do item (ex.: vínculos do Customer lidos de
+initial_data), o serializer as lista em `BULK_SIDE_EFFECT_KEYS`: só os itens que
+trazem alguma delas vão pelo create()/update(); os demais seguem em lote.
+
+Atualização parcial (BulkUpdater): carrega todos os alvos numa consulta no
+tenant, valida cada item com o serializer em modo partial e, quando o
+serializer declara `BULK_UPDATE = True` (update() que só atribui campos), grava
+com bulk_update agrupando os itens pelo conjunto de colunas que mudou de fato.
+
+Mesmo valor em um conjunto (BulkSetter, action bulk_set): valida {campo: valor}
+com os campos graváveis do serializer (validação de campo e validate_<campo>;
+o validate() do objeto não roda, não há objeto), aplica tudo com um único
+UPDATE no queryset do tenant e depois grava o histórico em lote
+(bulk_history_create), lendo as linhas alteradas em blocos. Como qs.update()
+não passa pelo save(), o auditlog não registra essas alterações.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Model
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from simple_history.exceptions import NotHistoricalModelError
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history, get_history_manager_for_model
+from core.utils.generate_unique_code import reserve_codes
+from .cache_versions import bump_model_version, is_tracked_model
+from .errors import ErrorBuilder, UniqueErrorParser
+from .search import get_search_fields, index_new_instances, reindex_instances, search_index_enabled
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """many=True que guarda (validated_data, errors) de cada item em vez de só falhar."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.item_results: List[Tuple[Optional[dict], Any]] = []
+
+    def run_child_validation(self, data):
+        try:
+            validated = super().run_child_validation(data)
+        except ValidationError as exc:
+            self.item_results.append((None, exc.detail))
+            raise
+        self.item_results.append((validated, None))
+        return validated
+
+
+@dataclass
+class BulkResult:
+    saved: List[Tuple[int, Model]] = field(default_factory=list)  # (índice na lista enviada, instância)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def supports_bulk_insert(serializer_class) -> bool:
+    return hasattr(serializer_class, "build_instance") or getattr(serializer_class, "BULK_CREATE", False)
+
+
+def supports_bulk_update(serializer_class) -> bool:
+    return getattr(serializer_class, "BULK_UPDATE", False)
+
+
+def has_side_effects(serializer_class, data) -> bool:
+    """Item traz alguma chave que só o create()/update() do serializer sabe gravar."""
+    keys = getattr(serializer_class, "BULK_SIDE_EFFECT_KEYS", ())
+    return isinstance(data, dict) and any(key in data for key in keys)
+
+
+def _has_history(model_cls: Type[Model]) -> bool:
+    try:
+        get_history_manager_for_model(model_cls)
+    except NotHistoricalModelError:
+        return False
+    return True
+
+
+class BulkOperation:
+    """Base de BulkCreator/BulkUpdater: contexto da request, erros por item e gravação em savepoints."""
+
+    def __init__(self, model_cls: Type[Model], serializer_class, *, context: dict, tenant_fk: Optional[str], batch_size: int = 500):
+        self.model_cls = model_cls
+        self.serializer_class = serializer_class
+        self.context = context
+        self.tenant_fk = tenant_fk
+        self.batch_size = max(1, int(batch_size))
+        request = context.get("request")
+        self.account = getattr(request, "account", None) if request else None
+        user = getattr(request, "user", None) if request else None
+        self.user = user if getattr(user, "is_authenticated", False) else None
+        self.result = BulkResult()
+        self._errors = ErrorBuilder()
+        self._unique = UniqueErrorParser()
+
+    # ---- erros por item ----
+
+    def _add_error(self, index: int, detail) -> None:
+        payload = self._errors.build_payload_from_drf(detail)
+        payload.pop("ok", None)
+        self.result.errors.append({"index": index, **payload})
+
+    def _add_integrity_error(self, index: int, exc: IntegrityError) -> None:
+        message = str(exc)
+        if "unique" not in message.lower() and "duplicate" not in message.lower():
+            self._add_error(index, f"Não foi possível gravar o item: {message}")
+            return
+        column = self._conflicting_column(message) or self._unique.extract_field(exc, self.model_cls)
+        if column:
+            self._add_error(index, {column: ["Já existe um registro com este valor."]})
+        else:
+            self._add_error(index, "Violação de unicidade.")
+
+    def _conflicting_column(self, message: str) -> Optional[str]:
+        """Em constraint composta com o tenant ((Account, name)), aponta o campo que não é o tenant."""
+        tenant_columns = {self.tenant_fk, f"{self.tenant_fk}_id"} if self.tenant_fk else set()
+        for f in self.model_cls._meta.concrete_fields:
+            if f.column in tenant_columns or f.primary_key:
+                continue
+            if re.search(rf"[.(\s\"]{re.escape(f.column)}\b", message):
+                return f.name
+        return None
+
+    # ---- helpers de gravação ----
+
+    def _finish(self) -> BulkResult:
+        self.result.errors.sort(key=lambda err: err["index"])
+        self.result.saved.sort(key=lambda pair: pair[0])
+        return self.result
+
+    def _prepare(self, pending):
+        """Roda `prepare_save()` (o que o save() do model faria antes de gravar); erros viram erro do item."""
+        ready = []
+        for index, obj in pending:
+            prepare = getattr(obj, "prepare_save", None)
+            if prepare is not None:
+                try:
+                    prepare()
+                except DjangoValidationError as exc:
+                    self._add_error(index, getattr(exc, "message_dict", None) or exc.messages)
+                    continue
+            ready.append((index, obj))
+        return ready
+
+    def _write_batch(self, batch, write) -> None:
+        """Grava o lote num savepoint; se violar constraint, refaz item a item para isolar os culpados."""
+        try:
+            with transaction.atomic():
+                write([obj for _, obj in batch])
+            self.result.saved.extend(batch)
+            return
+        except IntegrityError:
+            pass
+
+        for index, obj in batch:
+            try:
+                with transaction.atomic():
+                    write([obj])
+            except IntegrityError as exc:
+                self._add_integrity_error(index, exc)
+            else:
+                self.result.saved.append((index, obj))
+
+    def _save_one_by_one(self, pending, save) -> None:
+        """Caminho sem bulk: `save(index)` por item, cada um no seu savepoint."""
+        for index in pending:
+            try:
+                with transaction.atomic():
+                    obj = save(index)
+            except ValidationError as exc:
+                self._add_error(index, exc.detail)
+            except IntegrityError as exc:
+                self._add_integrity_error(index, exc)
+            else:
+                self.result.saved.append((index, obj))
+
+
+class BulkCreator(BulkOperation):
+    def run(self, items: List[Any]) -> BulkResult:
+        if self.tenant_fk and self.account is None:
+            raise ValidationError({"non_field_errors": ["Tenant não identificado."]})
+
+        list_ser = BulkListSerializer(child=self.serializer_class(), data=items, context=self.context)
+        list_ser.is_valid()
+        valid = []
+        for index, (validated, detail) in enumerate(list_ser.item_results):
+            if detail is not None:
+                self._add_error(index, detail)
+            else:
+                valid.append((index, validated))
+
+        with transaction.atomic():
+            if supports_bulk_insert(self.serializer_class):
+                slow = {i for i, _ in valid if has_side_effects(self.serializer_class, items[i])}
+                self._bulk_path(list_ser.child, [(i, v) for i, v in valid if i not in slow])
+                if slow:
+                    self._one_by_one(list_ser.child, items, [(i, v) for i, v in valid if i in slow])
+            else:
+                self._one_by_one(list_ser.child, items, valid)
+        return self._finish()
+
+    def _one_by_one(self, child, items, valid) -> None:
+        validated_by_index = dict(valid)
+
+        def save(index):
+            child.initial_data = items[index]
+            return child.create(dict(validated_by_index[index]))
+
+        self._save_one_by_one(list(validated_by_index), save)
+
+    def _bulk_path(self, child, valid) -> None:
+        pending, m2m = [], {}
+        for index, validated in valid:
+            obj, relations = self._build(child, dict(validated))
+            pending.append((index, obj))
+            if relations:
+                m2m[index] = relations
+
+        self._assign_codes([obj for _, obj in pending])
+        pending = self._prepare(pending)
+
+        for start in range(0, len(pending), self.batch_size):
+            self._write_batch(pending[start:start + self.batch_size], self._insert)
+
+        created = self.result.saved
+        for index, obj in created:
+            for name, values in m2m.get(index, {}).items():
+                getattr(obj, name).set(values)
+
+        if created:
+            instances = [obj for _, obj in created]
+            if get_search_fields(self.model_cls) and search_index_enabled():
+                index_new_instances(self.model_cls, instances, batch_size=self.batch_size)
+            if is_tracked_model(self.model_cls):
+                bump_model_version(self.model_cls)
+
+    def _build(self, child, validated: dict) -> Tuple[Model, Dict[str, Any]]:
+        """Instância não salva + valores de M2M (aplicados depois do insert)."""
+        builder = getattr(child, "build_instance", None)
+        if builder is not None:
+            return builder(validated), {}
+
+        opts = self.model_cls._meta
+        if self.tenant_fk:
+            validated[self.tenant_fk] = self.account
+        m2m_names = {f.name for f in opts.many_to_many}
+        concrete = {f.name for f in opts.concrete_fields} | {f.attname for f in opts.concrete_fields}
+        relations = {k: validated.pop(k) for k in list(validated) if k in m2m_names}
+        return self.model_cls(**{k: v for k, v in validated.items() if k in concrete}), relations
+
+    def _assign_codes(self, objs: List[Model]) -> None:
+        prefix = getattr(self.model_cls, "CODE_PREFIX", None)
+        if not prefix or not self.tenant_fk:
+            return
+        missing = [obj for obj in objs if not getattr(obj, "code", None)]
+        codes = reserve_codes(self.model_cls, self.account, len(missing), prefix=prefix)
+        for obj, code in zip(missing, codes):
+            obj.code = code
+
+    def _insert(self, objs: List[Model]) -> None:
+        if _has_history(self.model_cls):
+            bulk_create_with_history(objs, self.model_cls, batch_size=self.batch_size, default_user=self.user)
+        else:
+            self.model_cls._default_manager.bulk_create(objs, batch_size=self.batch_size)
+
+
+class BulkUpdater(BulkOperation):
+    def run(self, queryset, items: List[Any]) -> BulkResult:
+        """`queryset` já vem restrito ao tenant (ModelService.get_queryset)."""
+        pk_field = self.model_cls._meta.pk
+        wanted: Dict[int, str] = {}
+        seen = set()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get("id"):
+                self._add_error(index, {"id": ["Informe o id do objeto."]})
+                continue
+            try:
+                key = str(pk_field.to_python(item["id"]))
+            except DjangoValidationError:
+                self._add_error(index, {"id": ["Id inválido."]})
+                continue
+            if key in seen:
+                self._add_error(index, {"id": ["Id repetido na lista."]})
+                continue
+            seen.add(key)
+            wanted[index] = key
+
+        targets = {str(obj.pk): obj for obj in queryset.filter(pk__in=list(seen))} if seen else {}
+
+        valid = []
+        for index, key in wanted.items():
+            instance = targets.get(key)
+            if instance is None:
+                self._add_error(index, {"id": ["Objeto não encontrado."]})
+                continue
+            changes = {k: v for k, v in items[index].items() if k != "id"}
+            ser = self.serializer_class(instance, data=changes, partial=True, context=self.context)
+            if not ser.is_valid():
+                self._add_error(index, ser.errors)
+                continue
+            valid.append((index, instance, ser))
+
+        with transaction.atomic():
+            sers = {index: ser for index, _, ser in valid}
+            if supports_bulk_update(self.serializer_class):
+                slow = {index for index in sers if has_side_effects(self.serializer_class, items[index])}
+                self._bulk_path([entry for entry in valid if entry[0] not in slow])
+                sers = {index: sers[index] for index in slow}
+            if sers:
+                self._save_one_by_one(list(sers), lambda index: sers[index].save())
+        return self._finish()
+
+    def _bulk_path(self, valid) -> None:
+        groups: Dict[Tuple[str, ...], list] = {}
+        m2m: Dict[int, Dict[str, Any]] = {}
+        now = timezone.now()
+        has_updated_at = any(f.name == "updated_at" for f in self.model_cls._meta.concrete_fields)
+
+        pending, changed_by_index = [], {}
+        for index, obj, ser in valid:
+            changed, relations = self._apply(obj, ser.validated_data)
+            if relations:
+                m2m[index] = relations
+            changed_by_index[index] = changed
+            pending.append((index, obj))
+
+        for index, obj in self._prepare(pending):
+            changed = changed_by_index[index]
+            if not changed:
+                # nada mudou nas colunas: não grava, mas o item conta como atualizado
+                self.result.saved.append((index, obj))
+                continue
+            if has_updated_at:
+                obj.updated_at = now
+                changed.add("updated_at")
+            groups.setdefault(tuple(sorted(changed)), []).append((index, obj))
+
+        # um UPDATE em lote por conjunto de colunas alteradas
+        written = []
+        for fields, members in groups.items():
+            before = len(self.result.saved)
+            for start in range(0, len(members), self.batch_size):
+                self._write_batch(
+                    members[start:start + self.batch_size],
+                    lambda objs, fields=fields: self._update(objs, list(fields)),
+                )
+            written.extend(obj for _, obj in self.result.saved[before:])
+
+        for index, obj in self.result.saved:
+            for name, values in m2m.get(index, {}).items():
+                getattr(obj, name).set(values)
+
+        if written or m2m:
+            if written and get_search_fields(self.model_cls) and search_index_enabled():
+                reindex_instances(self.model_cls, written, batch_size=self.batch_size)
+            if is_tracked_model(self.model_cls):
+                bump_model_version(self.model_cls)
+
+    def _apply(self, obj: Model, validated: dict) -> Tuple[set, Dict[str, Any]]:
+        """Atribui os campos validados; retorna (campos concretos que mudaram, valores de M2M)."""
+        opts = self.model_cls._meta
+        by_key = {}
+        for f in opts.concrete_fields:
+            by_key[f.name] = f
+            by_key[f.attname] = f
+        m2m_names = {f.name for f in opts.many_to_many}
+        tenant_keys = {self.tenant_fk, f"{self.tenant_fk}_id"} if self.tenant_fk else set()
+
+        changed, relations = set(), {}
+        for key, value in validated.items():
+            if key in tenant_keys:
+                continue
+            if key in m2m_names:
+                relations[key] = value
+                continue
+            model_field = by_key.get(key)
+            if model_field is None or model_field.primary_key:
+                continue
+            new = getattr(value, "pk", value) if key == model_field.name and model_field.is_relation else value
+            if getattr(obj, model_field.attname) != new:
+                setattr(obj, key, value)
+                changed.add(model_field.name)
+        return changed, relations
+
+    def _update(self, objs: List[Model], fields: List[str]) -> None:
+        if _has_history(self.model_cls):
+            bulk_update_with_history(objs, self.model_cls, fields, batch_size=self.batch_size, default_user=self.user)
+        else:
+            self.model_cls._default_manager.bulk_update(objs, fields, batch_size=self.batch_size)
+
+
+class BulkSetter(BulkOperation):
+    """Aplica o mesmo {campo: valor} a todo um queryset do tenant com um único UPDATE."""
+
+    def validate(self, values) -> Dict[str, Any]:
+        """{campo do serializer: valor} => {attname do model: valor}. Levanta ValidationError com os erros por campo."""
+        if not isinstance(values, dict) or not values:
+            raise ValidationError({"set": ["Informe ao menos um campo."]})
+
+        ser = self.serializer_class(context=self.context)
+        opts = self.model_cls._meta
+        by_key = {}
+        for f in opts.concrete_fields:
+            by_key[f.name] = f
+            by_key[f.attname] = f
+        tenant_keys = {self.tenant_fk, f"{self.tenant_fk}_id"} if self.tenant_fk else set()
+        # o mesmo valor em várias linhas viola qualquer unicidade da qual o campo participe
+        in_unique = {name for group in opts.unique_together for name in group}
+        in_unique.update(name for c in opts.total_unique_constraints for name in c.fields)
+
+        errors, validated = {}, {}
+        for key, raw in values.items():
+            field = ser.fields.get(key)
+            if field is None or field.read_only:
+                errors[key] = ["Campo inexistente ou somente leitura."]
+                continue
+            source = key if field.source == "*" else field.source
+            model_field = by_key.get(source)
+            if model_field is None or model_field.primary_key or source in tenant_keys:
+                errors[key] = ["Campo não pode ser alterado em lote."]
+                continue
+            if model_field.unique or model_field.name in in_unique:
+                errors[key] = ["Campo único não pode receber o mesmo valor em vários registros."]
+                continue
+            try:
+                value = field.run_validation(raw)
+                validator = getattr(ser, f"validate_{field.field_name}", None)
+                if validator is not None:
+                    value = validator(value)
+            except ValidationError as exc:
+                errors[key] = exc.detail
+                continue
+            except DjangoValidationError as exc:
+                errors[key] = exc.messages
+                continue
+            if model_field.is_relation:
+                value = getattr(value, "pk", value)
+                if value is not None and not self._related_in_tenant(model_field.related_model, value):
+                    errors[key] = ["Objeto não encontrado."]
+                    continue
+            validated[model_field.attname] = value
+
+        if errors:
+            raise ValidationError(errors)
+        return validated
+
+    def _related_in_tenant(self, related_model: Type[Model], pk) -> bool:
+        """FK para um model com tenant só aceita objetos do mesmo Account."""
+        manager = related_model._base_manager
+        if self.account is None or related_model is type(self.account):
+            return manager.filter(pk=pk).exists()
+        for f in related_model._meta.concrete_fields:
+            if f.is_relation and f.related_model is type(self.account):
+                return manager.filter(pk=pk, **{f.attname: self.account.pk}).exists()
+        return manager.filter(pk=pk).exists()
+
+    def run(self, queryset, values, *, on_progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Valida, grava com um UPDATE e registra histórico/índice em blocos. Retorna as linhas alteradas."""
+        validated = self.validate(values)
+        now = timezone.now()
+        if any(f.name == "updated_at" for f in self.model_cls._meta.concrete_fields):
+            validated["updated_at"] = now
+
+        with transaction.atomic():
+            # os pks vêm antes: o UPDATE pode tirar as linhas do filtro (ex.: is_active=true -> false)
+            pks = list(queryset.order_by().values_list("pk", flat=True))
+            if not pks:
+                return 0
+            try:
+                with transaction.atomic():
+                    updated = queryset.order_by().update(**validated)
+            except IntegrityError as exc:
+                raise ValidationError({"set": [f"Não foi possível gravar: {exc}"]})
+            self._after_update(pks, validated, now, on_progress)
+
+        if is_tracked_model(self.model_cls):
+            bump_model_version(self.model_cls)
+        return updated
+
+    def _after_update(self, pks: list, validated: dict, now, on_progress) -> None:
+        history = _has_history(self.model_cls)
+        search_fields = {name.split("__", 1)[0] for name in get_search_fields(self.model_cls) or ()}
+        names = {f.attname: f.name for f in self.model_cls._meta.concrete_fields}
+        changed = {names[attname] for attname in validated}
+        reindex = bool(search_fields & changed) and search_index_enabled()
+        if not (history or reindex or on_progress):
+            return
+
+        manager = self.model_cls._base_manager
+        for start in range(0, len(pks), self.batch_size):
+            chunk = pks[start:start + self.batch_size]
+            if history or reindex:
+                objs = list(manager.filter(pk__in=chunk))
+                if history:
+                    get_history_manager_for_model(self.model_cls).bulk_history_create(
+                        objs, batch_size=self.batch_size, update=True, default_user=self.user, default_date=now
+                    )
+                if reindex:
+                    reindex_instances(self.model_cls, objs, batch_size=self.batch_size)
+            if on_progress is not None:
+                # ainda dentro da transação: num job, o progresso é gravado pela thread de
+                # heartbeat em outra conexão (api.actions.jobs), então já aparece no /jobs/<id>
+                on_progress(start + len(chunk), len(pks))
@@ -0,0 +1,47 @@
+"""
+Contadores de versão por model.
+
+Caches derivados de leitura (contagens, respostas de listagem) embutem a versão
+atual do model na chave. Qualquer escrita no model incrementa a versão, e as
+chaves antigas simplesmente deixam de ser lidas (expiram sozinhas pelo timeout).
+"""
+
+from typing import Type
+from django.core.cache import cache
+from django.db.models import Model
+
+VERSION_KEY = "api:ver:{label}"
+
+# Apps cujas escritas não alimentam nenhum cache da API.
+UNTRACKED_APPS = {"admin", "sessions", "contenttypes", "auditlog", "token_blacklist"}
+
+
+def is_tracked_model(model_cls: Type[Model]) -> bool:
+    """Ignora apps de infraestrutura e os models históricos do simple_history."""
+    meta = getattr(model_cls, "_meta", None)
+    if meta is None or meta.app_label in UNTRACKED_APPS:
+        return False
+    return not hasattr(model_cls, "instance_type")
+
+
+def _version_key(model_cls: Type[Model]) -> str:
+    return VERSION_KEY.format(label=model_cls._meta.label_lower)
+
+
+def get_model_version(model_cls: Type[Model]) -> int:
+    key = _version_key(model_cls)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key) or 1
+    return int(version)
+
+
+def bump_model_version(model_cls: Type[Model]) -> None:
+    key = _version_key(model_cls)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # chave ainda não existia (ou foi despejada): qualquer valor novo invalida
+        if not cache.add(key, 2, timeout=None):
+            cache.incr(key)
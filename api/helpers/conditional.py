@@ -0,0 +1,138 @@
+"""
+GET condicional (ETag fraco / Last-Modified) para GetView e ListView.
+
+- objeto: ETag de (model, pk, updated_at) + Last-Modified
+- lista:  ETag da versão do model (api.helpers.cache_versions), só ETag
+Nos dois casos entra também a "variante" da resposta: tenant, querystring
+normalizada (fields, filtros, página) e a versão dos models relacionados que o
+serializer lê (select/prefetch do QueryPlan). Assim uma escrita num aninhado
+(ex.: CustomerAddress) também troca o ETag do Customer.
+
+Na lista o ETag não consulta o banco: a versão do model muda em qualquer
+escrita, inclusive exclusões e linhas de tabelas intermediárias (M2M), que um
+Max(updated_at) não enxergaria. Pelo mesmo motivo a lista não manda
+Last-Modified e ignora If-Modified-Since. Models não rastreados ficam sem
+validadores na lista.
+
+If-None-Match tem precedência sobre If-Modified-Since; a decisão é tomada antes
+de serializar qualquer linha.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Type
+from django.db.models import Model
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+from .cache_versions import get_model_version, is_tracked_model
+from .query_planner import QueryPlan
+
+UPDATED_FIELD = "updated_at"
+
+
+@dataclass
+class Validators:
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def has_updated_at(model_cls: Type[Model]) -> bool:
+    try:
+        model_cls._meta.get_field(UPDATED_FIELD)
+        return True
+    except Exception:
+        return False
+
+
+def related_models(model_cls: Type[Model], plan: Optional[QueryPlan]) -> List[Type[Model]]:
+    """Models alcançados pelos caminhos de select/prefetch do plano."""
+    found: List[Type[Model]] = []
+    for path in (plan.select_related + plan.prefetch_related) if plan else []:
+        current = model_cls
+        for segment in path.split("__"):
+            try:
+                current = current._meta.get_field(segment).related_model
+            except Exception:
+                break
+            if current is None:
+                break
+            if current not in found:
+                found.append(current)
+    return found
+
+
+def _variant(request, model_cls: Type[Model], plan: Optional[QueryPlan]) -> list:
+    params = getattr(request, "query_params", request.GET)
+    query = sorted((key, sorted(params.getlist(key))) for key in params.keys())
+    versions = sorted(
+        (m._meta.label_lower, get_model_version(m))
+        for m in related_models(model_cls, plan)
+        if is_tracked_model(m)
+    )
+    account_id = getattr(getattr(request, "account", None), "id", None)
+    return [str(account_id or "-"), query, versions]
+
+
+def make_etag(*parts) -> str:
+    raw = json.dumps(parts, default=str, separators=(",", ":"), ensure_ascii=False)
+    return 'W/"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def object_validators(request, obj: Model, plan: Optional[QueryPlan] = None) -> Optional[Validators]:
+    model_cls = type(obj)
+    if not has_updated_at(model_cls):
+        return None
+    updated_at = getattr(obj, UPDATED_FIELD, None)
+    etag = make_etag(model_cls._meta.label_lower, str(obj.pk), updated_at, _variant(request, model_cls, plan))
+    return Validators(etag=etag, last_modified=updated_at)
+
+
+def list_validators(request, model_cls: Type[Model], plan: Optional[QueryPlan] = None) -> Optional[Validators]:
+    if not is_tracked_model(model_cls):
+        return None
+    etag = make_etag(
+        model_cls._meta.label_lower,
+        get_model_version(model_cls),
+        _variant(request, model_cls, plan),
+    )
+    return Validators(etag=etag)
+
+
+def _weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request, validators: Optional[Validators]) -> bool:
+    if validators is None:
+        return False
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        current = _weak(validators.etag)
+        return any(_weak(tag) == current for tag in parse_etags(if_none_match))
+
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE") or "")
+    if if_modified_since is not None and validators.last_modified is not None:
+        return int(validators.last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def apply_validators(response, validators: Optional[Validators]):
+    """Anota ETag/Last-Modified; private + no-cache faz o navegador revalidar a cada uso."""
+    if validators is None:
+        return response
+    response["ETag"] = validators.etag
+    if validators.last_modified is not None:
+        response["Last-Modified"] = http_date(validators.last_modified.timestamp())
+    response["Cache-Control"] = "private, no-cache"
+    patch_vary_headers(response, ("Authorization", "X-Account-Slug"))
+    return response
+
+
+def not_modified_response(validators: Validators) -> Response:
+    return apply_validators(Response(status=status.HTTP_304_NOT_MODIFIED), validators)
@@ -0,0 +1,98 @@
+"""
+Estratégias de contagem para a ListView (`?count=`):
+- exact:     qs.count() de sempre
+- cached:    qs.count() guardado por (tenant, model, filtro normalizado), invalidado por escrita no model
+- estimated: estimativa do planner do banco (Postgres); abaixo do limite, ou em outros bancos, conta exato
+- none:      não conta (count = None)
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Optional, Type
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Model, QuerySet
+from .cache_versions import get_model_version
+
+COUNT_MODES = ("exact", "cached", "estimated", "none")
+
+# Parâmetros que não mudam o conjunto filtrado (só a janela/ordem da página)
+NON_FILTER_PARAMS = {"limit", "offset", "cursor", "order_by", "count"}
+
+
+@dataclass
+class CountResult:
+    value: Optional[int]
+    exact: bool
+    mode: str
+
+
+def normalize_filter_params(params) -> str:
+    """Serializa a querystring de filtro de forma estável (ordem das chaves e valores)."""
+    items = []
+    for key in sorted(params.keys()):
+        if key in NON_FILTER_PARAMS:
+            continue
+        values = params.getlist(key) if hasattr(params, "getlist") else [params.get(key)]
+        items.append([key, sorted(str(v) for v in values)])
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+
+
+class ListCounter:
+    """Aplica a estratégia de contagem escolhida para um queryset já filtrado."""
+
+    def __init__(self, request, model_cls: Type[Model]):
+        self.request = request
+        self.model_cls = model_cls
+        self.account_id = getattr(getattr(request, "account", None), "id", None)
+
+    def resolve_mode(self, raw: Optional[str]) -> str:
+        mode = (raw or "").strip().lower()
+        if mode in COUNT_MODES:
+            return mode
+        default = getattr(settings, "API_LIST_COUNT_STRATEGY", "exact")
+        return default if default in COUNT_MODES else "exact"
+
+    def count(self, qs: QuerySet, mode: str) -> CountResult:
+        if mode == "none":
+            return CountResult(None, False, mode)
+        if mode == "cached":
+            return CountResult(self._cached(qs), True, mode)
+        if mode == "estimated":
+            estimate = self._estimate(qs)
+            threshold = getattr(settings, "API_COUNT_ESTIMATE_THRESHOLD", 10000)
+            if estimate is not None and estimate >= threshold:
+                return CountResult(estimate, False, mode)
+        return CountResult(qs.count(), True, mode)
+
+    def _cache_key(self, params) -> str:
+        digest = hashlib.sha1(normalize_filter_params(params).encode("utf-8")).hexdigest()
+        version = get_model_version(self.model_cls)
+        label = self.model_cls._meta.label_lower
+        return f"api:count:{self.account_id or '-'}:{label}:v{version}:{digest}"
+
+    def _cached(self, qs: QuerySet) -> int:
+        key = self._cache_key(getattr(self.request, "query_params", self.request.GET))
+        total = cache.get(key)
+        if total is None:
+            total = qs.count()
+            cache.set(key, total, timeout=getattr(settings, "API_COUNT_CACHE_TIMEOUT", 300))
+        return total
+
+    def _estimate(self, qs: QuerySet) -> Optional[int]:
+        """Lê 'Plan Rows' do EXPLAIN; só o Postgres mantém estatísticas úteis para isso."""
+        connection = connections[qs.db]
+        if connection.vendor != "postgresql":
+            return None
+        try:
+            sql, params = qs.order_by().values("pk").query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception:
+            return None
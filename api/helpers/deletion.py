@@ -0,0 +1,157 @@
+# api/helpers/deletion.py
+"""
+Exclusão em lote por blocos e estimativa do efeito cascata.
+
+qs.delete() num conjunto grande faz o Collector do Django carregar em memória
+todos os objetos em cascata, e simple_history/auditlog gravam uma linha por
+objeto, tudo numa única transação. Aqui os pks são lidos por keyset (pk > último)
+e cada bloco é apagado na sua própria transação: memória limitada ao bloco e
+locks curtos. Blocos já apagados não voltam se um bloco seguinte falhar.
+
+A estimativa conta, por relacionamento, quantas linhas seriam apagadas (CASCADE),
+anuladas (SET_NULL/SET_DEFAULT) ou bloqueariam a exclusão (PROTECT/RESTRICT),
+só com COUNT(*) por subquery — nada é carregado.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Type
+from django.db import models, transaction
+from django.db.models import Model, QuerySet
+from django.db.models.deletion import ProtectedError, RestrictedError
+from .bulk import _has_history
+
+MAX_CASCADE_DEPTH = 4
+
+_NULLING = (models.SET_NULL, models.SET_DEFAULT)
+_BLOCKING = (models.PROTECT, models.RESTRICT)
+
+
+def _is_audited(model_cls: Type[Model]) -> bool:
+    from auditlog.registry import auditlog
+
+    return auditlog.contains(model_cls)
+
+
+@dataclass
+class DeleteResult:
+    deleted: int = 0
+    per_model: Dict[str, int] = field(default_factory=dict)
+    deleted_pks: List[Any] = field(default_factory=list)
+    blocked_pks: List[Any] = field(default_factory=list)
+    chunks: int = 0
+
+
+def _delete_pks(model_cls: Type[Model], pks: List[Any], result: DeleteResult) -> None:
+    """Apaga um bloco; se algum item estiver protegido, apaga um a um para isolar os bloqueados."""
+    manager = model_cls._base_manager
+    try:
+        with transaction.atomic():
+            _, per_model = manager.filter(pk__in=pks).delete()
+        result.deleted_pks.extend(pks)
+    except (ProtectedError, RestrictedError):
+        per_model = {}
+        for pk in pks:
+            try:
+                with transaction.atomic():
+                    _, one = manager.filter(pk=pk).delete()
+            except (ProtectedError, RestrictedError):
+                result.blocked_pks.append(pk)
+                continue
+            result.deleted_pks.append(pk)
+            for label, n in one.items():
+                per_model[label] = per_model.get(label, 0) + n
+    for label, n in per_model.items():
+        result.per_model[label] = result.per_model.get(label, 0) + n
+    result.deleted += per_model.get(model_cls._meta.label, 0)
+    result.chunks += 1
+
+
+def chunked_delete(
+    model_cls: Type[Model],
+    qs: QuerySet,
+    *,
+    batch_size: int = 500,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> DeleteResult:
+    """Apaga `qs` em blocos de `batch_size`, cada um em uma transação; on_progress recebe os processados."""
+    result = DeleteResult()
+    base = qs.order_by("pk")
+    last = None
+    processed = 0
+    while True:
+        page = base if last is None else base.filter(pk__gt=last)
+        pks = list(page.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        last = pks[-1]
+        _delete_pks(model_cls, pks, result)
+        processed += len(pks)
+        if on_progress is not None:
+            on_progress(processed)
+    return result
+
+
+def _relations(model_cls: Type[Model]):
+    """(model relacionado, campo que aponta para model_cls, on_delete) dos FKs reversos e das tabelas M2M."""
+    for rel in model_cls._meta.related_objects:
+        if rel.many_to_many:
+            # M2M declarado no outro lado: as linhas da tabela intermediária vão junto
+            through = rel.through
+            if through._meta.auto_created:
+                fk = next(f for f in through._meta.fields if f.is_relation and f.related_model is model_cls)
+                yield through, fk.name, models.CASCADE
+            continue
+        yield rel.related_model, rel.field.name, rel.on_delete
+    for m2m in model_cls._meta.local_many_to_many:
+        through = m2m.remote_field.through
+        if through._meta.auto_created:
+            yield through, m2m.m2m_field_name(), models.CASCADE
+
+
+def estimate_delete(model_cls: Type[Model], qs: QuerySet, *, batch_size: int = 500) -> Dict[str, Any]:
+    """Quantas linhas cada relacionamento perderia/anularia/bloquearia se `qs` fosse apagado."""
+    count = qs.count()
+    cascade: List[Dict[str, Any]] = []
+    set_null: List[Dict[str, Any]] = []
+    protected: List[Dict[str, Any]] = []
+    history_rows = count if _has_history(model_cls) else 0
+    audit_rows = count if _is_audited(model_cls) else 0
+
+    def walk(parent_cls, parent_qs, depth: int):
+        nonlocal history_rows, audit_rows
+        if depth > MAX_CASCADE_DEPTH:
+            return
+        pks = parent_qs.values("pk")
+        for related, field_name, on_delete in _relations(parent_cls):
+            related_qs = related._base_manager.filter(**{f"{field_name}__in": pks})
+            rows = related_qs.count()
+            if not rows:
+                continue
+            entry = {"model": related._meta.label, "field": field_name, "depth": depth, "count": rows}
+            if on_delete is models.CASCADE:
+                cascade.append(entry)
+                if _has_history(related):
+                    history_rows += rows
+                if _is_audited(related) and not related._meta.auto_created:
+                    audit_rows += rows
+                walk(related, related_qs, depth + 1)
+            elif on_delete in _NULLING:
+                set_null.append(entry)
+            elif on_delete in _BLOCKING:
+                protected.append(entry)
+
+    if count:
+        walk(model_cls, qs, 1)
+
+    return {
+        "count": count,
+        "cascade": cascade,
+        "cascade_total": sum(e["count"] for e in cascade),
+        "set_null": set_null,
+        "protected": protected,
+        "history_rows": history_rows,
+        "audit_rows": audit_rows,
+        "batch_size": batch_size,
+        "chunks": -(-count // batch_size) if batch_size else 1,
+    }
@@ -1,5 +1,5 @@
 # api/helpers/drf_adapter.py
-from typing import Any, Dict, Optional, Type
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
 from django.db.models import Model, Field, FileField, ImageField
 from django.db.models.fields.files import FieldFile
 from rest_framework import serializers
@@ -56,6 +56,23 @@ class FileInfoField(serializers.Field):
 
 
 
+# Cache do processo: model => classe de serializer (explícita ou dinâmica).
+# Classe estável por model faz o DRF/QueryPlanner reaproveitarem o que memorizam por classe.
+# A ausência de serializer explícito já fica guardada no model_registry (negative cache).
+_SERIALIZER_CLASSES: Dict[Type[Model], type] = {}
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+_READABLE_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def warm_serializer_cache(resolver: Optional[ModelResolver] = None) -> int:
+    """Resolve (e constrói, se preciso) o serializer de todos os models registrados. Chamado no ApiConfig.ready()."""
+    from core.model_registry import model_registry
+    adapter = DRFSerializerAdapter(resolver or ModelResolver())
+    for info in model_registry.all():
+        adapter.get_serializer_class(info.model)
+    return len(_SERIALIZER_CLASSES)
+
+
 class DRFSerializerAdapter:
     """
     Serializa/valida usando DRF Serializer.
@@ -66,18 +83,39 @@ class DRFSerializerAdapter:
     def __init__(self, resolver: ModelResolver):
         self.resolver = resolver
 
-    def serialize_instance(self, model_name: str, instance: Model, *, context: Optional[dict]=None) -> Optional[Dict[str, Any]]:
+    def serialize_instance(self, model_name: str, instance: Model, *, context: Optional[dict]=None, fields: Optional[Iterable[str]]=None) -> Optional[Dict[str, Any]]:
         model_cls = self.resolver.resolve_model(model_name)
         if not model_cls or not isinstance(instance, model_cls):
             return None
         SerializerClass = self._resolve_or_build_serializer(model_cls)
         ser = SerializerClass(instance, context=context or {})
+        self._trim_fields(ser, fields)
         return {
             "model": getattr(model_cls._meta, "label_lower", model_cls.__name__.lower()),
             "id": str(instance.pk),
             "fields": ser.data,
         }
 
+    def serialize_many(self, model_name: str, instances, *, context: Optional[dict]=None, fields: Optional[Iterable[str]]=None) -> list[Dict[str, Any]]:
+        """
+        Serializa uma página inteira com um único serializer `many=True`.
+        Resolve model/serializer uma vez só; cada item mantém o formato de serialize_instance.
+        """
+        model_cls = self.resolver.resolve_model(model_name)
+        if not model_cls:
+            return []
+        objs = [obj for obj in instances if isinstance(obj, model_cls)]
+        if not objs:
+            return []
+        SerializerClass = self._resolve_or_build_serializer(model_cls)
+        ser = SerializerClass(objs, many=True, context=context or {})
+        self._trim_fields(ser, fields)
+        label = getattr(model_cls._meta, "label_lower", model_cls.__name__.lower())
+        return [
+            {"model": label, "id": str(obj.pk), "fields": data}
+            for obj, data in zip(objs, ser.data)
+        ]
+
     def create(self, model_name: str, payload: Dict[str, Any], *, context=None) -> Model:
         model_cls = self.resolver.resolve_model(model_name)
         if not model_cls:
@@ -98,21 +136,55 @@ class DRFSerializerAdapter:
 
     def get_serializer_fields(self, model_cls: Type[Model]) -> list[str]:
         SerializerClass = self._resolve_or_build_serializer(model_cls)
-        fields = list(SerializerClass().get_fields().keys())
-        if "id" not in fields:
-            fields.insert(0, "id")
-        return fields
+        names = _FIELD_NAMES.get(SerializerClass)
+        if names is None:
+            fields = list(SerializerClass().get_fields().keys())
+            if "id" not in fields:
+                fields.insert(0, "id")
+            names = _FIELD_NAMES[SerializerClass] = tuple(fields)
+        return list(names)
+
+    def get_readable_fields(self, model_cls: Type[Model]) -> list[str]:
+        """Como get_serializer_fields, sem os write_only (ex.: *_id de escrita), que nunca saem na resposta."""
+        SerializerClass = self._resolve_or_build_serializer(model_cls)
+        names = _READABLE_NAMES.get(SerializerClass)
+        if names is None:
+            fields = [name for name, f in SerializerClass().get_fields().items() if not f.write_only]
+            if "id" not in fields:
+                fields.insert(0, "id")
+            names = _READABLE_NAMES[SerializerClass] = tuple(fields)
+        return list(names)
+
+    def _trim_fields(self, ser, fields: Optional[Iterable[str]]) -> None:
+        """Sparse fieldset: remove do serializer (ou do child, se many=True) o que não foi pedido."""
+        if fields is None:
+            return
+        keep = set(fields)
+        target = ser.child if isinstance(ser, serializers.ListSerializer) else ser
+        for name in list(target.fields.keys()):
+            if name not in keep:
+                target.fields.pop(name)
+
+    def get_serializer_class(self, model_cls: Type[Model]):
+        return self._resolve_or_build_serializer(model_cls)
 
     def _resolve_or_build_serializer(self, model_cls):
-        explicit = self.resolver.resolve_serializer_for_model(model_cls)
-        if explicit:
-            return explicit
-        return self._build_dynamic_serializer(model_cls)
+        SerializerClass = _SERIALIZER_CLASSES.get(model_cls)
+        if SerializerClass is None:
+            SerializerClass = (
+                self.resolver.resolve_serializer_for_model(model_cls)
+                or self._build_dynamic_serializer(model_cls)
+            )
+            _SERIALIZER_CLASSES[model_cls] = SerializerClass
+        return SerializerClass
 
     def _build_dynamic_serializer(self, model_cls):
         tenant_fk = self.resolver.find_account_fk_field(model_cls)
 
         class DynamicSerializer(serializers.ModelSerializer):
+            BULK_CREATE = True
+            BULK_UPDATE = True
+
             class Meta:
                 model = model_cls
                 fields = "__all__"
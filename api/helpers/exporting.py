@@ -0,0 +1,83 @@
+"""
+Escrita em streaming para a ExportView (CSV / NDJSON).
+
+As linhas saem do queryset em blocos (`iterator(chunk_size=...)`); cada bloco
+é serializado de uma vez (serialize_many) e escrito, sem acumular o resultado
+em memória.
+"""
+
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, QuerySet
+
+# formato => (content-type, extensão)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson; charset=utf-8", "ndjson"),
+}
+
+
+def is_privileged(request) -> bool:
+    """Mesma regra do ExportAwareSerializerMixin: superuser/staff veem EXPORT_EXCLUDE."""
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated:
+        return False
+    return bool(user.is_superuser or user.is_staff)
+
+
+def export_columns(model_cls: Type[Model], fields: Iterable[str], request) -> List[str]:
+    """Colunas exportadas: sem EXPORT_EXCLUDE para não-privilegiados, mesmo se o serializer não usar o mixin."""
+    columns = list(dict.fromkeys(fields))
+    if is_privileged(request):
+        return columns
+    exclude = set(getattr(model_cls, "EXPORT_EXCLUDE", []) or [])
+    return [name for name in columns if name not in exclude]
+
+
+def iter_export_rows(helper, model_cls: Type[Model], qs: QuerySet, columns: List[str], chunk_size: int) -> Iterator[Dict[str, Any]]:
+    iterator = qs.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        for data in helper.serialize_many(model_cls.__name__, chunk, fields=columns):
+            row = {**(data.get("fields", {}) or {}), "id": data.get("id")}
+            yield {name: row.get(name) for name in columns}
+
+
+class _Echo:
+    """Pseudo-arquivo do csv.writer: devolve a linha em vez de guardá-la."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, cls=DjangoJSONEncoder)
+    return value
+
+
+def stream_csv(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_cell(row.get(name)) for name in columns])
+
+
+def stream_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + "\n"
+
+
+def stream_export(fmt: str, rows: Iterable[Dict[str, Any]], columns: List[str]) -> Optional[Iterator[str]]:
+    if fmt == "csv":
+        return stream_csv(rows, columns)
+    if fmt == "ndjson":
+        return stream_ndjson(rows)
+    return None
@@ -0,0 +1,99 @@
+"""
+Catálogo de campos por model, calculado uma vez por (model, serializer).
+
+Reúne o que a listagem precisa saber dos campos sem instanciar serializer nem
+chamar `_meta.get_field` a cada request:
+- allowed:    campos expostos pelo serializer (+ id) => filtros e ?fields=
+- searchable: campos de texto (Char/Text/Email/Slug) entre os permitidos => ?search=
+- orderable:  colunas concretas entre os permitidos => order_by
+- lookups:    lookups aceitos por campo, conforme o tipo da coluna
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, Tuple, Type
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Model
+
+SEARCHABLE_FIELD_TYPES = (models.CharField, models.TextField, models.EmailField, models.SlugField)
+
+TEXT_LOOKUPS = frozenset({"exact", "icontains", "in", "startswith", "istartswith", "endswith", "iendswith"})
+RANGE_LOOKUPS = frozenset({"exact", "in", "gt", "gte", "lt", "lte"})
+BOOL_LOOKUPS = frozenset({"exact"})
+KEY_LOOKUPS = frozenset({"exact", "in"})
+
+RANGE_FIELD_TYPES = (
+    models.IntegerField, models.FloatField, models.DecimalField,
+    models.DateField, models.TimeField, models.DurationField,
+)
+
+
+@dataclass(frozen=True)
+class FieldCatalog:
+    model_cls: Type[Model]
+    allowed: Tuple[str, ...]
+    searchable: Tuple[str, ...]
+    orderable: FrozenSet[str]
+    lookups: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+
+    @property
+    def allowed_set(self) -> FrozenSet[str]:
+        return frozenset(self.allowed)
+
+    def lookups_for(self, name: str) -> FrozenSet[str]:
+        return self.lookups.get(name, frozenset())
+
+
+def _lookups_for_field(model_field) -> FrozenSet[str]:
+    if isinstance(model_field, SEARCHABLE_FIELD_TYPES):
+        return TEXT_LOOKUPS
+    if isinstance(model_field, models.BooleanField):
+        return BOOL_LOOKUPS
+    # DateTimeField herda de DateField
+    if isinstance(model_field, RANGE_FIELD_TYPES):
+        return RANGE_LOOKUPS
+    if isinstance(model_field, (models.JSONField, models.FileField)):
+        return frozenset()
+    return KEY_LOOKUPS
+
+
+def build_field_catalog(model_cls: Type[Model], allowed_fields) -> FieldCatalog:
+    allowed = list(dict.fromkeys(allowed_fields or []))
+    if "id" not in allowed:
+        allowed.append("id")
+
+    searchable, orderable, lookups = [], set(), {}
+    for name in allowed:
+        try:
+            model_field = model_cls._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue  # campo só do serializer: aparece no ?fields=, mas não filtra nem ordena
+        if not getattr(model_field, "concrete", False) or model_field.many_to_many:
+            continue
+        orderable.add(name)
+        lookups[name] = _lookups_for_field(model_field)
+        if isinstance(model_field, SEARCHABLE_FIELD_TYPES):
+            searchable.append(name)
+
+    return FieldCatalog(
+        model_cls=model_cls,
+        allowed=tuple(allowed),
+        searchable=tuple(searchable),
+        orderable=frozenset(orderable),
+        lookups=lookups,
+    )
+
+
+_CATALOGS: Dict[Tuple[Type[Model], type], FieldCatalog] = {}
+
+
+def get_field_catalog(model_cls: Type[Model], serializer_class, load_allowed: Callable[[], Iterable[str]]) -> FieldCatalog:
+    """
+    Memoizado por (model, classe do serializer); as classes já são estáveis por processo.
+    `load_allowed` só é chamado na primeira vez.
+    """
+    key = (model_cls, serializer_class)
+    catalog = _CATALOGS.get(key)
+    if catalog is None:
+        catalog = _CATALOGS[key] = build_field_catalog(model_cls, load_allowed())
+    return catalog
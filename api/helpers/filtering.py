@@ -3,14 +3,15 @@
 Parser de filtros seguros vindos da querystring.
 Suporta lookups básicos (exact, icontains, in, gt, gte, lt, lte, startswith, istartswith, endswith, iendswith).
 Bloqueia travessia de relações (proíbe "__" no nome do campo, exceto para o sufixo de lookup).
-Aceita order_by (-campo) e paginação (limit, offset).
+Aceita order_by (-campo) e paginação (limit, offset ou cursor).
 Converte tipos simples (bool, int, float, uuid).
 """
 
-from typing import Dict, Tuple, Set, Iterable, Any
+from typing import Dict, Tuple, Set, Iterable, Any, List, Optional
 from uuid import UUID
-from django.db.models import Q, CharField, TextField, EmailField, SlugField
-SEARCHABLE_FIELD_TYPES = (CharField, TextField, EmailField, SlugField)
+from django.db.models import Q
+from .search import get_search_backend, search_terms
+from .field_catalog import FieldCatalog, SEARCHABLE_FIELD_TYPES
 
 ALLOWED_LOOKUPS: Set[str] = {
     "exact", "icontains", "in",
@@ -19,6 +20,9 @@ ALLOWED_LOOKUPS: Set[str] = {
     "endswith", "iendswith",
 }
 
+# Parâmetros de controle da listagem (nunca viram filtro)
+RESERVED_PARAMS: Set[str] = {"order_by", "limit", "offset", "cursor", "count", "fields", "format"}
+
 def _to_bool(v: str):
     s = (v or "").strip().lower()
     if s in {"1", "true", "t", "yes", "y", "on"}:
@@ -45,15 +49,18 @@ def _coerce_value(raw: str) -> Any:
         pass
     return raw
 
-def parse_list_query(params, allowed_fields: Iterable[str]) -> Tuple[Dict[str, Any], str, int, int]:
+def parse_list_query(params, allowed_fields) -> Tuple[Dict[str, Any], str, int, int]:
     """
-    Recebe request.query_params e um iterável de campos permitidos (normalmente, os do ModelForm).
+    Recebe request.query_params e o FieldCatalog do model (ou um iterável de campos permitidos).
     Retorna: (filters, order_by, limit, offset)
     - filters: dict pronto para passar no .filter(**filters)
     - order_by: string vazia ou "campo" / "-campo"
     - limit/offset: ints (com saneamento)
+    Com catálogo, order_by só aceita colunas concretas e cada campo só os lookups do seu tipo.
     """
-    allowed = set(allowed_fields or [])
+    catalog = allowed_fields if isinstance(allowed_fields, FieldCatalog) else None
+    allowed = catalog.allowed_set if catalog else set(allowed_fields or [])
+    orderable = catalog.orderable if catalog else allowed
     filters: Dict[str, Any] = {}
 
     order_by = (params.get("order_by") or "").strip()
@@ -71,11 +78,11 @@ def parse_list_query(params, allowed_fields: Iterable[str]) -> Tuple[Dict[str, A
 
     if order_by:
         raw = order_by.lstrip("-")
-        if raw not in allowed:
+        if raw not in orderable:
             order_by = "" 
 
     for k, v in params.items():
-        if k in {"order_by", "limit", "offset"}:
+        if k in RESERVED_PARAMS:
             continue
         if not v and v != "0":
             continue
@@ -94,6 +101,8 @@ def parse_list_query(params, allowed_fields: Iterable[str]) -> Tuple[Dict[str, A
 
         if lookup not in ALLOWED_LOOKUPS:
             continue
+        if catalog and lookup not in catalog.lookups_for(field):
+            continue
 
         if lookup == "in":
             items = [s.strip() for s in str(v).split(",") if s.strip() != ""]
@@ -103,12 +112,30 @@ def parse_list_query(params, allowed_fields: Iterable[str]) -> Tuple[Dict[str, A
 
     return filters, order_by, limit, offset
 
+def parse_sparse_fields(params, allowed_fields: Iterable[str]) -> Tuple[Optional[List[str]], List[str]]:
+    """
+    Lê `?fields=a,b,c` (sparse fieldset).
+    Retorna (campos pedidos ou None quando ausente, campos desconhecidos).
+    """
+    raw = (params.get("fields") or "").strip()
+    if not raw:
+        return None, []
+    allowed = set(allowed_fields or [])
+    requested = list(dict.fromkeys(s.strip() for s in raw.split(",") if s.strip()))
+    unknown = [name for name in requested if name not in allowed]
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested, unknown
+
 def get_searchable_fields(model_cls, allowed_fields):
     """
     Retorna os nomes dos campos do model que:
       - estão no conjunto permitido (ex.: fields do ModelForm)
       - são de texto (Char/Text/Email/Slug)
+    Com FieldCatalog, já vem pronto.
     """
+    if isinstance(allowed_fields, FieldCatalog):
+        return list(allowed_fields.searchable)
     out = []
     allowed = set(allowed_fields or [])
     for name in allowed:
@@ -121,15 +148,24 @@ def get_searchable_fields(model_cls, allowed_fields):
     return out
 
 
-def build_global_search_q(model_cls, allowed_fields, raw_search):
+def build_global_search_q(model_cls, allowed_fields, raw_search, account_id=None):
     """
-    Monta um Q que faz OR em todos os campos pesquisáveis para cada termo,
+    Com índice de busca (model com SEARCH_FIELDS, ver api/helpers/search.py):
+    Q por pk nos documentos que casam com todos os termos (prefixo).
+
+    Sem índice: monta um Q que faz OR em todos os campos pesquisáveis para cada termo,
     e AND entre os termos. Ex.: "foo bar" => (c1~foo OR c2~foo) AND (c1~bar OR c2~bar)
     """
     term = (raw_search or "").strip()
     if not term:
         return None
 
+    backend = get_search_backend(model_cls)
+    if backend is not None:
+        tokens = search_terms(term)
+        if tokens:
+            return backend.filter_q(model_cls, tokens, account_id)
+
     fields = get_searchable_fields(model_cls, allowed_fields)
     if not fields:
         return None
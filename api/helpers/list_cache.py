@@ -0,0 +1,64 @@
+"""
+Cache de respostas da ListView.
+
+Chave: tenant + model + querystring normalizada + nível de privilégio do
+usuário (staff/superuser veem campos de EXPORT_EXCLUDE) + versão do model e dos
+models relacionados que o serializer lê (select/prefetch do QueryPlan).
+
+Não há invalidação explícita: qualquer escrita incrementa a versão do model
+(post_save/post_delete/m2m_changed e as actions em lote), a chave muda e a
+entrada antiga expira sozinha pelo timeout.
+
+settings.API_LIST_CACHE_TIMEOUT = 0 desliga o cache.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional, Type
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Model
+from .cache_versions import get_model_version, is_tracked_model
+from .conditional import related_models
+from .exporting import is_privileged
+from .query_planner import QueryPlan
+
+LIST_CACHE_KEY = "api:list:{account}:{label}:{digest}"
+
+
+class ListResponseCache:
+    def __init__(self, request, model_cls: Type[Model], plan: Optional[QueryPlan] = None):
+        self.request = request
+        self.model_cls = model_cls
+        self.plan = plan
+        self.timeout = getattr(settings, "API_LIST_CACHE_TIMEOUT", 60)
+        self.enabled = bool(self.timeout) and is_tracked_model(model_cls)
+        self._key: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        if self._key is None:
+            params = getattr(self.request, "query_params", self.request.GET)
+            query = sorted((k, sorted(params.getlist(k))) for k in params.keys())
+            versions = sorted(
+                (m._meta.label_lower, get_model_version(m))
+                for m in [self.model_cls, *related_models(self.model_cls, self.plan)]
+                if is_tracked_model(m)
+            )
+            raw = json.dumps([query, versions, is_privileged(self.request)], default=str, separators=(",", ":"))
+            account_id = getattr(getattr(self.request, "account", None), "id", None)
+            self._key = LIST_CACHE_KEY.format(
+                account=account_id or "-",
+                label=self.model_cls._meta.label_lower,
+                digest=hashlib.sha1(raw.encode("utf-8")).hexdigest(),
+            )
+        return self._key
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        return cache.get(self.key)
+
+    def set(self, payload: Dict[str, Any]) -> None:
+        if self.enabled:
+            cache.set(self.key, payload, timeout=self.timeout)
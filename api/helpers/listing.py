@@ -0,0 +1,198 @@
+"""
+Pipeline de listagem compartilhado por ListView e ExportView.
+
+A partir da querystring monta o queryset já restrito e filtrado:
+- escopo de tenant (Account)
+- sparse fieldset (?fields=)
+- intervalo de datas em created_at (?start_date/?end_date ou ?start/?end)
+- busca global (?search=)
+- filtros por campo e order_by (parse_list_query)
+
+Paginação e contagem ficam com quem chama. As actions em lote (ActionView com
+{"filter": {...}}) usam o mesmo pipeline com `strict=True`: filtro que não seria
+aplicado vira erro em vez de ser ignorado, para não ampliar o alvo sem querer.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from typing import Any, Dict, List, Optional, Tuple, Type
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, Q, QuerySet
+from django.http import QueryDict
+from django.utils import timezone
+from .filtering import RESERVED_PARAMS, parse_list_query, parse_sparse_fields, build_global_search_q
+
+DATE_PARAMS = ("start_date", "start", "end_date", "end")
+
+
+@dataclass
+class ListQuery:
+    model_cls: Type[Model]
+    qs: Optional[QuerySet]  # None => nada a listar (sem queryset ou sem tenant)
+    allowed_fields: List[str]
+    sparse_fields: Optional[List[str]] = None
+    unknown_fields: List[str] = field(default_factory=list)
+    filters: Dict[str, Any] = field(default_factory=dict)
+    order_by: str = ""
+    limit: int = 100
+    offset: int = 0
+    raw_search: str = ""
+    q_search: Optional[Q] = None
+    account_id: Any = None
+    invalid_filters: List[str] = field(default_factory=list)  # só com strict=True
+    narrowed: bool = False  # algum filtro, limite de data ou busca foi de fato aplicado
+
+
+def _parse_iso(dt_str: str) -> Optional[datetime]:
+    s = (dt_str or "").strip()
+    if not s:
+        return None
+    try:
+        return datetime.fromisoformat(s)
+    except Exception:
+        return None
+
+
+def _ensure_aware(dt: datetime) -> datetime:
+    if timezone.is_naive(dt) and timezone.is_aware(timezone.now()):
+        try:
+            return timezone.make_aware(dt, timezone.get_current_timezone())
+        except Exception:
+            return timezone.make_aware(dt, timezone.utc)
+    return dt
+
+
+def parse_date_range(params) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Lê start_date/end_date (ou start/end) em ISO.
+    Um end só com a data (YYYY-MM-DD) cobre o dia inteiro.
+    """
+    start_raw = params.get("start_date") or params.get("start")
+    end_raw = params.get("end_date") or params.get("end")
+
+    start_dt = _parse_iso(start_raw)
+    end_dt = _parse_iso(end_raw)
+
+    if end_dt and end_dt.time() == time(0, 0, 0) and end_raw and len(end_raw) == 10:
+        end_dt = datetime.combine(end_dt.date(), time(23, 59, 59, 999999))
+
+    if start_dt:
+        start_dt = _ensure_aware(start_dt)
+    if end_dt:
+        end_dt = _ensure_aware(end_dt)
+    return start_dt, end_dt
+
+
+def _has_created_at(model_cls: Type[Model]) -> bool:
+    try:
+        model_cls._meta.get_field("created_at")
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def apply_date_range(qs: QuerySet, model_cls: Type[Model], params) -> QuerySet:
+    start_dt, end_dt = parse_date_range(params)
+    if not _has_created_at(model_cls):
+        return qs
+    if start_dt and end_dt:
+        return qs.filter(created_at__range=(start_dt, end_dt))
+    if start_dt:
+        return qs.filter(created_at__gte=start_dt)
+    if end_dt:
+        return qs.filter(created_at__lte=end_dt)
+    return qs
+
+
+def params_from_spec(spec: Dict[str, Any]) -> QueryDict:
+    """
+    Converte um filtro em JSON ({"is_active": false, "city__in": ["A", "B"]}) no
+    formato da querystring que o pipeline da listagem entende.
+    """
+    params = QueryDict(mutable=True)
+    for key, value in (spec or {}).items():
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        elif isinstance(value, (list, tuple)):
+            value = ",".join(str(v) for v in value)
+        elif value is None:
+            value = ""
+        params[str(key)] = str(value)
+    return params
+
+
+def _invalid_filters(params, lq: ListQuery) -> List[str]:
+    """
+    Chaves do filtro que o pipeline ignoraria: paginação/ordem/fields, campo ou
+    lookup desconhecido, valor vazio, data inválida (ou model sem created_at) e
+    busca em branco ou sem campos pesquisáveis.
+    """
+    invalid = []
+    start_dt, end_dt = parse_date_range(params)
+    for key, value in params.items():
+        if key in RESERVED_PARAMS:
+            invalid.append(key)
+            continue
+        if key == "search":
+            if lq.q_search is None:
+                invalid.append(key)
+            continue
+        if key in DATE_PARAMS:
+            parsed = start_dt if key.startswith("start") else end_dt
+            if parsed is None or not _has_created_at(lq.model_cls):
+                invalid.append(key)
+            continue
+        name = key if "__" in key else f"{key}__exact"
+        if name not in lq.filters:
+            invalid.append(key)
+    return invalid
+
+
+def build_list_query(helper, request, model_cls: Type[Model], params=None, *, strict: bool = False) -> ListQuery:
+    """
+    Aplica o pipeline da listagem sobre `params` (padrão: request.query_params).
+    Quem chama deve checar `unknown_fields` (?fields= com campo inexistente),
+    `invalid_filters` (com strict=True) e `qs is None` antes de usar o resultado.
+    """
+    params = request.query_params if params is None else params
+
+    catalog = helper.get_field_catalog(model_cls)
+    allowed_fields = list(catalog.allowed)
+
+    lq = ListQuery(model_cls=model_cls, qs=None, allowed_fields=allowed_fields)
+    lq.sparse_fields, lq.unknown_fields = parse_sparse_fields(params, allowed_fields)
+    if lq.unknown_fields:
+        return lq
+
+    qs = helper.get_queryset(model_cls.__name__, optimize=True, fields=lq.sparse_fields)
+    if qs is None:
+        return lq
+
+    account = getattr(request, "account", None)
+    lq.account_id = getattr(account, "id", None)
+    account_field = helper.resolver.find_account_fk_field(model_cls)
+    if account_field:
+        if not lq.account_id:
+            return lq
+        qs = qs.filter(**{f"{account_field}_id": lq.account_id})
+
+    qs = apply_date_range(qs, model_cls, params)
+    start_dt, end_dt = parse_date_range(params)
+    lq.narrowed = bool(start_dt or end_dt) and _has_created_at(model_cls)
+
+    lq.raw_search = params.get("search", "")
+    lq.q_search = build_global_search_q(model_cls, catalog, lq.raw_search, account_id=lq.account_id)
+    if lq.q_search is not None:
+        qs = qs.filter(lq.q_search)
+
+    lq.filters, lq.order_by, lq.limit, lq.offset = parse_list_query(params, catalog)
+    lq.narrowed = lq.narrowed or bool(lq.filters) or lq.q_search is not None
+    if strict:
+        lq.invalid_filters = _invalid_filters(params, lq)
+        if lq.invalid_filters:
+            return lq
+    if lq.filters:
+        qs = qs.filter(**lq.filters)
+
+    lq.qs = qs
+    return lq
@@ -0,0 +1,170 @@
+"""
+Paginação por cursor (keyset) para a ListView.
+
+Em vez de `qs[offset: offset + limit]` (que obriga o banco a varrer e descartar
+todas as linhas anteriores), o cursor guarda o valor do campo de ordenação e o
+pk da última/primeira linha da página. A próxima página é buscada com um WHERE
+"depois de (valor, pk)", que o índice consegue servir: a página 500 custa o
+mesmo que a página 1.
+
+O cursor é opaco para o cliente (base64 urlsafe de um JSON curto).
+"""
+
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple, Type
+from uuid import UUID
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Field, Model, Q, QuerySet
+from rest_framework.exceptions import ValidationError
+
+NEXT = "next"
+PREV = "prev"
+CURSOR_VALUE_ATTR = "_cursor_value"
+
+
+def _jsonable(value: Any) -> Any:
+    """Converte valores de campo em algo serializável sem perder precisão (ex.: microssegundos)."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def encode_cursor(order_key: str, value: Any, pk: Any, direction: str) -> str:
+    raw = json.dumps(
+        {"o": order_key, "v": _jsonable(value), "pk": _jsonable(pk), "d": direction},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValidationError("Cursor inválido.")
+    if not isinstance(data, dict) or data.get("d") not in (NEXT, PREV) or data.get("pk") is None:
+        raise ValidationError("Cursor inválido.")
+    return data
+
+
+class KeysetPaginator:
+    """
+    Pagina um queryset por (campo de ordenação, pk).
+    - order_by: "campo" / "-campo" já validado por parse_list_query (vazio => só pk)
+    - o pk entra sempre como desempate, na mesma direção do campo
+    - campos nulos ficam sempre no fim da ordenação (NULLS LAST), em qualquer banco
+    """
+
+    def __init__(self, model_cls: Type[Model], order_by: str = ""):
+        self.model_cls = model_cls
+        self.pk_field = model_cls._meta.pk
+        self.descending = (order_by or "").startswith("-")
+        self.field = self._resolve_field((order_by or "").lstrip("-"))
+
+    @property
+    def order_key(self) -> str:
+        name = self.field.attname if self.field is not None else "pk"
+        return f"-{name}" if self.descending else name
+
+    def _resolve_field(self, name: str) -> Optional[Field]:
+        """Só aceita colunas concretas (FK vira <campo>_id); o resto cai para ordenação por pk."""
+        if not name or name in ("pk", self.pk_field.name):
+            return None
+        try:
+            field = self.model_cls._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not getattr(field, "concrete", False) or field.many_to_many:
+            return None
+        return field
+
+    def _ordering(self, reverse: bool) -> list:
+        desc = self.descending != reverse
+        pk_col = F(self.pk_field.attname)
+        exprs = []
+        if self.field is not None:
+            col = F(self.field.attname)
+            kwargs = {}
+            if self.field.null:
+                kwargs = {"nulls_first": True} if reverse else {"nulls_last": True}
+            exprs.append(col.desc(**kwargs) if desc else col.asc(**kwargs))
+        exprs.append(pk_col.desc() if desc else pk_col.asc())
+        return exprs
+
+    def _seek(self, value: Any, pk: Any, reverse: bool) -> Q:
+        """
+        Linhas estritamente depois de (value, pk) na ordem de varredura.
+        Na ida (NEXT) os nulos ficam no fim; na volta (PREV) a ordem é invertida e eles vêm primeiro.
+        """
+        desc = self.descending != reverse
+        cmp = "lt" if desc else "gt"
+        pk_name = self.pk_field.attname
+        after_pk = Q(**{f"{pk_name}__{cmp}": pk})
+        if self.field is None:
+            return after_pk
+
+        name = self.field.attname
+        nulls_last = not reverse
+        if value is None:
+            if nulls_last:
+                return Q(**{f"{name}__isnull": True}) & after_pk
+            return Q(**{f"{name}__isnull": False}) | (Q(**{f"{name}__isnull": True}) & after_pk)
+
+        q = Q(**{f"{name}__{cmp}": value}) | (Q(**{name: value}) & after_pk)
+        if self.field.null and nulls_last:
+            q |= Q(**{f"{name}__isnull": True})
+        return q
+
+    def _to_python(self, field: Field, raw: Any) -> Any:
+        if raw is None:
+            return None
+        try:
+            return field.to_python(raw)
+        except (DjangoValidationError, TypeError, ValueError):
+            raise ValidationError("Cursor inválido.")
+
+    def _cursor_for(self, obj: Model, direction: str) -> str:
+        value = getattr(obj, CURSOR_VALUE_ATTR, None) if self.field is not None else None
+        return encode_cursor(self.order_key, value, obj.pk, direction)
+
+    def paginate(self, qs: QuerySet, token: Optional[str], limit: int) -> Tuple[List[Model], Optional[str], Optional[str]]:
+        """
+        Retorna (linhas, next_cursor, prev_cursor).
+        Sem token => primeira página.
+        """
+        cursor = decode_cursor(token) if token else None
+        if cursor and cursor.get("o") != self.order_key:
+            raise ValidationError("Cursor não corresponde à ordenação atual.")
+
+        direction = cursor["d"] if cursor else NEXT
+        reverse = direction == PREV
+
+        qs = qs.order_by(*self._ordering(reverse))
+        if self.field is not None:
+            # anotado para montar o cursor mesmo quando a coluna foi podada com .only()
+            qs = qs.annotate(**{CURSOR_VALUE_ATTR: F(self.field.attname)})
+        if cursor:
+            value = self._to_python(self.field, cursor.get("v")) if self.field is not None else None
+            pk = self._to_python(self.pk_field, cursor["pk"])
+            qs = qs.filter(self._seek(value, pk, reverse))
+
+        rows = list(qs[: limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if reverse:
+            rows.reverse()
+
+        if direction == NEXT:
+            has_next, has_prev = has_more, cursor is not None
+        else:
+            has_next, has_prev = True, has_more
+
+        next_cursor = self._cursor_for(rows[-1], NEXT) if rows and has_next else None
+        prev_cursor = self._cursor_for(rows[0], PREV) if rows and has_prev else None
+        return rows, next_cursor, prev_cursor
@@ -0,0 +1,194 @@
+"""
+Planejador de consultas derivado do serializer.
+
+Percorre os campos do serializer resolvido para o model e descobre quais
+relações ele vai ler para cada linha:
+- FK/OneToOne lidas por serializer aninhado (ou source pontilhado) => select_related
+- relações "muitos" (reverse FK, M2M, many=True) => prefetch_related
+- relações dentro de um prefetch continuam no mesmo lookup (ex.: customer_addresses__address)
+
+Com um sparse fieldset (`?fields=`), só os campos pedidos entram no plano e as
+colunas lidas são podadas com `.only()`.
+
+Campos que o planner não consegue inferir (SerializerMethodField) podem ser
+declarados no Meta do serializer:
+    class Meta:
+        prefetch_related = ("tags",)
+        select_related = ("owner",)
+Só vale para o que o método lê inteiro: prefetch de uma relação que o método
+pagina (ex.: children do BusinessSerializer) carrega todas as linhas por registro.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Type
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, QuerySet
+from rest_framework import serializers
+
+log = logging.getLogger(__name__)
+
+MAX_DEPTH = 4
+
+
+@dataclass
+class QueryPlan:
+    select_related: List[str] = field(default_factory=list)
+    prefetch_related: List[str] = field(default_factory=list)
+    only: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.select_related or self.prefetch_related or self.only)
+
+    def apply(self, qs: QuerySet) -> QuerySet:
+        if self.only:
+            qs = qs.only(*self.only)
+        if self.select_related:
+            qs = qs.select_related(*self.select_related)
+        if self.prefetch_related:
+            qs = qs.prefetch_related(*self.prefetch_related)
+        return qs
+
+    def estimated_savings(self, rows: int) -> int:
+        """
+        Estimativa de queries evitadas numa página de `rows` linhas:
+        cada caminho de select_related evitaria 1 query por linha;
+        cada lookup de prefetch troca 1 query por linha por 1 query no total.
+        """
+        if rows <= 0:
+            return 0
+        selects = sum(len(path.split("__")) for path in self.select_related)
+        prefetches = sum(len(path.split("__")) for path in self.prefetch_related)
+        return selects * rows + prefetches * (rows - 1)
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        return {
+            "select_related": list(self.select_related),
+            "prefetch_related": list(self.prefetch_related),
+            "only": list(self.only),
+        }
+
+
+class QueryPlanner:
+    """Calcula (e memoriza por classe de serializer) o QueryPlan de um model."""
+
+    _cache: Dict[Tuple[type, Type[Model], Optional[FrozenSet[str]]], QueryPlan] = {}
+
+    def plan(self, serializer_class, model_cls: Type[Model], fields: Optional[Iterable[str]] = None) -> QueryPlan:
+        names = frozenset(fields) if fields is not None else None
+        key = (serializer_class, model_cls, names)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        plan = QueryPlan()
+        try:
+            serializer = serializer_class()
+            self._walk(serializer, model_cls, prefix="", in_prefetch=False, plan=plan, depth=0, names=names)
+            self._apply_meta_hints(serializer_class, plan, names)
+            if names is not None:
+                plan.only = self._only_columns(serializer, model_cls, names)
+        except Exception as exc:
+            log.warning("QueryPlanner: não foi possível planejar %s: %s", serializer_class.__name__, exc)
+            plan = QueryPlan()
+
+        plan.select_related = self._dedupe(plan.select_related)
+        plan.prefetch_related = self._dedupe(plan.prefetch_related)
+        self._cache[key] = plan
+        return plan
+
+    def _apply_meta_hints(self, serializer_class, plan: QueryPlan, names: Optional[FrozenSet[str]]) -> None:
+        """Hints do Meta valem quando o campo do 1º segmento foi pedido (ou sem sparse fieldset)."""
+        meta = getattr(serializer_class, "Meta", None)
+        for attr, target in (("select_related", plan.select_related), ("prefetch_related", plan.prefetch_related)):
+            for path in getattr(meta, attr, ()) or ():
+                if names is None or path.split("__")[0] in names:
+                    target.append(path)
+
+    def _only_columns(self, serializer, model_cls: Type[Model], names: FrozenSet[str]) -> List[str]:
+        """
+        Colunas do model necessárias para os campos pedidos.
+        Lista vazia = não poda (campo calculado/property pode ler qualquer coluna).
+        """
+        columns = [model_cls._meta.pk.name]
+        for name in names:
+            ser_field = serializer.fields.get(name)
+            if ser_field is None or ser_field.write_only:
+                continue
+            if isinstance(ser_field, serializers.SerializerMethodField) or ser_field.source == "*":
+                return []
+            try:
+                model_field = model_cls._meta.get_field(ser_field.source.split(".")[0])
+            except FieldDoesNotExist:
+                return []
+            # colunas concretas (inclui FK); reverse/M2M são buscados por prefetch via pk
+            if getattr(model_field, "concrete", False) and not model_field.many_to_many:
+                columns.append(model_field.name)
+        return list(dict.fromkeys(columns))
+
+    def _dedupe(self, paths: List[str]) -> List[str]:
+        """Remove repetidos e caminhos já cobertos por um mais longo (a__b cobre a)."""
+        unique = list(dict.fromkeys(paths))
+        return [p for p in unique if not any(o != p and o.startswith(p + "__") for o in unique)]
+
+    def _relation_path(self, model_cls: Type[Model], source: str) -> Tuple[List[str], bool, Optional[Type[Model]]]:
+        """
+        Segue o source (ex.: "customer_addresses", "account_bind.name") pelas relações do model.
+        Retorna (segmentos relacionais, se algum é "muitos", model final).
+        """
+        path: List[str] = []
+        many = False
+        current = model_cls
+        for segment in source.split("."):
+            try:
+                model_field = current._meta.get_field(segment)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation or model_field.related_model is None:
+                break
+            path.append(segment)
+            many = many or bool(model_field.many_to_many or model_field.one_to_many)
+            current = model_field.related_model
+        return path, many, (current if path else None)
+
+    def _walk(self, serializer, model_cls: Type[Model], *, prefix: str, in_prefetch: bool, plan: QueryPlan, depth: int, names: Optional[FrozenSet[str]] = None) -> None:
+        if depth > MAX_DEPTH:
+            return
+        try:
+            fields = serializer.fields
+        except Exception as exc:
+            # serializer aninhado inválido: planeja o resto e deixa este sem otimização
+            log.warning("QueryPlanner: campos de %s indisponíveis: %s", type(serializer).__name__, exc)
+            return
+
+        for name, ser_field in fields.items():
+            if names is not None and name not in names:
+                continue
+            if ser_field.write_only or ser_field.source in (None, "*"):
+                continue
+            if isinstance(ser_field, serializers.SerializerMethodField):
+                continue
+
+            path, many, related_model = self._relation_path(model_cls, ser_field.source)
+            if not path:
+                continue
+
+            # PK simples de FK direta: o DRF usa <campo>_id, não precisa carregar nada
+            if (
+                isinstance(ser_field, serializers.PrimaryKeyRelatedField)
+                and len(path) == 1
+                and not many
+            ):
+                continue
+
+            lookup = "__".join(path)
+            full = f"{prefix}__{lookup}" if prefix else lookup
+            nested_prefetch = in_prefetch or many
+            if nested_prefetch:
+                plan.prefetch_related.append(full)
+            else:
+                plan.select_related.append(full)
+
+            child = ser_field.child if isinstance(ser_field, serializers.ListSerializer) else ser_field
+            if isinstance(child, serializers.BaseSerializer) and related_model is not None:
+                self._walk(child, related_model, prefix=full, in_prefetch=nested_prefetch, plan=plan, depth=depth + 1)
@@ -1,64 +1,37 @@
 # api/helpers/resolver.py
 from typing import Optional, Type
-from django.apps import apps as django_apps
-from django.db.models import Model, ForeignKey
-from django.utils.module_loading import import_string
+from django.db.models import Model
+from core.model_registry import (
+    model_registry,
+    find_tenant_fk,
+    is_account,
+    load_explicit_serializer,
+)
 
 class ModelResolver:
-    """Resolve modelos, serializers e metadados necessários para as operações."""
+    """
+    Resolve modelos, serializers e metadados necessários para as operações.
+    Tudo vem do registro montado no CoreConfig.ready() (lookup O(1)).
+    """
 
     def resolve_model(self, model_name: str) -> Optional[Type[Model]]:
-        name = (model_name or "").strip()
-        if not name:
-            return None
-
-        if "." in name:
-            app_label, model = name.split(".", 1)
-            return django_apps.get_model(app_label, model)
-
-        lower = name.lower()
-        for m in django_apps.get_models():
-            if m.__name__.lower() == lower:
-                return m
-        return None
+        return model_registry.get_model(model_name)
 
     def resolve_serializer_for_model(self, model_cls: Type[Model]):
-        """Tenta carregar <app_label>.serializers.<ModelName>Serializer"""
-        app_label = model_cls._meta.app_label
-        path = f"{app_label}.serializers.{model_cls.__name__}Serializer"
-        try:
-            return import_string(path)
-        except Exception:
-            return None
+        """<app_label>.serializers.<ModelName>Serializer, se existir."""
+        info = model_registry.info_for(model_cls)
+        if info is None:
+            return load_explicit_serializer(model_cls)
+        return info.serializer_class
 
     def find_account_fk_field(self, model_cls: Type[Model]) -> Optional[str]:
-        for candidate in ("Account", "account", "tenant", "Tenant"):
-            try:
-                field = model_cls._meta.get_field(candidate)
-                if isinstance(field, ForeignKey):
-                    return field.name
-            except Exception:
-                pass
-
-        try:
-            AccountModel = (
-                django_apps.get_model("core", "Account")
-                or django_apps.get_model("account", "Account")
-            )
-        except Exception:
-            AccountModel = None
-
-        if AccountModel:
-            for field in model_cls._meta.get_fields():
-                if isinstance(field, ForeignKey) and getattr(field, "remote_field", None):
-                    if field.remote_field.model is AccountModel:
-                        return field.name
-        return None
+        info = model_registry.info_for(model_cls)
+        if info is None:
+            return find_tenant_fk(model_cls)
+        return info.tenant_fk
 
     def is_account_model(self, model_cls: Type[Model]) -> bool:
-        try:
-            if model_cls.__name__.lower() == "account":
-                return True
-            return str(getattr(model_cls._meta, "label_lower", "")).endswith(".account")
-        except Exception:
-            return False
+        info = model_registry.info_for(model_cls)
+        if info is None:
+            return is_account(model_cls)
+        return info.is_account
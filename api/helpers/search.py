@@ -0,0 +1,409 @@
+"""
+Índice de busca textual para o `?search=` da ListView.
+
+Um model entra no índice declarando SEARCH_FIELDS (como EXPORT_EXCLUDE):
+    SEARCH_FIELDS = ["full_name", "document", "primary_email"]
+
+Para cada registro é mantido um SearchDocument (texto normalizado dos campos,
+sem acento e em minúsculas), regravado no post_save e removido no post_delete.
+O documento é indexado conforme o banco:
+- SQLite: tabela virtual FTS5 (external content) sincronizada por triggers
+- Postgres: coluna gerada tsvector ('simple') com índice GIN
+Ambos são criados no post_migrate do app `api`.
+
+Cada termo da busca vira um prefixo ("sao paul" => sao* AND paul*), com ranking
+(bm25 / ts_rank) quando a listagem não pede order_by. Diferente do icontains,
+não acha pedaços no meio de palavras.
+
+settings.API_SEARCH_BACKEND:
+- "auto" (padrão): índice quando o banco suporta e o model declara SEARCH_FIELDS
+- "icontains": sempre o OR de icontains antigo
+- caminho pontilhado de uma classe com a mesma interface de FullTextBackend
+
+Registros que já existiam antes do índice entram com
+`python manage.py rebuild_search_index`. Até lá (algum registro do model sem
+SearchDocument) a busca desse model continua no icontains, para não devolver
+lista vazia logo depois do migrate. O model precisa ter pk UUID.
+"""
+
+import logging
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple, Type
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, connections, router
+from django.db.models import FloatField, Model, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .resolver import ModelResolver
+
+log = logging.getLogger(__name__)
+
+RANK_ATTR = "search_rank"
+_TOKEN_RX = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_text(value: str) -> str:
+    """Minúsculas e sem acento: 'São Paulo' => 'sao paulo' (igual para documento e termos)."""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def get_search_fields(model_cls: Type[Model]) -> List[str]:
+    return list(getattr(model_cls, "SEARCH_FIELDS", None) or [])
+
+
+def search_terms(raw_search: str) -> List[List[str]]:
+    """Cada termo da busca vira a lista de tokens que o índice enxerga ('a@b.com' => ['a', 'b', 'com'])."""
+    out = []
+    for term in (raw_search or "").split():
+        tokens = _TOKEN_RX.findall(normalize_text(term))
+        if tokens:
+            out.append(tokens)
+    return out
+
+
+def build_document(instance: Model) -> str:
+    parts = []
+    for name in get_search_fields(type(instance)):
+        value = getattr(instance, name, None)
+        if value not in (None, ""):
+            parts.append(normalize_text(value))
+    return " ".join(parts)
+
+
+def _doc_model():
+    from api.models import SearchDocument
+    return SearchDocument
+
+
+class FullTextBackend:
+    """
+    Base dos backends com índice. Subclasses definem o DDL, a sintaxe de query
+    e os trechos SQL de match/rank sobre a tabela de SearchDocument (alias `d`).
+    """
+
+    vendor = ""
+
+    def __init__(self):
+        self._installed: Dict[str, bool] = {}
+        # (alias, label) dos models com todos os registros indexados; só guarda o "sim",
+        # depois disso os signals e os helpers de bulk mantêm o índice completo
+        self._backfilled: Dict[Tuple[str, str], bool] = {}
+
+    # ---- DDL ----
+    def install_statements(self, doc_table: str) -> List[str]:
+        raise NotImplementedError
+
+    def installed_check(self, doc_table: str):
+        """(sql, params) que retorna alguma linha quando o índice existe."""
+        raise NotImplementedError
+
+    def install(self, connection) -> None:
+        doc_table = _doc_model()._meta.db_table
+        with connection.cursor() as cursor:
+            for sql in self.install_statements(doc_table):
+                cursor.execute(sql)
+        self._installed[connection.alias] = True
+
+    def is_ready(self, connection) -> bool:
+        ready = self._installed.get(connection.alias)
+        if ready is None:
+            sql, params = self.installed_check(_doc_model()._meta.db_table)
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    ready = cursor.fetchone() is not None
+            except DatabaseError:
+                ready = False
+            self._installed[connection.alias] = ready
+        return ready
+
+    def is_backfilled(self, model_cls: Type[Model], connection) -> bool:
+        """Todo registro do model tem SearchDocument (rebuild_search_index já rodou)?"""
+        key = (connection.alias, model_cls._meta.label_lower)
+        if self._backfilled.get(key):
+            return True
+        content_type = ContentType.objects.get_for_model(model_cls)
+        indexed = _doc_model().objects.filter(content_type=content_type).values("object_id")
+        missing = model_cls._base_manager.using(connection.alias).exclude(pk__in=indexed).exists()
+        if missing:
+            log.info("Índice de busca de %s incompleto: usando icontains até rodar rebuild_search_index.",
+                     model_cls._meta.label)
+            return False
+        self._backfilled[key] = True
+        return True
+
+    def mark_backfilled(self, model_cls: Type[Model], connection) -> None:
+        self._backfilled[(connection.alias, model_cls._meta.label_lower)] = True
+
+    # ---- consulta ----
+    def to_query(self, terms: List[List[str]]) -> str:
+        raise NotImplementedError
+
+    def match_sql(self, doc_table: str) -> str:
+        """FROM ... WHERE <match %s> AND d.content_type_id = %s"""
+        raise NotImplementedError
+
+    def rank_sql(self, doc_table: str) -> str:
+        raise NotImplementedError
+
+    def rank_params(self, query: str) -> list:
+        return []
+
+    def _base_params(self, model_cls: Type[Model], query: str, account_id, connection):
+        doc_model = _doc_model()
+        params = [query, ContentType.objects.get_for_model(model_cls).pk]
+        extra = ""
+        if account_id:
+            extra = " AND d.account_id = %s"
+            params.append(doc_model._meta.get_field("account_id").get_db_prep_value(account_id, connection))
+        return params, extra
+
+    def filter_q(self, model_cls: Type[Model], terms: List[List[str]], account_id=None) -> Q:
+        connection = connections[router.db_for_read(model_cls)]
+        doc_table = _doc_model()._meta.db_table
+        query = self.to_query(terms)
+        params, extra = self._base_params(model_cls, query, account_id, connection)
+        sql = f"SELECT d.object_id {self.match_sql(doc_table)}{extra}"
+        return Q(pk__in=RawSQL(sql, params))
+
+    def annotate_rank(self, qs: QuerySet, model_cls: Type[Model], terms: List[List[str]], account_id=None) -> QuerySet:
+        connection = connections[router.db_for_read(model_cls)]
+        qn = connection.ops.quote_name
+        doc_table = _doc_model()._meta.db_table
+        query = self.to_query(terms)
+        params, extra = self._base_params(model_cls, query, account_id, connection)
+        outer_pk = f"{qn(model_cls._meta.db_table)}.{qn(model_cls._meta.pk.column)}"
+        sql = (
+            f"SELECT {self.rank_sql(doc_table)} {self.match_sql(doc_table)}{extra}"
+            f" AND d.object_id = {outer_pk}"
+        )
+        rank = RawSQL(sql, self.rank_params(query) + params, output_field=FloatField())
+        return qs.annotate(**{RANK_ATTR: rank}).order_by(f"-{RANK_ATTR}", "pk")
+
+
+class SqliteFTSBackend(FullTextBackend):
+    vendor = "sqlite"
+
+    def _fts(self, doc_table: str) -> str:
+        return f"{doc_table}_fts"
+
+    def install_statements(self, doc_table: str) -> List[str]:
+        fts = self._fts(doc_table)
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"document, content='{doc_table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {doc_table} BEGIN "
+            f"INSERT INTO {fts}(rowid, document) VALUES (new.id, new.document); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {doc_table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, document) VALUES ('delete', old.id, old.document); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {doc_table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, document) VALUES ('delete', old.id, old.document); "
+            f"INSERT INTO {fts}(rowid, document) VALUES (new.id, new.document); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+
+    def installed_check(self, doc_table: str):
+        return "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self._fts(doc_table)]
+
+    def to_query(self, terms: List[List[str]]) -> str:
+        # tokens são só \w: nunca trazem aspas nem operadores do FTS5
+        return " AND ".join('"%s"*' % " ".join(tokens) for tokens in terms)
+
+    def match_sql(self, doc_table: str) -> str:
+        fts = self._fts(doc_table)
+        return (
+            f"FROM {fts} JOIN {doc_table} d ON d.id = {fts}.rowid "
+            f"WHERE {fts} MATCH %s AND d.content_type_id = %s"
+        )
+
+    def rank_sql(self, doc_table: str) -> str:
+        # bm25 é "menor = melhor"; invertido para ordenar igual ao ts_rank
+        return f"-bm25({self._fts(doc_table)})"
+
+
+class PostgresFTSBackend(FullTextBackend):
+    vendor = "postgresql"
+
+    def install_statements(self, doc_table: str) -> List[str]:
+        return [
+            f"ALTER TABLE {doc_table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('simple', coalesce(document, ''))) STORED",
+            f"CREATE INDEX IF NOT EXISTS {doc_table}_search_gin ON {doc_table} USING GIN (search_vector)",
+        ]
+
+    def installed_check(self, doc_table: str):
+        return (
+            "SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = 'search_vector'",
+            [doc_table],
+        )
+
+    def to_query(self, terms: List[List[str]]) -> str:
+        phrases = []
+        for tokens in terms:
+            words = tokens[:-1] + [f"{tokens[-1]}:*"]
+            phrases.append("(" + " <-> ".join(words) + ")")
+        return " & ".join(phrases)
+
+    def match_sql(self, doc_table: str) -> str:
+        return (
+            f"FROM {doc_table} d "
+            f"WHERE d.search_vector @@ to_tsquery('simple', %s) AND d.content_type_id = %s"
+        )
+
+    def rank_sql(self, doc_table: str) -> str:
+        return "ts_rank(d.search_vector, to_tsquery('simple', %s))"
+
+    def rank_params(self, query: str) -> list:
+        return [query]
+
+
+FULLTEXT_BACKENDS: Dict[str, FullTextBackend] = {
+    SqliteFTSBackend.vendor: SqliteFTSBackend(),
+    PostgresFTSBackend.vendor: PostgresFTSBackend(),
+}
+_custom_backend: Dict[str, FullTextBackend] = {}
+
+
+def _backend_setting() -> str:
+    return (getattr(settings, "API_SEARCH_BACKEND", "auto") or "auto").strip()
+
+
+def search_index_enabled() -> bool:
+    return _backend_setting().lower() != "icontains"
+
+
+def backend_for_connection(connection) -> Optional[FullTextBackend]:
+    name = _backend_setting()
+    if name.lower() == "icontains":
+        return None
+    if name.lower() in ("auto", "fts"):
+        return FULLTEXT_BACKENDS.get(connection.vendor)
+    if name not in _custom_backend:
+        _custom_backend[name] = import_string(name)()
+    return _custom_backend[name]
+
+
+def get_search_backend(model_cls: Type[Model]) -> Optional[FullTextBackend]:
+    """Backend com índice pronto e preenchido para o model, ou None (=> fallback icontains)."""
+    if not get_search_fields(model_cls):
+        return None
+    connection = connections[router.db_for_read(model_cls)]
+    backend = backend_for_connection(connection)
+    if backend is None or not backend.is_ready(connection):
+        return None
+    if not backend.is_backfilled(model_cls, connection):
+        return None
+    return backend
+
+
+def annotate_search_rank(qs: QuerySet, model_cls: Type[Model], raw_search: str, account_id=None) -> QuerySet:
+    """Ordena por relevância quando o índice atende a busca; senão devolve o qs intacto."""
+    terms = search_terms(raw_search)
+    backend = get_search_backend(model_cls) if terms else None
+    if backend is None:
+        return qs
+    return backend.annotate_rank(qs, model_cls, terms, account_id)
+
+
+def install_search_index(using: str) -> None:
+    connection = connections[using]
+    backend = backend_for_connection(connection)
+    if backend is None:
+        return
+    try:
+        backend.install(connection)
+    except DatabaseError as exc:
+        log.warning("Índice de busca não instalado em %s: %s", using, exc)
+
+
+# ---- manutenção dos documentos ----
+
+def _account_id_for(instance: Model):
+    account_field = ModelResolver().find_account_fk_field(type(instance))
+    return getattr(instance, f"{account_field}_id", None) if account_field else None
+
+
+def index_instance(instance: Model) -> None:
+    model_cls = instance._meta.concrete_model
+    _doc_model().objects.update_or_create(
+        content_type=ContentType.objects.get_for_model(model_cls),
+        object_id=instance.pk,
+        defaults={
+            "account_id": _account_id_for(instance),
+            "document": build_document(instance),
+            "updated_at": timezone.now(),
+        },
+    )
+
+
+def index_new_instances(model_cls: Type[Model], instances, batch_size: int = 500) -> None:
+    """Documentos de objetos recém-criados em lote (bulk_create não dispara post_save)."""
+    doc_model = _doc_model()
+    content_type = ContentType.objects.get_for_model(model_cls._meta.concrete_model)
+    now = timezone.now()
+    doc_model.objects.bulk_create(
+        [
+            doc_model(
+                content_type=content_type,
+                object_id=instance.pk,
+                account_id=_account_id_for(instance),
+                document=build_document(instance),
+                updated_at=now,
+            )
+            for instance in instances
+        ],
+        batch_size=batch_size,
+    )
+
+
+def reindex_instances(model_cls: Type[Model], instances, batch_size: int = 500) -> None:
+    """Regrava os documentos de objetos alterados em lote (bulk_update também não dispara post_save)."""
+    content_type = ContentType.objects.get_for_model(model_cls._meta.concrete_model)
+    _doc_model().objects.filter(
+        content_type=content_type, object_id__in=[instance.pk for instance in instances]
+    ).delete()
+    index_new_instances(model_cls, instances, batch_size=batch_size)
+
+
+def remove_instance(instance: Model) -> None:
+    model_cls = instance._meta.concrete_model
+    _doc_model().objects.filter(
+        content_type=ContentType.objects.get_for_model(model_cls),
+        object_id=instance.pk,
+    ).delete()
+
+
+def rebuild_index(model_cls: Type[Model], batch_size: int = 500) -> int:
+    """Regrava todos os documentos do model. Retorna quantos foram indexados."""
+    doc_model = _doc_model()
+    content_type = ContentType.objects.get_for_model(model_cls)
+    doc_model.objects.filter(content_type=content_type).delete()
+
+    total = 0
+    batch = []
+    now = timezone.now()
+    for instance in model_cls._default_manager.all().iterator(chunk_size=batch_size):
+        batch.append(doc_model(
+            content_type=content_type,
+            object_id=instance.pk,
+            account_id=_account_id_for(instance),
+            document=build_document(instance),
+            updated_at=now,
+        ))
+        if len(batch) >= batch_size:
+            doc_model.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        doc_model.objects.bulk_create(batch)
+        total += len(batch)
+
+    connection = connections[router.db_for_write(doc_model)]
+    backend = backend_for_connection(connection)
+    if backend is not None:
+        backend.mark_backfilled(model_cls, connection)
+    return total
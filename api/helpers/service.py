@@ -1,11 +1,14 @@
 # api/helpers/service.py
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Iterable, Tuple, Type
 from django.db.models import Model, QuerySet
 from rest_framework.exceptions import ValidationError
 from .resolver import ModelResolver
 from .tenancy import AccountScope
 from .errors import ErrorBuilder, UniqueErrorParser
 from .drf_adapter import DRFSerializerAdapter
+from .query_planner import QueryPlan, QueryPlanner
+from .field_catalog import FieldCatalog, get_field_catalog
+from .bulk import BulkCreator, BulkResult, BulkSetter, BulkUpdater
 
 class ModelService:
     def __init__(self, request):
@@ -15,26 +18,105 @@ class ModelService:
         self.errors = ErrorBuilder()
         self.unique = UniqueErrorParser()
         self.serializer = DRFSerializerAdapter(self.resolver)
+        self.planner = QueryPlanner()
+        # identity map da request: (model, pk) => instância já carregada
+        self._identity: Dict[Tuple[Type[Model], str], Model] = {}
 
-    def get_queryset(self, model_name: str) -> Optional[QuerySet]:
+    def get_queryset(self, model_name: str, *, optimize: bool = False, fields: Optional[Iterable[str]] = None) -> Optional[QuerySet]:
+        """
+        Queryset já restrito ao tenant.
+        optimize=True aplica select_related/prefetch_related derivados do serializer (leituras);
+        com `fields` (sparse fieldset) o plano cobre só esses campos e poda colunas com .only().
+        """
         model_cls = self.resolver.resolve_model(model_name)
         if not model_cls:
             return None
-        return self.scope.get_queryset(model_cls)
+        qs = self.scope.get_queryset(model_cls)
+        if qs is not None and optimize:
+            qs = self.get_query_plan(model_cls, fields).apply(qs)
+        return qs
+
+    def get_query_plan(self, model_cls, fields: Optional[Iterable[str]] = None) -> QueryPlan:
+        return self.planner.plan(self.serializer.get_serializer_class(model_cls), model_cls, fields)
 
-    def get_one(self, model_name: str, pk: Any) -> Optional[Model]:
-        qs = self.get_queryset(model_name)
+    def get_one(self, model_name: str, pk: Any, *, optimize: bool = False, fields: Optional[Iterable[str]] = None) -> Optional[Model]:
+        """
+        Busca (model, pk) no tenant, uma vez por request: chamadas seguintes
+        (ex.: PutView => update_one) reaproveitam a mesma instância.
+        Instâncias podadas por sparse fieldset (.only()) não entram no mapa.
+        """
+        model_cls = self.resolver.resolve_model(model_name)
+        if not model_cls:
+            return None
+        key = (model_cls, str(pk))
+        cached = self._identity.get(key)
+        if cached is not None:
+            return cached
+
+        qs = self.get_queryset(model_name, optimize=optimize, fields=fields)
         if qs is None:
             return None
-        return qs.filter(pk=pk).first() or None
+        obj = qs.filter(pk=pk).first() or None
+        if obj is not None and fields is None:
+            self._identity[key] = obj
+        return obj
+
+    def forget(self, instance: Model) -> None:
+        self._identity.pop((type(instance), str(instance.pk)), None)
 
-    def serialize_instance(self, model_name, instance):
-        return self.serializer.serialize_instance(model_name, instance)
+    def serialize_instance(self, model_name, instance, fields=None):
+        return self.serializer.serialize_instance(model_name, instance, fields=fields)
+
+    def serialize_many(self, model_name, instances, fields=None):
+        return self.serializer.serialize_many(model_name, instances, fields=fields)
 
     def create_one(self, model_name, payload):
         obj = self.serializer.create(model_name, payload, context={"request": self.request})
         return self.serializer.serialize_instance(model_name, obj)
 
+    def bulk_create(self, model_name: str, items: list, *, batch_size: int = 500) -> Optional[BulkResult]:
+        """Valida e cria vários objetos de uma vez (ver api.helpers.bulk). None se o model não existe."""
+        model_cls = self.resolver.resolve_model(model_name)
+        if not model_cls:
+            return None
+        creator = BulkCreator(
+            model_cls,
+            self.serializer.get_serializer_class(model_cls),
+            context={"request": self.request},
+            tenant_fk=self.resolver.find_account_fk_field(model_cls),
+            batch_size=batch_size,
+        )
+        return creator.run(items)
+
+    def bulk_update(self, model_name: str, items: list, *, batch_size: int = 500) -> Optional[BulkResult]:
+        """Atualização parcial de vários objetos do tenant ([{id, ...mudanças}]). None se o model não existe."""
+        model_cls = self.resolver.resolve_model(model_name)
+        qs = self.get_queryset(model_name) if model_cls else None
+        if qs is None:
+            return None
+        updater = BulkUpdater(
+            model_cls,
+            self.serializer.get_serializer_class(model_cls),
+            context={"request": self.request},
+            tenant_fk=self.resolver.find_account_fk_field(model_cls),
+            batch_size=batch_size,
+        )
+        return updater.run(qs, items)
+
+    def bulk_set(self, model_name: str, queryset, values: dict, *, batch_size: int = 500, on_progress=None) -> Optional[int]:
+        """Mesmo {campo: valor} em todo o queryset do tenant (um UPDATE). None se o model não existe."""
+        model_cls = self.resolver.resolve_model(model_name)
+        if not model_cls:
+            return None
+        setter = BulkSetter(
+            model_cls,
+            self.serializer.get_serializer_class(model_cls),
+            context={"request": self.request},
+            tenant_fk=self.resolver.find_account_fk_field(model_cls),
+            batch_size=batch_size,
+        )
+        return setter.run(queryset, values, on_progress=on_progress)
+
     def update_one(self, model_name, pk, payload):
         instance = self.get_one(model_name, pk)
         if not instance:
@@ -49,17 +131,22 @@ class ModelService:
         return self.serializer.serialize_instance(model_name, obj)
 
     def delete_one(self, model_name: str, pk: Any) -> bool:
-        model_cls = self.resolver.resolve_model(model_name)
-        if not model_cls:
-            return False
-        qs = self.scope.get_queryset(model_cls)
-        if qs is None:
-            return False
-        obj = qs.filter(pk=pk).first()
+        obj = self.get_one(model_name, pk)
         if not obj:
             return False
+        self.forget(obj)
         obj.delete()
         return True
 
     def get_serializer_fields(self, model_cls):
         return self.serializer.get_serializer_fields(model_cls)
+
+    def get_readable_fields(self, model_cls):
+        return self.serializer.get_readable_fields(model_cls)
+
+    def get_field_catalog(self, model_cls) -> FieldCatalog:
+        return get_field_catalog(
+            model_cls,
+            self.serializer.get_serializer_class(model_cls),
+            lambda: self.serializer.get_serializer_fields(model_cls),
+        )
@@ -0,0 +1,102 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+from core.throttling import LOG, MultiWindowRateThrottle, _local_log, _redis_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o throttle por Account: lista de timestamps do SimpleRateThrottle, "
+        "sliding log e sliding window counter do MultiWindowRateThrottle, no cache configurado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--users", type=int, default=20, help="usuários distintos no mesmo Account")
+
+    def handle(self, *args, **options):
+        total, threads, users = options["requests"], options["threads"], options["users"]
+        backend = "redis" if _redis_client() is not None else "memória do processo"
+        self.stdout.write(f"{total} requests, {threads} threads, {users} usuários, backend: {backend}")
+
+        # limites altos: mede custo e estado, não bloqueio
+        rates = {"account:1hour": f"{total * 10}/hour", "account:1day": f"{total * 10}/day"}
+        slug = f"bench-{uuid.uuid4().hex[:8]}"
+
+        class HistoryThrottle(SimpleRateThrottle):
+            rate = f"{total * 10}/day"
+
+            def get_cache_key(self, request, view):
+                return self.cache_format % {"scope": "account", "ident": f"acct:{slug}"}
+
+        class LogThrottle(MultiWindowRateThrottle):
+            THROTTLE_RATES = rates
+            scope_prefixes = ("account",)
+            counter_prefixes = ()
+
+        class CounterThrottle(MultiWindowRateThrottle):
+            THROTTLE_RATES = rates
+            scope_prefixes = ("account",)
+
+        factory = RequestFactory()
+
+        for name, throttle_cls in (
+            ("SimpleRateThrottle (lista)", HistoryThrottle),
+            ("sliding log", LogThrottle),
+            ("sliding counter", CounterThrottle),
+        ):
+            account = SimpleNamespace(slug=f"{slug}-{throttle_cls.__name__.lower()}")
+            requests = []
+            for i in range(total):
+                request = factory.get("/api/bench")
+                request.user = SimpleNamespace(pk=i % users, is_authenticated=True)
+                request.account = account
+                requests.append(request)
+
+            def hit(request, throttle_cls=throttle_cls):
+                started = time.perf_counter()
+                throttle_cls().allow_request(request, None)
+                return time.perf_counter() - started
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                latencies = sorted(pool.map(hit, requests))
+            elapsed = time.perf_counter() - started
+
+            recorded, state = self._state(throttle_cls, requests[0])
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            self.stdout.write(
+                f"{name:28} {total / elapsed:9.0f} req/s  p50 {p50:.3f}ms  p99 {p99:.3f}ms  "
+                f"registradas {recorded}/{total}  estado: {state}"
+            )
+
+    def _state(self, throttle_cls, request):
+        """(requests contabilizadas na maior janela, tamanho do estado guardado)."""
+        if issubclass(throttle_cls, SimpleRateThrottle):
+            throttle = throttle_cls()
+            history = caches["default"].get(throttle.get_cache_key(request, None)) or []
+            return len(history), f"lista com {len(history)} timestamps"
+
+        key, window, _, mode = max(throttle_cls().build_checks(request), key=lambda check: check[1])
+        client = _redis_client()
+        if mode == LOG:
+            if client is not None:
+                size = client.zcard(caches["default"].make_key(key))
+            else:
+                size = len(_local_log._logs.get(key, []))
+            return size, f"sorted set com {size} membros"
+
+        if client is not None:
+            counter_keys = client.keys(f"{caches['default'].make_key(key)}:*")
+            recorded = sum(int(client.get(k) or 0) for k in counter_keys if k.decode().split(":")[-2] == str(window * 1000))
+            return recorded, f"{len(counter_keys)} contadores inteiros"
+        counters = {k: v for k, v in _local_log._counters.items() if k[0] == key}
+        recorded = sum(v for k, v in counters.items() if k[1] == window)
+        return recorded, f"{len(counters)} contadores inteiros"
@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from api.helpers.search import get_search_fields, install_search_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Recria os documentos de busca (SearchDocument) dos models com SEARCH_FIELDS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="app_label.Model (padrão: todos os indexáveis)")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["models"]:
+            try:
+                targets = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as exc:
+                raise CommandError(str(exc))
+        else:
+            targets = [m for m in apps.get_models() if get_search_fields(m)]
+
+        install_search_index(DEFAULT_DB_ALIAS)
+        for model_cls in targets:
+            if not get_search_fields(model_cls):
+                self.stdout.write(self.style.WARNING(f"{model_cls._meta.label}: sem SEARCH_FIELDS, ignorado."))
+                continue
+            total = rebuild_index(model_cls, batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{model_cls._meta.label}: {total} documentos."))
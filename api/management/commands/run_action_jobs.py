@@ -0,0 +1,71 @@
+import multiprocessing
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connections
+from api.actions.jobs import claim_next_job, requeue_stale_jobs, run_job, worker_name
+
+
+def _worker_loop(poll_interval: float, once: bool) -> int:
+    """Reivindica e executa jobs até a fila esvaziar (--once) ou para sempre."""
+    name = worker_name()  # host:pid do próprio processo (nos forks, o pid do filho)
+    processed = 0
+    while True:
+        close_old_connections()
+        try:
+            requeue_stale_jobs(name)
+            job = claim_next_job(name)
+        except OperationalError:
+            # outro worker segurando o banco (SQLite); tenta de novo no próximo ciclo
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        try:
+            run_job(job)
+        except OperationalError:
+            # nem o desfecho pôde ser gravado; o próximo requeue_stale_jobs(name) devolve o job à fila
+            time.sleep(poll_interval)
+        processed += 1
+
+
+class Command(BaseCommand):
+    help = "Executa os ActionJob enfileirados pelas actions assíncronas (run_async / {\"async\": true})."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Processos worker (padrão: 1, no próprio processo)")
+        parser.add_argument("--once", action="store_true", help="Sai quando a fila esvaziar")
+        parser.add_argument("--poll-interval", type=float, default=None)
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers deve ser >= 1.")
+        poll_interval = options["poll_interval"]
+        if poll_interval is None:
+            poll_interval = float(getattr(settings, "ACTION_JOB_POLL_INTERVAL", 1.0))
+
+        if workers == 1:
+            processed = _worker_loop(poll_interval, options["once"])
+            self.stdout.write(self.style.SUCCESS(f"{processed} job(s) executado(s)."))
+            return
+
+        # fork: os filhos herdam o Django já configurado; conexões abertas não podem ir junto
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        procs = [
+            ctx.Process(target=_worker_loop, args=(poll_interval, options["once"]), daemon=True)
+            for _ in range(workers)
+        ]
+        for proc in procs:
+            proc.start()
+        try:
+            for proc in procs:
+                proc.join()
+        except KeyboardInterrupt:
+            for proc in procs:
+                proc.terminate()
+        self.stdout.write(self.style.SUCCESS(f"{workers} worker(s) finalizado(s)."))
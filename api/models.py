@@ -1,3 +1,95 @@
+import uuid
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class SearchDocument(models.Model):
+    """
+    Documento de busca de um registro: texto dos campos SEARCH_FIELDS do model.
+    Indexado por FTS5 (SQLite) ou tsvector + GIN (Postgres); ver api/helpers/search.py.
+    O id inteiro serve de rowid para a tabela FTS5.
+    Fora da API genérica: account_id é UUID solto (não FK), sem escopo de tenant na listagem.
+    """
+    API_EXPOSED = False
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.UUIDField()
+    account_id = models.UUIDField(blank=True, null=True)
+    document = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Search document"
+        verbose_name_plural = "Search documents"
+        constraints = [
+            models.UniqueConstraint(fields=["content_type", "object_id"], name="uniq_searchdocument_object"),
+        ]
+        indexes = [
+            models.Index(fields=["content_type", "account_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id}"
+
+
+class ActionJob(models.Model):
+    """
+    Execução em segundo plano de uma action (BaseAction.run_async ou {"async": true}).
+    Enfileirada pela ActionView e executada pelo comando `run_action_jobs`, que
+    reivindica cada job com um UPDATE condicional (status=queued -> running).
+    Fora da API genérica: o worker confia em account_id/user, então só a ActionView cria jobs.
+    """
+    API_EXPOSED = False
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Na fila"),
+        (STATUS_RUNNING, "Executando"),
+        (STATUS_SUCCEEDED, "Concluído"),
+        (STATUS_FAILED, "Falhou"),
+        (STATUS_CANCELLED, "Cancelado"),
+    ]
+    FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    account_id = models.UUIDField(blank=True, null=True, db_index=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True, related_name="+")
+    model_name = models.CharField(max_length=100)
+    action_name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    cancel_requested = models.BooleanField(default=False)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default="")
+
+    worker = models.CharField(max_length=100, blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Action job"
+        verbose_name_plural = "Action jobs"
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name}.{self.action_name} [{self.status}]"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in self.FINISHED_STATUSES
@@ -1,6 +1,7 @@
 # api/permissions.py
 from django.core.exceptions import PermissionDenied
-from django.apps import apps as django_apps
+from core.model_registry import model_registry
+from core.utils.permission_cache import user_has_perm
 from typing import Iterable
 
 ACTIONS = {
@@ -12,17 +13,7 @@ ACTIONS = {
 }
 
 def resolve_model(model_name: str):
-    model_name = (model_name or "").strip()
-    if not model_name:
-        return None
-    if "." in model_name:
-        app_label, name = model_name.split(".", 1)
-        return django_apps.get_model(app_label, name)
-    name_lower = model_name.lower()
-    for model in django_apps.get_models():
-        if model.__name__.lower() == name_lower:
-            return model
-    return None
+    return model_registry.get_model(model_name)
 
 def build_perm_codename(model_cls, action: str) -> str:
     """Retorna 'app_label.action_modelname', ex.: 'core.view_user'."""
@@ -76,12 +67,13 @@ def require_model_permission(
         raise PermissionDenied("Modelo inválido.")
     
     perm = build_perm_codename(model_cls, action)
-    
-    for perm in allow_all:
+
+    # conjunto de permissões vem do cache (core.utils.permission_cache), não do ModelBackend
+    if any(user_has_perm(user, p) for p in allow_all):
         return
         
     if allow_self and allow_self_user_exception(user, model_cls, action, obj):
         return
 
-    if not user.has_perm(perm):
+    if not user_has_perm(user, perm):
         raise PermissionDenied(f"Permissão negada: é necessário '{perm}'.")
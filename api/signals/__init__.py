@@ -0,0 +1,12 @@
+from .cache_invalidation import (
+    bump_version_on_save,
+    bump_version_on_delete,
+    bump_version_on_m2m_change,
+    connect_cache_invalidation,
+)
+from .search_index import (
+    connect_search_index,
+    index_search_document_on_save,
+    remove_search_document_on_delete,
+    install_search_index_on_migrate,
+)
@@ -0,0 +1,44 @@
+# api/signals/cache_invalidation.py
+"""
+Receivers ligados por model rastreado (sender=model_cls), não globais: um
+receiver de post_delete sem sender faz o Collector do Django desistir do
+fast-delete (DELETE ... WHERE direto) em todos os models do projeto.
+"""
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from api.helpers.cache_versions import bump_model_version, is_tracked_model
+
+
+def bump_version_on_save(sender, **kwargs):
+    """Qualquer escrita invalida contagens/listagens cacheadas do model."""
+    bump_model_version(sender)
+
+
+def bump_version_on_delete(sender, **kwargs):
+    bump_model_version(sender)
+
+
+def bump_version_on_m2m_change(sender, instance, action, model, **kwargs):
+    """add/remove/clear não passam por post_save: invalida a tabela through e os dois lados."""
+    if not action.startswith("post_"):
+        return
+    for model_cls in (sender, type(instance), model):
+        if model_cls is not None and is_tracked_model(model_cls):
+            bump_model_version(model_cls)
+
+
+def connect_cache_invalidation() -> None:
+    """Chamado no ready(): liga os receivers acima em cada model rastreado e nas tabelas through dele."""
+    for model_cls in apps.get_models():
+        if not is_tracked_model(model_cls):
+            continue
+        label = model_cls._meta.label_lower
+        post_save.connect(bump_version_on_save, sender=model_cls, dispatch_uid=f"api:ver:save:{label}")
+        post_delete.connect(bump_version_on_delete, sender=model_cls, dispatch_uid=f"api:ver:delete:{label}")
+        for m2m in model_cls._meta.local_many_to_many:
+            through = m2m.remote_field.through
+            m2m_changed.connect(
+                bump_version_on_m2m_change,
+                sender=through,
+                dispatch_uid=f"api:ver:m2m:{through._meta.label_lower}",
+            )
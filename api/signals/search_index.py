@@ -0,0 +1,45 @@
+# api/signals/search_index.py
+"""
+Save/delete ligados só nos models com SEARCH_FIELDS (sender=model_cls), como
+em cache_invalidation: sem sender, o post_delete desliga o fast-delete de todos.
+"""
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+from api.helpers.search import (
+    get_search_fields,
+    index_instance,
+    install_search_index,
+    remove_instance,
+    search_index_enabled,
+)
+
+
+def index_search_document_on_save(sender, instance, raw=False, **kwargs):
+    """Regrava o documento de busca de models com SEARCH_FIELDS."""
+    if raw or not search_index_enabled():
+        return
+    index_instance(instance)
+
+
+def remove_search_document_on_delete(sender, instance, **kwargs):
+    if not search_index_enabled():
+        return
+    remove_instance(instance)
+
+
+def connect_search_index() -> None:
+    """Chamado no ready(): liga os receivers acima nos models que declaram SEARCH_FIELDS."""
+    for model_cls in apps.get_models():
+        if not get_search_fields(model_cls):
+            continue
+        label = model_cls._meta.label_lower
+        post_save.connect(index_search_document_on_save, sender=model_cls, dispatch_uid=f"api:search:save:{label}")
+        post_delete.connect(remove_search_document_on_delete, sender=model_cls, dispatch_uid=f"api:search:delete:{label}")
+
+
+@receiver(post_migrate)
+def install_search_index_on_migrate(sender, using="default", **kwargs):
+    """Cria a tabela FTS5/coluna tsvector depois que a tabela de SearchDocument existe."""
+    if getattr(sender, "label", None) == "api":
+        install_search_index(using)
@@ -1,3 +1,861 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import socket
+import subprocess
+import sys
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from auditlog.models import LogEntry
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.deletion import Collector
+from django.db.models.signals import post_delete
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from api.actions.jobs import requeue_stale_jobs
+from api.helpers.cache_versions import bump_model_version
+from api.helpers.counting import ListCounter
+from api.helpers.pagination import encode_cursor
+from api.helpers.search import backend_for_connection, get_search_backend
+from api.models import ActionJob, SearchDocument
+from core.throttling import COUNTER, MultiWindowRateThrottle, _local_log, counter_wait
+from core.model_registry import model_registry
+from core.models import Account, AccountGroup, Address, Business, BusinessType, Customer, User
+from core.utils.generate_unique_code import reserve_codes
+from core.utils.permission_cache import _LOCAL, user_has_perm
 
-# Create your tests here.
+
+class IdentityMapQueryCountTests(TestCase):
+    """PUT/DELETE carregam a linha do objeto uma única vez por request."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.user = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()  # janelas do throttle por usuário (sem Redis ficam no processo)
+        self.customer = Customer.objects.create(Account=self.account, full_name="Cliente", document="123")
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+
+    def _customer_selects(self, ctx) -> int:
+        """
+        SELECTs da API na tabela de Customer (sempre filtrados pelo tenant).
+        O auditlog relê a linha no pre_save para montar o diff; essa leitura não conta.
+        """
+        table = connection.ops.quote_name(Customer._meta.db_table)
+        tenant_col = f'{table}.{connection.ops.quote_name("Account_id")}'
+        return sum(
+            1 for q in ctx.captured_queries
+            if q["sql"].lstrip().upper().startswith("SELECT")
+            and f"FROM {table}" in q["sql"]
+            and tenant_col in q["sql"].split("WHERE", 1)[-1]
+        )
+
+    def test_put_fetches_row_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.put(
+                f"/api/customer/{self.customer.pk}/update", {"full_name": "Renomeado"}, format="json"
+            )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["customer"]["full_name"], "Renomeado")
+        self.assertEqual(self._customer_selects(ctx), 1)
+
+    def test_delete_fetches_row_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.delete(f"/api/customer/{self.customer.pk}/delete")
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(Customer.objects.filter(pk=self.customer.pk).exists())
+        self.assertEqual(self._customer_selects(ctx), 1)
+
+    def test_get_fetches_row_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(f"/api/customer/{self.customer.pk}")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._customer_selects(ctx), 1)
+
+
+class ConditionalListTests(TestCase):
+    """ETag da listagem vem da versão do model: 304 sem consultar a tabela, e exclusões trocam o ETag."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.user = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()
+        self.customers = [
+            Customer.objects.create(Account=self.account, full_name=f"Cliente {i}", document=str(i))
+            for i in range(2)
+        ]
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+
+    def test_matching_etag_answers_304_without_touching_the_table(self):
+        first = self.client.get("/api/customer/list")
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn("Last-Modified", first)
+
+        table = connection.ops.quote_name(Customer._meta.db_table)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/customer/list", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(resp.status_code, 304)
+        self.assertFalse([q for q in ctx.captured_queries if f"FROM {table}" in q["sql"]])
+
+    def test_delete_changes_etag_and_if_modified_since_is_ignored(self):
+        first = self.client.get("/api/customer/list")
+        since = self.client.get("/api/customer/list", HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+        self.assertEqual(since.status_code, 200)
+
+        self.customers[0].delete()
+        resp = self.client.get("/api/customer/list", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["count"], 1)
+        self.assertNotEqual(resp["ETag"], first["ETag"])
+
+
+class ListCacheTests(TestCase):
+    """Cache da ListView isolado por tenant e privilégio, trocado por qualquer escrita; modos de ?count=."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.other = Account.objects.create(slug="other", legal_name="Other", display_name="Other")
+        cls.root = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+        cls.other_root = User.objects.create_superuser(
+            username="root2", email="root2@example.com", password="x", Account=cls.other
+        )
+        cls.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="x", Account=cls.account
+        )
+        cls.staff.user_permissions.add(
+            Permission.objects.get(content_type__app_label="core", codename="view_customer")
+        )
+        Customer.objects.create(Account=cls.account, full_name="Cliente A", document="1")
+        Customer.objects.create(Account=cls.other, full_name="Cliente B", document="2")
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()
+        _LOCAL.clear()
+
+    def _client(self, user, slug="acme"):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG=slug)
+        return client
+
+    def _list(self, client, **params):
+        """(nomes, count, leu a tabela de Customer?)"""
+        table = connection.ops.quote_name(Customer._meta.db_table)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get("/api/customer/list", params)
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        hit_table = any(f"FROM {table}" in q["sql"] for q in ctx.captured_queries)
+        return sorted(row["full_name"] for row in body["items"]), body["count"], hit_table
+
+    def test_entries_are_isolated_by_tenant(self):
+        acme, other = self._client(self.root), self._client(self.other_root, "other")
+        self.assertEqual(self._list(acme), (["Cliente A"], 1, True))
+        self.assertEqual(self._list(acme), (["Cliente A"], 1, False))
+        self.assertEqual(self._list(other), (["Cliente B"], 1, True))
+
+    def test_entries_are_isolated_by_privilege(self):
+        self.assertTrue(self._list(self._client(self.root))[2])
+        names, _, hit_table = self._list(self._client(self.staff))
+        self.assertEqual(names, ["Cliente A"])
+        self.assertTrue(hit_table)  # staff sem privilégio não reaproveita a entrada do superuser
+        self.assertFalse(self._list(self._client(self.staff))[2])
+
+    def test_writes_bulk_add_and_actions_invalidate(self):
+        client = self._client(self.root)
+        customer = Customer.objects.get(Account=self.account)
+        self._list(client)
+
+        resp = client.put(f"/api/customer/{customer.pk}/update", {"full_name": "Renomeado"}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._list(client)[:2], (["Renomeado"], 1))
+
+        resp = client.post("/api/customer/bulk_add", [{"full_name": "Lote", "document": "3"}], format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self._list(client)[:2], (["Lote", "Renomeado"], 2))
+
+        resp = client.post("/api/customer/action/bulk_delete", {"filter": {"full_name": "Lote"}}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._list(client)[:2], (["Renomeado"], 1))
+
+    def test_count_modes(self):
+        client = self._client(self.root)
+        resp = client.get("/api/customer/list", {"count": "none"})
+        self.assertEqual((resp.json()["count"], resp.json()["count_exact"]), (None, False))
+        # SQLite não tem estimativa do planner: cai no count exato
+        resp = client.get("/api/customer/list", {"count": "estimated"})
+        self.assertEqual((resp.json()["count"], resp.json()["count_exact"]), (1, True))
+        with override_settings(API_LIST_COUNT_STRATEGY="none"):
+            self.assertEqual(ListCounter(None, Customer).resolve_mode("bogus"), "none")
+            self.assertEqual(ListCounter(None, Customer).resolve_mode("EXACT"), "exact")
+
+    def test_cached_count_lasts_until_the_model_version_changes(self):
+        request = RequestFactory().get("/api/customer/list", {"count": "cached", "limit": "5"})
+        request.account = self.account
+        counter = ListCounter(request, Customer)
+        qs = Customer.objects.filter(Account=self.account)
+        self.assertEqual(counter.count(qs, "cached").value, 1)
+
+        Customer.objects.bulk_create([Customer(Account=self.account, full_name="Sem signal", document="9")])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(counter.count(qs, "cached").value, 1)
+        self.assertFalse(ctx.captured_queries)
+        self.assertEqual(counter.count(qs, "exact").value, 2)
+
+        bump_model_version(Customer)
+        self.assertEqual(counter.count(qs, "cached").value, 2)
+
+
+class KeysetPaginationTests(TestCase):
+    """?cursor= percorre tudo sem repetir nem pular linhas, mesmo com empates e nulos na coluna ordenada."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.user = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+        fantasy_names = ["B", None, "A", "B", None, "C", "B", None, "A"]
+        cls.ids = {
+            str(Customer.objects.create(
+                Account=cls.account, full_name=f"Cliente {i}", fantasy_name=name, document=str(i)
+            ).pk)
+            for i, name in enumerate(fantasy_names)
+        }
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+
+    def _page(self, order_by, cursor=""):
+        resp = self.client.get(
+            "/api/customer/list", {"order_by": order_by, "limit": 2, "cursor": cursor, "count": "none"}
+        )
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def _walk(self, order_by):
+        """Vai até o fim pelos next_cursor e volta pelos prev_cursor; devolve as duas sequências."""
+        forward, pages = [], []
+        page = self._page(order_by)
+        while True:
+            pages.append(page)
+            forward.extend(row["id"] for row in page["items"])
+            if not page["next_cursor"]:
+                break
+            page = self._page(order_by, page["next_cursor"])
+
+        backward = []
+        while page["prev_cursor"]:
+            page = self._page(order_by, page["prev_cursor"])
+            backward = [row["id"] for row in page["items"]] + backward
+        return forward, backward, pages
+
+    def test_walks_every_row_once_with_ties_and_nulls(self):
+        for order_by in ("fantasy_name", "-fantasy_name"):
+            with self.subTest(order_by=order_by):
+                forward, backward, pages = self._walk(order_by)
+                self.assertEqual(len(forward), len(self.ids))
+                self.assertEqual(set(forward), self.ids)
+                # a volta (sem a última página) reproduz a mesma ordem da ida
+                self.assertEqual(backward, forward[: len(backward)])
+                self.assertEqual(len(backward), len(forward) - len(pages[-1]["items"]))
+
+                names = [Customer.objects.get(pk=pk).fantasy_name for pk in forward]
+                self.assertEqual(names[-3:], [None, None, None])  # nulos no fim nas duas direções
+                present = [n for n in names if n is not None]
+                self.assertEqual(present, sorted(present, reverse=order_by.startswith("-")))
+
+    def test_tampered_cursor_is_rejected(self):
+        next_cursor = self._page("fantasy_name")["next_cursor"]
+        other_order = encode_cursor("-fantasy_name", "A", next(iter(self.ids)), "next")
+        bad_pk = encode_cursor("fantasy_name", "A", "not-a-uuid", "next")
+        for cursor in (next_cursor[:-3] + "!!!", "bm9wZQ", other_order, bad_pk):
+            with self.subTest(cursor=cursor):
+                resp = self.client.get(
+                    "/api/customer/list", {"order_by": "fantasy_name", "limit": 2, "cursor": cursor}
+                )
+                self.assertEqual(resp.status_code, 400)
+
+
+class SignalWiringTests(TestCase):
+    """Receivers da API ligados por model: quem não é rastreado nem indexado mantém o fast-delete."""
+
+    def test_untracked_models_keep_fast_delete(self):
+        self.assertFalse(post_delete.has_listeners(LogEntry))
+        self.assertTrue(post_delete.has_listeners(Customer))
+        self.assertTrue(Collector(using="default").can_fast_delete(LogEntry.objects.all()))
+
+
+class PermissionTests(TestCase):
+    """POST/PUT checados pelo conjunto de permissões em cache; mudanças de grupo/permissão invalidam."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.user = User.objects.create_user(
+            username="staff", email="staff@example.com", password="x", Account=cls.account
+        )
+        cls.root = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+        cls.customer = Customer.objects.create(Account=cls.account, full_name="Cliente", document="1")
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()
+        _LOCAL.clear()  # cache.clear() zera as versões: a chave g1:u1 do teste anterior voltaria a valer
+
+    def _client(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+        return client
+
+    def _post(self, user):
+        return self._client(user).post("/api/customer/add", {"full_name": "Novo", "document": "2"}, format="json")
+
+    def _put(self, user):
+        return self._client(user).put(
+            f"/api/customer/{self.customer.pk}/update", {"full_name": "Renomeado"}, format="json"
+        )
+
+    @staticmethod
+    def _perm(codename):
+        return Permission.objects.get(content_type__app_label="core", codename=codename)
+
+    def test_post_and_put_need_the_model_permission(self):
+        self.assertEqual(self._post(self.user).status_code, 403)
+        self.assertEqual(self._put(self.user).status_code, 403)
+
+        self.user.user_permissions.add(self._perm("add_customer"))
+        self.assertEqual(self._post(self.user).status_code, 201)
+        self.assertEqual(self._put(self.user).status_code, 403)
+
+        self.user.user_permissions.add(self._perm("change_customer"))
+        self.assertEqual(self._put(self.user).status_code, 200)
+
+    def test_any_allow_all_permission_grants_post_and_put(self):
+        # PostView/PutView.ALLOWED_PERMISSIONS = ("core.change_files", "core.add_files"): o segundo também vale
+        self.user.user_permissions.add(self._perm("add_files"))
+        self.assertEqual(self._post(self.user).status_code, 201)
+        self.assertEqual(self._put(self.user).status_code, 200)
+
+    def test_group_changes_invalidate_the_cached_set(self):
+        group = Group.objects.create(name="acme:vendas")
+        AccountGroup.objects.create(account=self.account, group=group, name="vendas")
+        self.user.groups.add(group)
+        self.assertEqual(self._post(self.user).status_code, 403)  # conjunto vazio fica em cache
+
+        group.permissions.add(self._perm("add_customer"))
+        self.assertEqual(self._post(self.user).status_code, 201)
+
+        self.user.groups.remove(group)
+        self.assertEqual(self._post(self.user).status_code, 403)
+
+    def test_cached_set_skips_the_permission_tables(self):
+        self.user.user_permissions.add(self._perm("add_customer"))
+        self.assertTrue(user_has_perm(self.user, "core.add_customer"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(user_has_perm(self.user, "core.add_customer"))
+            self.assertFalse(user_has_perm(self.user, "core.delete_customer"))
+        self.assertFalse(ctx.captured_queries)
+
+    def test_superuser_bypasses_model_permissions(self):
+        self.assertFalse(self.root.user_permissions.exists())
+        self.assertEqual(self._post(self.root).status_code, 201)
+        self.assertEqual(self._put(self.root).status_code, 200)
+
+
+class SearchIndexTests(TestCase):
+    """Documentos de busca seguem save/delete; sem backfill completo a busca fica no icontains."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.other = Account.objects.create(slug="other", legal_name="Other", display_name="Other")
+        cls.user = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()
+        backend_for_connection(connection)._backfilled.clear()
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+
+    def _search(self, term):
+        resp = self.client.get("/api/customer/list", {"search": term})
+        self.assertEqual(resp.status_code, 200)
+        return sorted(row["full_name"] for row in resp.json()["items"])
+
+    def _documents(self):
+        return SearchDocument.objects.filter(content_type=ContentType.objects.get_for_model(Customer))
+
+    def test_documents_follow_save_and_delete(self):
+        customer = Customer.objects.create(Account=self.account, full_name="João Silva", document="1")
+        self.assertEqual(self._documents().get(object_id=customer.pk).document, "joao silva 1")
+        customer.full_name = "Maria"
+        customer.save()
+        self.assertEqual(self._documents().get(object_id=customer.pk).document, "maria 1")
+        customer.delete()
+        self.assertFalse(self._documents().exists())
+
+    def test_indexed_search_matches_prefixes_within_the_tenant(self):
+        Customer.objects.create(Account=self.account, full_name="João Silva", document="1")
+        Customer.objects.create(Account=self.account, full_name="Silvana Costa", document="2")
+        Customer.objects.create(Account=self.other, full_name="João Silveira", document="3")
+        self.assertIsNotNone(get_search_backend(Customer))
+
+        self.assertEqual(self._search("joao silv"), ["João Silva"])
+        self.assertEqual(self._search("SILV"), ["João Silva", "Silvana Costa"])
+        # índice casa por prefixo de palavra, não por pedaço no meio dela
+        self.assertEqual(self._search("ilva"), [])
+
+    def test_missing_documents_fall_back_to_icontains_until_rebuild(self):
+        Customer.objects.bulk_create([  # bulk_create do ORM não passa pelos signals
+            Customer(Account=self.account, full_name="João Silva", document="1"),
+            Customer(Account=self.account, full_name="Silvana Costa", document="2"),
+        ])
+        self.assertIsNone(get_search_backend(Customer))
+        self.assertEqual(self._search("ilva ost"), ["Silvana Costa"])
+
+        out = StringIO()
+        call_command("rebuild_search_index", "core.Customer", stdout=out)
+        self.assertIn("core.Customer: 2 documentos.", out.getvalue())
+        self.assertEqual(self._documents().count(), 2)
+        self.assertIsNotNone(get_search_backend(Customer))
+        self.assertEqual(self._search("silv cost"), ["Silvana Costa"])
+
+    def test_documents_are_not_exposed_by_the_generic_api(self):
+        self.assertIsNone(model_registry.get_model("SearchDocument"))
+        self.assertEqual(self.client.get("/api/searchdocument/list").status_code, 404)
+
+
+class ExportTests(TestCase):
+    """Exportação sem ?fields= usa só os campos que o serializer devolve (sem os write_only)."""
+
+    WRITE_ONLY = {"business_type_id", "address_id", "parent_id"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.user = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+        business_type = BusinessType.objects.create(Account=cls.account, name="Loja")
+        cls.business = Business.objects.create(
+            Account=cls.account, business_type=business_type, name="Matriz", cnpj="00.000.000/0001-00"
+        )
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+
+    def _export(self, fmt):
+        resp = self.client.get("/api/business/export", {"format": fmt})
+        self.assertEqual(resp.status_code, 200)
+        return b"".join(resp.streaming_content).decode("utf-8")
+
+    def test_csv_header_has_only_readable_fields(self):
+        header, row = list(csv.reader(StringIO(self._export("csv"))))
+        self.assertFalse(self.WRITE_ONLY & set(header))
+        self.assertIn("business_type", header)
+        values = dict(zip(header, row))
+        self.assertEqual(values["id"], str(self.business.pk))
+        self.assertEqual(values["name"], "Matriz")
+        self.assertEqual(values["cnpj"], "00.000.000/0001-00")
+
+    def test_ndjson_rows_have_only_readable_fields(self):
+        lines = self._export("ndjson").splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertFalse(self.WRITE_ONLY & set(row))
+        self.assertEqual(row["name"], "Matriz")
+        self.assertEqual(row["business_type"]["name"], "Loja")
+
+
+class ThrottleTests(TestCase):
+    """Janelas user:* (sliding log) e account:* (contador deslizante) do MultiWindowRateThrottle."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.users = [
+            User.objects.create_superuser(
+                username=f"root{i}", email=f"root{i}@example.com", password="x", Account=cls.account
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()
+
+    def _client(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+        return client
+
+    def test_default_rates_allow_a_screen_burst(self):
+        client = self._client(self.users[0])
+        statuses = {client.get("/api/customer/list").status_code for _ in range(20)}
+        self.assertEqual(statuses, {200})
+
+    def test_user_window_exceeded_returns_429_with_retry_after(self):
+        client = self._client(self.users[0])
+        with mock.patch.object(MultiWindowRateThrottle, "THROTTLE_RATES", {"user:1minute": "3/minute"}):
+            statuses = [client.get("/api/customer/list").status_code for _ in range(3)]
+            resp = client.get("/api/customer/list")
+            other = self._client(self.users[1]).get("/api/customer/list")
+        self.assertEqual(statuses, [200, 200, 200])
+        self.assertEqual(resp.status_code, 429)
+        self.assertTrue(55 <= int(resp["Retry-After"]) <= 60)
+        self.assertEqual(other.status_code, 200)  # janela é por usuário
+
+    def test_account_window_is_shared_by_the_tenants_users(self):
+        first, second = (self._client(user) for user in self.users)
+        with mock.patch.object(MultiWindowRateThrottle, "THROTTLE_RATES", {"account:1minute": "3/minute"}):
+            throttle = MultiWindowRateThrottle()
+            self.assertEqual({mode for _, _, _, mode in throttle.build_checks(RequestFactory().get("/", HTTP_X_ACCOUNT_SLUG="acme"))}, {COUNTER})
+            statuses = [first.get("/api/customer/list").status_code for _ in range(2)]
+            statuses.append(second.get("/api/customer/list").status_code)
+            resp = second.get("/api/customer/list")
+        self.assertEqual(statuses, [200, 200, 200])
+        self.assertEqual(resp.status_code, 429)
+        self.assertIn("Retry-After", resp)
+
+    def test_counter_estimate_weights_the_previous_bucket(self):
+        # metade da janela passou: 10 do bucket anterior pesam 5
+        self.assertEqual(counter_wait(prev=10, curr=0, limit=10, window=60, elapsed=30), 0)
+        # 10 anteriores e limite 5: só cabe quando o anterior pesar menos de 5 (meio bucket)
+        self.assertEqual(counter_wait(prev=10, curr=0, limit=5, window=60, elapsed=0), 30)
+        self.assertEqual(counter_wait(prev=0, curr=5, limit=5, window=60, elapsed=20), 40)
+
+
+class BulkWriteTests(TestCase):
+    """bulk_add/bulk_update gravam os itens válidos em lote e devolvem os erros pelo índice."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.user = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()  # janelas do throttle por usuário (sem Redis ficam no processo)
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+
+    def test_creates_valid_items_and_reports_invalid_ones(self):
+        items = [{"full_name": f"Cliente {i}", "document": f"000.{i:03d}"} for i in range(50)]
+        items[7] = {"document": "999"}
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post("/api/customer/bulk_add", items, format="json")
+        self.assertEqual(resp.status_code, 201)
+        body = resp.json()
+        self.assertEqual((body["created"], body["failed"]), (49, 1))
+        self.assertEqual(body["errors"][0]["index"], 7)
+        self.assertIn("full_name", body["errors"][0]["errors"])
+        self.assertEqual(Customer.objects.filter(Account=self.account).count(), 49)
+        self.assertTrue(Customer.objects.filter(document="000005").exists())
+        # o SQLite divide o INSERT pelo limite de parâmetros; o ponto é não ser um por item
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith(f'INSERT INTO "{Customer._meta.db_table}"')]
+        self.assertLessEqual(len(inserts), 3)
+
+    def test_constraint_violation_only_rejects_offending_item(self):
+        resp = self.client.post(
+            "/api/businesstype/bulk_add", [{"name": "Loja"}, {"name": "Loja"}, {"name": "CD"}], format="json"
+        )
+        self.assertEqual(resp.status_code, 201)
+        body = resp.json()
+        self.assertEqual(body["created"], 2)
+        self.assertEqual([err["index"] for err in body["errors"]], [1])
+        self.assertEqual(
+            sorted(BusinessType.objects.filter(Account=self.account).values_list("name", flat=True)), ["CD", "Loja"]
+        )
+
+    def test_bulk_update_writes_only_changed_columns(self):
+        customers = [
+            Customer.objects.create(Account=self.account, full_name=f"Cliente {i}", document=f"{i:03d}")
+            for i in range(3)
+        ]
+        items = [{"id": str(c.pk), "is_active": False} for c in customers[:2]]
+        items.append({"id": str(customers[2].pk), "payment_term": "nope"})
+        items.append({"id": "00000000-0000-0000-0000-000000000000", "is_active": False})
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.patch("/api/customer/bulk_update", items, format="json")
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual(body["updated"], 2)
+        self.assertEqual([err["index"] for err in body["errors"]], [2, 3])
+        self.assertEqual(
+            list(Customer.objects.filter(pk__in=[c.pk for c in customers]).order_by("full_name").values_list("is_active", flat=True)),
+            [False, False, True],
+        )
+        table = Customer._meta.db_table
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(f'UPDATE "{table}"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"full_name"', updates[0])
+
+    def test_items_with_links_go_through_create_and_update(self):
+        address = Address.objects.create(account=self.account, street="Rua", city="X", state="SP")
+        link = [{"address_id": str(address.pk), "is_primary": True}]
+        resp = self.client.post(
+            "/api/customer/bulk_add",
+            [{"full_name": "Com vínculo", "document": "1", "addresses_links": link}, {"full_name": "Sem", "document": "2"}],
+            format="json",
+        )
+        self.assertEqual((resp.status_code, resp.json()["created"]), (201, 2))
+        linked = Customer.objects.get(document="1")
+        self.assertEqual(list(linked.customer_addresses.values_list("address_id", flat=True)), [address.pk])
+
+        plain = Customer.objects.get(document="2")
+        resp = self.client.patch("/api/customer/bulk_update", [{"id": str(plain.pk), "addresses_links": link}], format="json")
+        self.assertEqual((resp.status_code, resp.json()["updated"]), (200, 1))
+        self.assertTrue(plain.customer_addresses.filter(address=address, is_primary=True).exists())
+
+
+class FilterActionTests(TestCase):
+    """Actions com {"filter": {...}} usam o pipeline da listagem e rodam sobre o conjunto."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.other = Account.objects.create(slug="other", legal_name="Other", display_name="Other")
+        cls.user = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()  # janelas do throttle por usuário (sem Redis ficam no processo)
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+        for i in range(4):
+            Customer.objects.create(Account=self.account, full_name=f"Cliente {i}", document=f"{i:03d}", is_active=i % 2 == 0)
+        Customer.objects.create(Account=self.other, full_name="Outro", document="900", is_active=False)
+
+    def test_bulk_delete_by_filter_stays_in_tenant(self):
+        resp = self.client.post("/api/customer/action/bulk_delete", {"filter": {"is_active": False}}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["deleted"], 2)
+        self.assertEqual(Customer.objects.filter(Account=self.account).count(), 2)
+        self.assertTrue(Customer.objects.filter(Account=self.other).exists())
+
+    def test_unknown_or_empty_filter_is_rejected(self):
+        resp = self.client.post("/api/customer/action/bulk_delete", {"filter": {"is_actve": False}}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.post("/api/customer/action/bulk_delete", {"filter": {}}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Customer.objects.filter(Account=self.account).count(), 4)
+
+    def test_filter_that_narrows_nothing_is_rejected(self):
+        payloads = [
+            {"filter": {"search": ""}},
+            {"filter": {"search": "  "}},
+            {"filter": {"limit": 1}},
+            {"filter": {"order_by": "full_name"}},
+        ]
+        for payload in payloads:
+            for action in ("bulk_delete", "bulk_set"):
+                with self.subTest(payload=payload, action=action):
+                    resp = self.client.post(
+                        f"/api/customer/action/{action}", {**payload, "set": {"is_active": False}}, format="json"
+                    )
+                    self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Customer.objects.filter(Account=self.account, is_active=False).count(), 2)
+        self.assertEqual(Customer.objects.filter(Account=self.account).count(), 4)
+
+    @override_settings(API_BULK_DELETE_BATCH_SIZE=3)
+    def test_bulk_delete_runs_in_chunks(self):
+        resp = self.client.post("/api/customer/action/bulk_delete", {"all": True}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.json()["deleted"], resp.json()["chunks"]), (4, 2))
+        self.assertFalse(Customer.objects.filter(Account=self.account).exists())
+        self.assertTrue(Customer.objects.filter(Account=self.other).exists())
+
+    def test_bulk_set_updates_filtered_set_in_one_statement(self):
+        table = Customer._meta.db_table
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(
+                "/api/customer/action/bulk_set", {"filter": {"is_active": True}, "set": {"is_active": False}}, format="json"
+            )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["updated"], 2)
+        self.assertFalse(Customer.objects.filter(Account=self.account, is_active=True).exists())
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(f'UPDATE "{table}"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"updated_at"', updates[0])
+
+    def test_bulk_set_rejects_unknown_fields(self):
+        resp = self.client.post("/api/customer/action/bulk_set", {"all": True, "set": {"id": "x"}}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("id", resp.json()["errors"])
+
+    def test_estimate_reports_without_deleting(self):
+        resp = self.client.post("/api/customer/action/bulk_delete_estimate", {"all": True}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        estimate = resp.json()["estimate"]
+        self.assertEqual(estimate["count"], 4)
+        self.assertEqual(estimate["protected"], [])
+        self.assertEqual(Customer.objects.filter(Account=self.account).count(), 4)
+
+
+class ActionJobTests(TestCase):
+    """Actions assíncronas viram ActionJob, executado pelo run_action_jobs e consultado em /jobs/<id>."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+        cls.user = User.objects.create_superuser(
+            username="root", email="root@example.com", password="x", Account=cls.account
+        )
+
+    def setUp(self):
+        cache.clear()
+        _local_log.clear()  # janelas do throttle por usuário (sem Redis ficam no processo)
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_ACCOUNT_SLUG="acme")
+        for i in range(3):
+            Customer.objects.create(Account=self.account, full_name=f"Cliente {i}", document=f"{i:03d}", is_active=False)
+
+    def _enqueue(self):
+        resp = self.client.post(
+            "/api/customer/action/bulk_delete", {"filter": {"is_active": False}, "async": True}, format="json"
+        )
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(Customer.objects.count(), 3)
+        return resp.json()["job"]["id"]
+
+    def test_worker_runs_job_and_status_reports_result(self):
+        job_id = self._enqueue()
+        call_command("run_action_jobs", "--once", stdout=StringIO())
+        body = self.client.get(f"/api/jobs/{job_id}").json()["job"]
+        self.assertEqual(body["status"], "succeeded")
+        self.assertEqual(body["result"]["deleted"], 3)
+        self.assertEqual(Customer.objects.count(), 0)
+
+    def test_cancel_queued_job(self):
+        job_id = self._enqueue()
+        resp = self.client.post(f"/api/jobs/{job_id}/cancel")
+        self.assertEqual(resp.json()["job"]["status"], "cancelled")
+        call_command("run_action_jobs", "--once", stdout=StringIO())
+        self.assertEqual(Customer.objects.count(), 3)
+        self.assertEqual(self.client.post(f"/api/jobs/{job_id}/cancel").status_code, 409)
+
+    def test_jobs_are_not_exposed_by_the_generic_api(self):
+        payload = {"account_id": str(self.account.id), "model_name": "Customer", "action_name": "bulk_delete"}
+        self.assertIn(self.client.post("/api/actionjob/add", payload, format="json").status_code, (403, 404))
+        self.assertIn(self.client.get("/api/actionjob/list").status_code, (403, 404))
+        self.assertFalse(ActionJob.objects.exists())
+
+    def test_worker_only_runs_jobs_in_the_users_account(self):
+        other = Account.objects.create(slug="other", legal_name="Other", display_name="Other")
+        Customer.objects.create(Account=other, full_name="Alheio", document="999")
+        clerk = User.objects.create_user(username="clerk", password="x", Account=self.account)
+        clerk.user_permissions.add(Permission.objects.get(codename="delete_customer"))
+        job = ActionJob.objects.create(
+            account_id=other.id, user=clerk, model_name="Customer", action_name="bulk_delete", payload={"all": True},
+        )
+        call_command("run_action_jobs", "--once", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ActionJob.STATUS_FAILED)
+        self.assertTrue(Customer.objects.filter(Account=other).exists())
+
+    def test_worker_rechecks_permission(self):
+        clerk = User.objects.create_user(username="clerk", password="x", Account=self.account)
+        job = ActionJob.objects.create(
+            account_id=self.account.id, user=clerk, model_name="Customer", action_name="bulk_delete",
+            payload={"all": True},
+        )
+        call_command("run_action_jobs", "--once", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ActionJob.STATUS_FAILED)
+        self.assertEqual(Customer.objects.count(), 3)
+
+    def test_stale_heartbeat_alone_does_not_requeue_a_live_worker(self):
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        host = socket.gethostname()
+        old = timezone.now() - timedelta(hours=1)
+        jobs = {
+            worker: ActionJob.objects.create(
+                account_id=self.account.id, model_name="Customer", action_name="bulk_set", payload={},
+                status=ActionJob.STATUS_RUNNING, worker=worker, attempts=1, heartbeat_at=old,
+            )
+            for worker in (f"{host}:{os.getppid()}", f"{host}:{dead.pid}", "outro-host:1")
+        }
+        self.assertEqual(requeue_stale_jobs(), 2)
+        statuses = {worker: ActionJob.objects.get(pk=job.pk).status for worker, job in jobs.items()}
+        self.assertEqual(statuses[f"{host}:{os.getppid()}"], ActionJob.STATUS_RUNNING)
+        self.assertEqual(statuses[f"{host}:{dead.pid}"], ActionJob.STATUS_QUEUED)
+        self.assertEqual(statuses["outro-host:1"], ActionJob.STATUS_QUEUED)
+
+
+class CodeSequenceTests(TestCase):
+    """Códigos PREFIX-N saem da CodeSequence do Account, inclusive em models com FK `account`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(slug="acme", legal_name="Acme", display_name="Acme")
+
+    def _address(self, **extra):
+        return Address.objects.create(account=self.account, street="Rua", city="X", state="SP", **extra)
+
+    def test_codes_are_not_reused_and_skip_manual_ones(self):
+        first = self._address()
+        self._address(code="ADR-3")
+        self.assertEqual(first.code, "ADR-1")
+        self.assertEqual(self._address().code, "ADR-2")
+        first.delete()
+        self.assertEqual(self._address().code, "ADR-4")
+
+    def test_reserve_block_continues_existing_codes(self):
+        BusinessType.objects.create(Account=self.account, name="Loja", code="BST-7")
+        self.assertEqual(reserve_codes(BusinessType, self.account, 3, prefix="BST"), ["BST-8", "BST-9", "BST-10"])
+        self.assertEqual(BusinessType.objects.create(Account=self.account, name="CD").code, "BST-11")
+
+    def test_sequences_are_not_exposed_by_the_generic_api(self):
+        self.assertIsNone(model_registry.get_model("CodeSequence"))
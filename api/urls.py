@@ -1,6 +1,9 @@
 from django.urls import path
 from .views.crud import GetView, PostView, PutView, DeleteView, ListView
+from .views.export import ExportView
+from .views.bulk import BulkAddView, BulkUpdateView
 from .views.actions import ActionView, ListActionsView
+from .views.jobs import JobView, JobCancelView
 from .views.auth.auth import LoginView, LogoutView, VerifyView
 from .views.auth.change_password import ChangePasswordView
 
@@ -10,12 +13,19 @@ urlpatterns = [
     path("auth/logout", LogoutView.as_view(), name="auth_logout"),
     path("auth/verify", VerifyView.as_view(), name="auth_verify"),
     path("auth/change-password", ChangePasswordView.as_view(), name="auth-change-password"),
+
+    # JOBS de actions assíncronas (antes das rotas <model_name>/<uuid:pk>)
+    path("jobs/<uuid:job_id>",        JobView.as_view(),       name="job"),
+    path("jobs/<uuid:job_id>/cancel", JobCancelView.as_view(), name="job-cancel"),
     
     # PLURAL: listagem com filtros
     path("<str:model_name>/list", ListView.as_view(), name="list"),
+    path("<str:model_name>/export", ExportView.as_view(), name="export"),
 
     # CRUD unitário
     path("<str:model_name>/add",              PostView.as_view(), name="post"),
+    path("<str:model_name>/bulk_add",         BulkAddView.as_view(), name="bulk-add"),
+    path("<str:model_name>/bulk_update",      BulkUpdateView.as_view(), name="bulk-update"),
     path("<str:model_name>/<uuid:pk>",        GetView.as_view(),  name="get"),
     path("<str:model_name>/<uuid:pk>/update", PutView.as_view(),  name="put"),
     path("<str:model_name>/<uuid:pk>/delete", DeleteView.as_view(), name="delete"),
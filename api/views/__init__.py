@@ -1,3 +1,5 @@
 from .auth.auth import LoginView, LogoutView, VerifyView
 from .auth.change_password import ChangePasswordView
-from .crud  import GetView, PostView, PutView, DeleteView, ListView
\ No newline at end of file
+from .crud  import GetView, PostView, PutView, DeleteView, ListView
+from .export import ExportView
+from .bulk import BulkAddView, BulkUpdateView
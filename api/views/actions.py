@@ -3,11 +3,21 @@ from rest_framework import status
 from rest_framework.response import Response
 from .base import BaseModelView
 from api.actions.registry import get_action, REGISTRY
+from api.actions.jobs import enqueue_action_job
+from api.actions.runner import ActionPayloadError, execute_action, resolve_action_target
+from .jobs import serialize_job
 
 class ActionView(BaseModelView):
     """
     POST /api/<model_name>/<action_name>/
-    Body: deve ser um ARRAY. Ex.: [1,2,3] OU [{"id":1}, {"id":2}]
+    Body:
+      - IDs: [1,2,3], [{"id":1}, {"id":2}] ou {"ids": [1,2,3]}
+      - filtro: {"filter": {"is_active": false, "search": "x", "start_date": "2025-01-01"}}
+        (mesmos parâmetros da listagem; paginação/ordem são ignoradas e filtro
+        desconhecido é erro, para nunca ampliar o alvo)
+      - tudo do tenant: {"all": true}
+    Actions com run_async (ou corpo com "async": true) viram um ActionJob e a
+    resposta é 202 com o job; acompanhe em GET /api/jobs/<id>.
     """
     def post(self, request, model_name: str, action_name: str):
         print("action_name", action_name, request.data)
@@ -26,24 +36,29 @@ class ActionView(BaseModelView):
         if isinstance(perm_resp, Response):
             return perm_resp
 
-        qs = helper.get_queryset(model_cls.__name__)
-        if qs is None:
-            return self.fail("Queryset indisponível para o modelo.")
-
-        account = getattr(request, "account", None)
-        account_id = getattr(account, "id", None)
-        account_field = helper.resolver.find_account_fk_field(model_cls)
-        if account_field:
-            if not account_id:
-                return self.ok({"detail": "Sem tenant.", "processed": 0})
-            qs = qs.filter(**{f"{account_field}_id": account_id})
-
         data = request.data
-        if not isinstance(data, list):
-            return self.fail("Payload inválido: envie um array.", http_status=status.HTTP_400_BAD_REQUEST)
+        run_async = action.run_async or (isinstance(data, dict) and data.get("async") is True)
+        try:
+            target = resolve_action_target(helper, request, model_cls, data, action)
+        except ActionPayloadError as exc:
+            return self.fail(exc.detail, http_status=exc.http_status)
+        if target.qs is None:
+            return self.ok({"detail": "Sem tenant.", "processed": 0})
+
+        if run_async:
+            job = enqueue_action_job(request, model_cls, action, target)
+            return self.ok(
+                {
+                    "detail": "Action enfileirada.",
+                    "action": action.name,
+                    "model": model_cls.__name__,
+                    "job": serialize_job(job),
+                },
+                http_status=status.HTTP_202_ACCEPTED,
+            )
 
         def _run():
-            result = action.run(request, helper, model_cls, qs, data)
+            result = execute_action(action, request, helper, model_cls, target)
             if not result.ok:
                 return self.fail(result.detail or "Falha na action.", http_status=result.http_status, extra=(result.payload or {}))
             return self.ok(
@@ -73,6 +88,8 @@ class ListActionsView(BaseModelView):
                     "name": a.name,
                     "http_methods": list(a.http_methods),
                     "required_method": a.required_method,
+                    "accepts_filter": a.accepts_filter,
+                    "run_async": a.run_async,
                     "scope": ("global" if a.models is None else "model"),
                 }
                 for a in d.values()
@@ -18,7 +18,7 @@ from django.core.exceptions import PermissionDenied
 from api.helpers.errors import ErrorBuilder
 from api.helpers import ModelHelper
 from api.permissions import require_model_permission
-from core.throttling import AccountScopedRateThrottle
+from core.throttling import MultiWindowRateThrottle
 
 
 class BaseModelView(APIView):
@@ -31,8 +31,7 @@ class BaseModelView(APIView):
     """
 
     permission_classes = [IsAuthenticated]
-    throttle_classes = [AccountScopedRateThrottle]
-    throttle_scope = "account:1hour"
+    throttle_classes = [MultiWindowRateThrottle]
     parser_classes = [JSONParser, FormParser, MultiPartParser]
 
     ALLOWED_PERMISSIONS: tuple[str, ...] = ()
@@ -0,0 +1,95 @@
+# api/views/bulk.py
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+from .base import BaseModelView
+
+
+class BulkBaseView(BaseModelView):
+    ALLOWED_PERMISSIONS = ("core.change_files", "core.add_files")
+
+    def extract_items(self, request):
+        """Lista de itens do corpo (lista pura ou {"items": [...]}), limitada a API_BULK_MAX_ITEMS."""
+        items = request.data.get("items") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return self.fail('Envie uma lista de objetos (ou {"items": [...]}).')
+        max_items = getattr(settings, "API_BULK_MAX_ITEMS", 1000)
+        if len(items) > max_items:
+            return self.fail(f"Máximo de {max_items} itens por requisição.")
+        return items
+
+    def batch_size(self) -> int:
+        return getattr(settings, "API_BULK_BATCH_SIZE", 500)
+
+
+class BulkAddView(BulkBaseView):
+    """
+    POST /<model>/bulk_add
+    Corpo: lista de objetos (ou {"items": [...]}), cada um no formato do /add.
+    Itens válidos são gravados; os inválidos voltam em `errors` com o índice na lista.
+    """
+
+    def post(self, request, model_name: str) -> Response:
+        perm_resp = self.exec_with_errors(self.check_perm, request, model_name, "POST", obj=None, allow_self=False)
+        if isinstance(perm_resp, Response):
+            return perm_resp
+
+        items = self.extract_items(request)
+        if isinstance(items, Response):
+            return items
+
+        helper = self.get_helper(request)
+
+        def _run():
+            result = helper.bulk_create(model_name, items, batch_size=self.batch_size())
+            if result is None:
+                return self.not_found("Modelo inexistente.")
+            payload = {
+                "ok": not result.errors,
+                "detail": f"{len(result.saved)} de {len(items)} {model_name} criados.",
+                "created": len(result.saved),
+                "failed": len(result.errors),
+                "items": [{"index": index, "id": str(obj.pk)} for index, obj in result.saved],
+                "errors": result.errors,
+            }
+            http_status = status.HTTP_201_CREATED if result.saved else status.HTTP_400_BAD_REQUEST
+            return Response(payload, status=http_status)
+
+        return self.exec_with_errors(_run)
+
+
+class BulkUpdateView(BulkBaseView):
+    """
+    PATCH /<model>/bulk_update
+    Corpo: [{"id": ..., <campos alterados>}, ...] (ou {"items": [...]}).
+    Todos os alvos são lidos numa consulta no tenant; cada item é validado em modo
+    partial e os erros voltam em `errors` com o índice na lista.
+    """
+
+    def patch(self, request, model_name: str) -> Response:
+        perm_resp = self.exec_with_errors(self.check_perm, request, model_name, "PUT", obj=None, allow_self=False)
+        if isinstance(perm_resp, Response):
+            return perm_resp
+
+        items = self.extract_items(request)
+        if isinstance(items, Response):
+            return items
+
+        helper = self.get_helper(request)
+
+        def _run():
+            result = helper.bulk_update(model_name, items, batch_size=self.batch_size())
+            if result is None:
+                return self.not_found("Modelo inexistente.")
+            payload = {
+                "ok": not result.errors,
+                "detail": f"{len(result.saved)} de {len(items)} {model_name} atualizados.",
+                "updated": len(result.saved),
+                "failed": len(result.errors),
+                "items": [{"index": index, "id": str(obj.pk)} for index, obj in result.saved],
+                "errors": result.errors,
+            }
+            http_status = status.HTTP_200_OK if result.saved else status.HTTP_400_BAD_REQUEST
+            return Response(payload, status=http_status)
+
+        return self.exec_with_errors(_run)
@@ -1,19 +1,41 @@
 # api/views/crud.py
 from rest_framework import status
 from rest_framework.response import Response
-from datetime import datetime, time
-from django.utils import timezone
-from django.core.exceptions import FieldDoesNotExist
+from django.conf import settings
 import re
 import json
+import logging
 from .base import BaseModelView
-from api.helpers.filtering import parse_list_query, build_global_search_q
+from api.helpers.filtering import parse_sparse_fields
+from api.helpers.listing import build_list_query
+from api.helpers.pagination import KeysetPaginator
+from api.helpers.counting import ListCounter
+from api.helpers.search import annotate_search_rank
+from api.helpers.list_cache import ListResponseCache
+from api.helpers.conditional import (
+    apply_validators,
+    is_not_modified,
+    list_validators,
+    not_modified_response,
+    object_validators,
+)
+
+log = logging.getLogger(__name__)
 
 class GetView(BaseModelView):
     def get(self, request, model_name: str, pk: str) -> Response:
         helper = self.get_helper(request)
 
-        obj = helper.get_one(model_name, pk)
+        sparse_fields = None
+        if request.query_params.get("fields"):
+            model_cls = helper.resolve_model(model_name)
+            if not model_cls:
+                return self.not_found("Modelo inexistente.")
+            sparse_fields, unknown = parse_sparse_fields(request.query_params, helper.get_field_catalog(model_cls).allowed)
+            if unknown:
+                return self.fail(f"Campos inválidos em 'fields': {', '.join(unknown)}")
+
+        obj = helper.get_one(model_name, pk, optimize=True, fields=sparse_fields)
         if not obj:
             return self.not_found(f"{model_name} não encontrado")
 
@@ -21,10 +43,14 @@ class GetView(BaseModelView):
         if isinstance(perm_resp, Response):
             return perm_resp
 
+        validators = object_validators(request, obj, helper.get_query_plan(type(obj), sparse_fields))
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
+
         def _run():
-            serialized = helper.serialize_instance(model_name, obj)  # << trocado
+            serialized = helper.serialize_instance(model_name, obj, fields=sparse_fields)
             payload = self.wrap_serialized(serialized, model_name, pk)
-            return self.ok(payload)
+            return apply_validators(self.ok(payload), validators)
 
         return self.exec_with_errors(_run)
 
@@ -106,11 +132,7 @@ class ListView(BaseModelView):
         )
         if isinstance(perm_resp, Response):
             return perm_resp
-        
-        qs = helper.get_queryset(model_cls.__name__)
-        if qs is None:
-            return self.ok({model_name: [], "count": 0})
-        
+
         def _extract_fields_spec(qp):
             """
             Constrói um dicionário a partir de keys do tipo:
@@ -137,76 +159,57 @@ class ListView(BaseModelView):
         else:
             print("\n[LIST] sem fields[...] na query (ou vazio).")
 
-        account = getattr(request, "account", None)
-        account_id = getattr(account, "id", None)
-        account_field = helper.resolver.find_account_fk_field(model_cls)
-        if account_field:
-            if not account_id:
-                return self.ok({model_name: [], "count": 0})
-            qs = qs.filter(**{f"{account_field}_id": account_id})
-    
-        allowed_fields = helper.get_serializer_fields(model_cls) or []
-        if "id" not in allowed_fields:
-            allowed_fields.append("id")
-
-        def _parse_iso(dt_str: str) -> datetime | None:
-            s = (dt_str or "").strip()
-            if not s:
-                return None
-            try:
-                return datetime.fromisoformat(s)
-            except Exception:
-                return None
-
-        def _ensure_aware(dt: datetime) -> datetime:
-            if timezone.is_naive(dt) and timezone.is_aware(timezone.now()):
-                try:
-                    return timezone.make_aware(dt, timezone.get_current_timezone())
-                except Exception:
-                    return timezone.make_aware(dt, timezone.utc)
-            return dt
-
-        start_raw = request.query_params.get("start_date") or request.query_params.get("start")
-        end_raw   = request.query_params.get("end_date")   or request.query_params.get("end")
-
-        start_dt = _parse_iso(start_raw)
-        end_dt   = _parse_iso(end_raw)
-
-        if end_dt and end_dt.time() == time(0, 0, 0) and end_raw and len(end_raw) == 10:
-            end_dt = datetime.combine(end_dt.date(), time(23, 59, 59, 999999))
-
-        if start_dt:
-            start_dt = _ensure_aware(start_dt)
-        if end_dt:
-            end_dt = _ensure_aware(end_dt)
-
-        try:
-            model_cls._meta.get_field("created_at")
-            if start_dt and end_dt:
-                qs = qs.filter(created_at__range=(start_dt, end_dt))
-            elif start_dt:
-                qs = qs.filter(created_at__gte=start_dt)
-            elif end_dt:
-                qs = qs.filter(created_at__lte=end_dt)
-        except FieldDoesNotExist:
-            pass
-
-        raw_search = request.query_params.get("search", "")
-        q_search = build_global_search_q(model_cls, allowed_fields, raw_search)
-        if q_search is not None:
-            qs = qs.filter(q_search)
-
-        filters, order_by, limit, offset = parse_list_query(request.query_params, allowed_fields)
-        if filters:
-            qs = qs.filter(**filters)
-        if order_by:
-            qs = qs.order_by(order_by)
-
-        total = qs.count()
-        page = list(qs[offset: offset + limit])
-
-        rows = []
-        for obj in page:
-            data = helper.serialize_instance(model_cls.__name__, obj)  
-            rows.append({**(data.get("fields", {})), "id": data.get("id")})
-        return self.ok({'items': rows, "count": total})
+        lq = build_list_query(helper, request, model_cls)
+        if lq.unknown_fields:
+            return self.fail(f"Campos inválidos em 'fields': {', '.join(lq.unknown_fields)}")
+        if lq.qs is None:
+            return self.ok({model_name: [], "count": 0})
+
+        qs, order_by, limit, offset = lq.qs, lq.order_by, lq.limit, lq.offset
+        sparse_fields = lq.sparse_fields
+        plan = helper.get_query_plan(model_cls, sparse_fields)
+
+        validators = list_validators(request, model_cls, plan)
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
+
+        response_cache = ListResponseCache(request, model_cls, plan)
+        cached_payload = response_cache.get()
+        if cached_payload is not None:
+            return apply_validators(self.ok(cached_payload), validators)
+
+        counter = ListCounter(request, model_cls)
+        count_mode = counter.resolve_mode(request.query_params.get("count"))
+
+        # ?cursor= (mesmo vazio) liga a paginação keyset; offset é ignorado
+        cursor_mode = "cursor" in request.query_params
+        extra = {}
+        if cursor_mode:
+            total = counter.count(qs, count_mode)
+            paginator = KeysetPaginator(model_cls, order_by)
+            result = self.exec_with_errors(paginator.paginate, qs, request.query_params.get("cursor"), limit)
+            if isinstance(result, Response):
+                return result
+            page, next_cursor, prev_cursor = result
+            extra = {"next_cursor": next_cursor, "prev_cursor": prev_cursor}
+        else:
+            if order_by:
+                qs = qs.order_by(order_by)
+            total = counter.count(qs, count_mode)
+            if lq.q_search is not None and not order_by:
+                # sem ordenação explícita, a busca vem por relevância (anotada só na página, não no count)
+                qs = annotate_search_rank(qs, model_cls, lq.raw_search, lq.account_id)
+            page = list(qs[offset: offset + limit])
+
+        rows = [
+            {**(data.get("fields", {})), "id": data.get("id")}
+            for data in helper.serialize_many(model_cls.__name__, page, fields=sparse_fields)
+        ]
+        payload = {'items': rows, "count": total.value, "count_exact": total.exact, **extra}
+        response_cache.set(payload)
+        response = apply_validators(self.ok(payload), validators)
+        if settings.DEBUG:
+            saved = plan.estimated_savings(len(page))
+            response["X-Query-Plan-Saved"] = str(saved)
+            log.debug("[LIST] %s: plano %s, ~%s queries evitadas", model_cls.__name__, plan.as_dict(), saved)
+        return response
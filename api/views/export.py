@@ -0,0 +1,56 @@
+# api/views/export.py
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+from .base import BaseModelView
+from api.helpers.listing import build_list_query
+from api.helpers.exporting import EXPORT_FORMATS, export_columns, iter_export_rows, stream_export
+
+
+class ExportView(BaseModelView):
+    """
+    GET /<model>/export?format=csv|ndjson
+    Mesmos filtros/busca/datas/order_by da ListView, sem paginação nem contagem:
+    as linhas são lidas em blocos e enviadas em streaming.
+    """
+
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= aqui escolhe o arquivo, não um renderer do DRF
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, model_name: str):
+        fmt = (request.query_params.get("format") or "csv").strip().lower()
+        if fmt not in EXPORT_FORMATS:
+            return self.fail(f"Formato inválido: use {' ou '.join(EXPORT_FORMATS)}.")
+
+        helper = self.get_helper(request)
+        model_cls = helper.resolve_model(model_name)
+        if not model_cls:
+            return self.not_found("Modelo inexistente.")
+
+        perm_resp = self.exec_with_errors(
+            self.check_perm, request, model_cls.__name__, "GET", obj=None, allow_self=False
+        )
+        if isinstance(perm_resp, Response):
+            return perm_resp
+
+        lq = build_list_query(helper, request, model_cls)
+        if lq.unknown_fields:
+            return self.fail(f"Campos inválidos em 'fields': {', '.join(lq.unknown_fields)}")
+
+        # sem ?fields=, só o que o serializer devolve: campos write_only seriam colunas sempre vazias
+        columns = export_columns(model_cls, lq.sparse_fields or helper.get_readable_fields(model_cls), request)
+        qs = lq.qs if lq.qs is not None else model_cls._default_manager.none()
+        if lq.order_by:
+            qs = qs.order_by(lq.order_by, "pk")
+        elif not qs.ordered:
+            qs = qs.order_by("pk")
+
+        chunk_size = getattr(settings, "API_EXPORT_CHUNK_SIZE", 500)
+        rows = iter_export_rows(helper, model_cls, qs, columns, chunk_size)
+        content_type, ext = EXPORT_FORMATS[fmt]
+        response = StreamingHttpResponse(stream_export(fmt, rows, columns), content_type=content_type)
+        filename = f"{model_name}-{timezone.localtime():%Y%m%d-%H%M%S}.{ext}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,59 @@
+# api/views/jobs.py
+from rest_framework import status
+from rest_framework.response import Response
+from api.actions.jobs import cancel_job
+from api.models import ActionJob
+from .base import BaseModelView
+
+
+def serialize_job(job: ActionJob) -> dict:
+    return {
+        "id": str(job.pk),
+        "model": job.model_name,
+        "action": job.action_name,
+        "status": job.status,
+        "progress": {"done": job.progress_done, "total": job.progress_total},
+        "cancel_requested": job.cancel_requested,
+        "result": job.result,
+        "error": job.error or None,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+class JobBaseView(BaseModelView):
+    def get_job(self, request, job_id):
+        """Job do tenant atual; de outro usuário, só para superuser/staff."""
+        account = getattr(request, "account", None)
+        job = ActionJob.objects.filter(pk=job_id, account_id=getattr(account, "id", None)).first()
+        if job is None:
+            return self.not_found("Job inexistente.")
+        user = request.user
+        if job.user_id != user.pk and not (user.is_superuser or user.is_staff):
+            return self.not_found("Job inexistente.")
+        return job
+
+
+class JobView(JobBaseView):
+    """GET /api/jobs/<id>: status, progresso e resultado do job."""
+
+    def get(self, request, job_id) -> Response:
+        job = self.get_job(request, job_id)
+        if isinstance(job, Response):
+            return job
+        return self.ok({"job": serialize_job(job)})
+
+
+class JobCancelView(JobBaseView):
+    """POST /api/jobs/<id>/cancel: cancela na fila ou pede a parada de um job em execução."""
+
+    def post(self, request, job_id) -> Response:
+        job = self.get_job(request, job_id)
+        if isinstance(job, Response):
+            return job
+        if job.is_finished:
+            return self.fail("Job já finalizado.", http_status=status.HTTP_409_CONFLICT, extra={"job": serialize_job(job)})
+        job = cancel_job(job)
+        return self.ok({"detail": "Cancelamento solicitado.", "job": serialize_job(job)})
@@ -1 +1,2 @@
-from .account_resolver_middleware import AccountResolverMiddleware
\ No newline at end of file
+from .account_resolver_middleware import AccountResolverMiddleware
+from .jwt_auth import RequestCachedJWTAuthentication, authenticate_jwt
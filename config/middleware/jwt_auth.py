@@ -0,0 +1,70 @@
+# config/middleware/jwt_auth.py
+"""
+Autenticação JWT em uma passada por request.
+
+O AccountResolverMiddleware e o DRF precisam do mesmo usuário do Bearer token.
+Antes cada um decodificava o token e buscava o User por conta própria; agora
+os dois chamam `authenticate_jwt(request)`, que valida o token com as regras do
+simplejwt (SIMPLE_JWT) uma única vez e guarda o resultado (ou o erro) na
+HttpRequest.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+REQUEST_ATTR = "_jwt_auth_result"
+
+
+@dataclass
+class JWTAuthResult:
+    user: Any = None
+    token: Any = None
+    error: Optional[Exception] = None
+
+
+_NO_TOKEN = JWTAuthResult()
+_backend = JWTAuthentication()
+
+
+def _django_request(request):
+    # DRF Request embrulha a HttpRequest; o cache fica sempre na HttpRequest
+    return getattr(request, "_request", request)
+
+
+def authenticate_jwt(request) -> JWTAuthResult:
+    """Decodifica o Bearer e carrega o User uma vez; chamadas seguintes leem da request."""
+    http_request = _django_request(request)
+    cached = getattr(http_request, REQUEST_ATTR, None)
+    if cached is not None:
+        return cached
+
+    result = _NO_TOKEN
+    header = _backend.get_header(http_request)
+    raw_token = _backend.get_raw_token(header) if header is not None else None
+    if raw_token is not None:
+        try:
+            token = _backend.get_validated_token(raw_token)
+            result = JWTAuthResult(user=_backend.get_user(token), token=token)
+        except Exception as exc:
+            result = JWTAuthResult(error=exc)
+
+    setattr(http_request, REQUEST_ATTR, result)
+    return result
+
+
+class RequestCachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication do DRF reaproveitando o que o middleware já resolveu.
+    Token inválido continua gerando o mesmo 401 do simplejwt.
+    """
+
+    def authenticate(self, request):
+        result = authenticate_jwt(request)
+        if result.error is not None:
+            raise result.error
+        if result.user is None:
+            return None
+        return result.user, result.token
@@ -93,6 +93,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # workers do run_action_jobs escrevem em paralelo: BEGIN IMMEDIATE espera o lock (timeout)
+        # em vez de falhar com "database is locked" ao promover uma transação de leitura
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
     }
 }
 
@@ -159,7 +162,7 @@ else:
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "config.middleware.jwt_auth.RequestCachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
@@ -169,26 +172,61 @@ REST_FRAMEWORK = {
         "rest_framework.throttling.UserRateThrottle",
         "core.throttling.AccountRateThrottle",
     ],
+    # MultiWindowRateThrottle aplica TODAS as janelas abaixo: duração pelo sufixo do escopo,
+    # limite pelo número da rate ('user:5minutes': '450/minute' = 450 requests em 5 minutos).
+    # Uma tela do SPA dispara várias chamadas (lista, contagem, selects, actions).
     "DEFAULT_THROTTLE_RATES": {
  # ---- janelas por USER Limite MENOR ----
-        "user:1minute": "5/minute",
-        "user:5minutes": "25/minute",
-        "user:10minutes": "50/minute",
-        "user:15minutes": "100/minute",
-        "user:30minutes": "200/minute",
-        "user:1hour": "600/hour",
-        "user:1day": "2000/day",
+        "user:1minute": "120/minute",
+        "user:5minutes": "450/minute",
+        "user:10minutes": "800/minute",
+        "user:15minutes": "1100/minute",
+        "user:30minutes": "2000/minute",
+        "user:1hour": "3500/hour",
+        "user:1day": "20000/day",
  # ---- janelas por ACCOUNT Limite MAIOR ----
-        "account:1minute": "100/minute",
-        "account:5minutes": "500/minute",
-        "account:10minutes": "1000/minute",
-        "account:15minutes": "1500/minute",
-        "account:30minutes": "3000/minute",
+        "account:1minute": "600/minute",
+        "account:5minutes": "2500/minute",
+        "account:10minutes": "4500/minute",
+        "account:15minutes": "6000/minute",
+        "account:30minutes": "8000/minute",
         "account:1hour": "10000/hour",
         "account:1day": "60000/day",
     },
 }
 
+# ---- API genérica (ListView) ----
+# Estratégia padrão de contagem quando a query não traz ?count=exact|cached|estimated|none
+API_LIST_COUNT_STRATEGY = env("API_LIST_COUNT_STRATEGY", default="exact")
+API_COUNT_CACHE_TIMEOUT = env.int("API_COUNT_CACHE_TIMEOUT", default=300)
+# Abaixo disso a estimativa do planner é trocada por um count() exato
+API_COUNT_ESTIMATE_THRESHOLD = env.int("API_COUNT_ESTIMATE_THRESHOLD", default=10000)
+# Busca (?search=): "auto" usa FTS5/tsvector nos models com SEARCH_FIELDS; "icontains" desliga o índice
+API_SEARCH_BACKEND = env("API_SEARCH_BACKEND", default="auto")
+# Linhas lidas/serializadas por bloco no /<model>/export
+API_EXPORT_CHUNK_SIZE = env.int("API_EXPORT_CHUNK_SIZE", default=500)
+# Cache de respostas da ListView (segundos; 0 desliga). Invalidado pela versão do model a cada escrita
+API_LIST_CACHE_TIMEOUT = env.int("API_LIST_CACHE_TIMEOUT", default=60)
+# /<model>/bulk_add e bulk_update: máximo de itens por request e tamanho de cada INSERT/UPDATE em lote
+API_BULK_MAX_ITEMS = env.int("API_BULK_MAX_ITEMS", default=1000)
+API_BULK_BATCH_SIZE = env.int("API_BULK_BATCH_SIZE", default=500)
+# bulk_delete: registros por bloco (cada bloco = uma transação com a cascata e o histórico dele)
+API_BULK_DELETE_BATCH_SIZE = env.int("API_BULK_DELETE_BATCH_SIZE", default=200)
+# Jobs de actions (run_action_jobs): intervalo de polling, gravação de progresso e recuperação de worker morto
+ACTION_JOB_POLL_INTERVAL = env.float("ACTION_JOB_POLL_INTERVAL", default=1.0)
+ACTION_JOB_PROGRESS_INTERVAL = env.float("ACTION_JOB_PROGRESS_INTERVAL", default=1.0)
+ACTION_JOB_HEARTBEAT_INTERVAL = env.float("ACTION_JOB_HEARTBEAT_INTERVAL", default=30.0)
+ACTION_JOB_STALE_AFTER = env.int("ACTION_JOB_STALE_AFTER", default=300)
+ACTION_JOB_MAX_ATTEMPTS = env.int("ACTION_JOB_MAX_ATTEMPTS", default=3)
+
+# ---- Cache de permissões por usuário (core.utils.permission_cache) ----
+PERMISSION_CACHE_TIMEOUT = env.int("PERMISSION_CACHE_TIMEOUT", default=3600)
+PERMISSION_CACHE_LOCAL_TTL = env.int("PERMISSION_CACHE_LOCAL_TTL", default=5)
+
+# ---- Cache de Account por slug/id (core.utils.account_cache) ----
+ACCOUNT_CACHE_TIMEOUT = env.int("ACCOUNT_CACHE_TIMEOUT", default=600)
+ACCOUNT_CACHE_LOCAL_TTL = env.int("ACCOUNT_CACHE_LOCAL_TTL", default=5)
+
 
 from datetime import timedelta
 
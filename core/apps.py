@@ -7,4 +7,9 @@ class CoreConfig(AppConfig):
     
     def ready(self):
         from .signals import seed_initial
-        from .signals import enforce_same_account_group
\ No newline at end of file
+        from .signals import enforce_same_account_group
+        from .signals import invalidate_perms_on_user_groups, invalidate_perms_on_group_permissions
+        from .signals import invalidate_account_cache
+
+        from .model_registry import model_registry
+        model_registry.build()
@@ -1,16 +1,11 @@
 # views.py
 from django.http import Http404
-from django.apps import apps
+from .model_registry import model_registry
 
 def get_model_by_name(model_name: str):
-    if "." in model_name:
-        try:
-            return apps.get_model(model_name)
-        except LookupError:
-            raise Http404("Modelo não encontrado.")
-    candidates = [m for m in apps.get_models() if m.__name__.lower() == model_name.lower()]
-    if not candidates:
-        raise Http404("Modelo não encontrado.")
-    if len(candidates) > 1:
+    if "." not in model_name and model_registry.is_ambiguous(model_name):
         raise Http404("Modelo ambíguo. Use app_label.ModelName.")
-    return candidates[0]
\ No newline at end of file
+    model = model_registry.get_model(model_name)
+    if model is None:
+        raise Http404("Modelo não encontrado.")
+    return model
\ No newline at end of file
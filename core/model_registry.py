@@ -0,0 +1,147 @@
+# core/model_registry.py
+"""
+Registro indexado dos models instalados, montado uma vez no CoreConfig.ready().
+
+Substitui as varreduras de `apps.get_models()` a cada chamada (resolver da API,
+permissões, get_model_by_name) por lookups em dicionário:
+- nome simples em minúsculas ("customer") e label ("core.customer") => model
+- metadados por model: FK de tenant, se é o próprio Account, serializer explícito
+
+Models internos declaram `API_EXPOSED = False` e ficam fora do registro: a API
+genérica (/api/<model>/...) e as permissões por nome não os enxergam.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Type
+from django.apps import apps as django_apps
+from django.db.models import ForeignKey, Model
+from django.utils.module_loading import import_string
+
+TENANT_FK_CANDIDATES = ("Account", "account", "tenant", "Tenant")
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    model: Type[Model]
+    name: str                      # "Customer"
+    label: str                     # "core.customer"
+    tenant_fk: Optional[str]       # nome da FK para Account ("Account"/"account"), se houver
+    is_account: bool
+    serializer_class: Optional[type]  # <app_label>.serializers.<Model>Serializer, se existir
+
+
+def _find_account_model() -> Optional[Type[Model]]:
+    for app_label in ("core", "account"):
+        try:
+            return django_apps.get_model(app_label, "Account")
+        except LookupError:
+            continue
+    return None
+
+
+def find_tenant_fk(model_cls: Type[Model], account_model: Optional[Type[Model]] = None) -> Optional[str]:
+    for candidate in TENANT_FK_CANDIDATES:
+        try:
+            field = model_cls._meta.get_field(candidate)
+            if isinstance(field, ForeignKey):
+                return field.name
+        except Exception:
+            pass
+
+    if account_model:
+        for field in model_cls._meta.get_fields():
+            if isinstance(field, ForeignKey) and getattr(field, "remote_field", None):
+                if field.remote_field.model is account_model:
+                    return field.name
+    return None
+
+
+def is_account(model_cls: Type[Model]) -> bool:
+    try:
+        if model_cls.__name__.lower() == "account":
+            return True
+        return str(getattr(model_cls._meta, "label_lower", "")).endswith(".account")
+    except Exception:
+        return False
+
+
+def load_explicit_serializer(model_cls: Type[Model]) -> Optional[type]:
+    """Tenta carregar <app_label>.serializers.<ModelName>Serializer"""
+    path = f"{model_cls._meta.app_label}.serializers.{model_cls.__name__}Serializer"
+    try:
+        return import_string(path)
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._by_name: Dict[str, ModelInfo] = {}
+        self._by_label: Dict[str, ModelInfo] = {}
+        self._by_model: Dict[Type[Model], ModelInfo] = {}
+        self._ambiguous: Set[str] = set()
+        self._built = False
+
+    def build(self) -> None:
+        by_name: Dict[str, ModelInfo] = {}
+        by_label: Dict[str, ModelInfo] = {}
+        by_model: Dict[Type[Model], ModelInfo] = {}
+        ambiguous: Set[str] = set()
+        account_model = _find_account_model()
+
+        for model_cls in django_apps.get_models():
+            if getattr(model_cls, "API_EXPOSED", True) is False:
+                continue
+            info = ModelInfo(
+                model=model_cls,
+                name=model_cls.__name__,
+                label=model_cls._meta.label_lower,
+                tenant_fk=find_tenant_fk(model_cls, account_model),
+                is_account=is_account(model_cls),
+                serializer_class=load_explicit_serializer(model_cls),
+            )
+            key = model_cls.__name__.lower()
+            if key in by_name:
+                # mantém o primeiro (mesma ordem do loop antigo), mas registra a ambiguidade
+                ambiguous.add(key)
+            else:
+                by_name[key] = info
+            by_label[info.label] = info
+            by_model[model_cls] = info
+
+        self._by_name, self._by_label, self._by_model = by_name, by_label, by_model
+        self._ambiguous = ambiguous
+        self._built = True
+
+    def _ensure(self) -> None:
+        if not self._built:
+            self.build()
+
+    def get(self, name: str) -> Optional[ModelInfo]:
+        """'Model' (case-insensitive) ou 'app_label.Model'."""
+        key = (name or "").strip().lower()
+        if not key:
+            return None
+        self._ensure()
+        if "." in key:
+            return self._by_label.get(key)
+        return self._by_name.get(key)
+
+    def get_model(self, name: str) -> Optional[Type[Model]]:
+        info = self.get(name)
+        return info.model if info else None
+
+    def info_for(self, model_cls: Type[Model]) -> Optional[ModelInfo]:
+        self._ensure()
+        return self._by_model.get(model_cls)
+
+    def is_ambiguous(self, name: str) -> bool:
+        self._ensure()
+        return (name or "").strip().lower() in self._ambiguous
+
+    def all(self) -> List[ModelInfo]:
+        self._ensure()
+        return list(self._by_model.values())
+
+
+model_registry = ModelRegistry()
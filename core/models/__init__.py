@@ -5,4 +5,5 @@ from .user import User
 from .customer import Customer, CustomerAddress, CustomerContact
 from .address import Address
 from .contact import Contact, ContactType
-from .files import Files
\ No newline at end of file
+from .files import Files
+from .sequence import CodeSequence
\ No newline at end of file
@@ -47,6 +47,13 @@ class Address(models.Model):
         Account, on_delete=models.CASCADE, related_name="addresses"
     )
 
+    CODE_PREFIX = "ADR"
+
+    SEARCH_FIELDS = [
+        "code", "street", "number", "complement", "district", "city", "state",
+        "postal_code", "reference",
+    ]
+
     class Meta:
         verbose_name = "Address"
         verbose_name_plural = "Addresses"
@@ -57,7 +64,7 @@ class Address(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.code:
-            self.code = generate_unique_code(self, Address, prefix="ADR")
+            self.code = generate_unique_code(self, Address, prefix=self.CODE_PREFIX)
             
         self.updated_at = timezone.now()
         super().save(*args, **kwargs)
@@ -27,6 +27,8 @@ class BusinessType(models.Model):
 
     history = HistoricalRecords()   
 
+    CODE_PREFIX = "BST"
+
     class Meta:
         verbose_name = "Business Type"
         verbose_name_plural = "Business Types"
@@ -41,7 +43,7 @@ class BusinessType(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.code:
-            self.code = generate_unique_code(self, BusinessType, prefix="BST")
+            self.code = generate_unique_code(self, BusinessType, prefix=self.CODE_PREFIX)
 
         self.updated_at = timezone.now()
         super().save(*args, **kwargs)
@@ -86,6 +88,10 @@ class Business(models.Model):
     updated_at = models.DateTimeField(default=timezone.now)
     
     history = HistoricalRecords()   
+
+    CODE_PREFIX = "BUS"
+    SEARCH_FIELDS = ["code", "name", "cnpj"]
+
     class Meta:
         verbose_name = "Business"
         verbose_name_plural = "Businesses"
@@ -97,7 +103,7 @@ class Business(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.code:
-            self.code = generate_unique_code(self, Business, prefix="BUS")
+            self.code = generate_unique_code(self, Business, prefix=self.CODE_PREFIX)
 
         self.updated_at = timezone.now()
         super().save(*args, **kwargs)
@@ -48,8 +48,12 @@ class ContactType(models.Model):
                     {"example": "Exemplo não casa com o regex informado."}
                 )
 
-    def save(self, *args, **kwargs):
+    def prepare_save(self):
+        """Validação antes de gravar (o bulk_add chama direto, já que bulk_create não passa por save())."""
         self.full_clean()
+
+    def save(self, *args, **kwargs):
+        self.prepare_save()
         self.updated_at = timezone.now()
         return super().save(*args, **kwargs)
 
@@ -111,8 +115,12 @@ class Contact(models.Model):
                 {"contact_type": "Tipo de contato pertence a outro Account."}
             )
 
-    def save(self, *args, **kwargs):
+    def prepare_save(self):
+        """Validação antes de gravar (o bulk_add chama direto, já que bulk_create não passa por save())."""
         self.full_clean()
+
+    def save(self, *args, **kwargs):
+        self.prepare_save()
         self.updated_at = timezone.now()
         return super().save(*args, **kwargs)
 
@@ -78,6 +78,12 @@ class Customer(models.Model):
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(default=timezone.now)
 
+    SEARCH_FIELDS = [
+        "full_name", "fantasy_name", "document", "state_registration", "municipal_registration",
+        "primary_email", "primary_phone", "loyalty_code", "notes_erp", "delivery_notes",
+        "unloading_requirements",
+    ]
+
     class Meta:
         verbose_name = "Customer"
         verbose_name_plural = "Customers"
@@ -91,10 +97,14 @@ class Customer(models.Model):
         ]
         ordering = ("full_name",)
 
-    def save(self, *args, **kwargs):
-        self.updated_at = timezone.now()
+    def prepare_save(self):
+        """Normalizações antes de gravar (o bulk_add chama direto, já que bulk_create não passa por save())."""
         if self.document:
             self.document = "".join(filter(str.isalnum, self.document))
+
+    def save(self, *args, **kwargs):
+        self.updated_at = timezone.now()
+        self.prepare_save()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,28 @@
+# account/models_sequence.py
+from django.db import models
+from .account import Account
+
+
+class CodeSequence(models.Model):
+    """
+    Último número usado nos códigos PREFIX-N de um model dentro do Account
+    (ex.: ADR-1, ADR-2...). Avançado com UPDATE atômico por
+    core.utils.generate_unique_code; números não são reaproveitados após exclusões.
+    Interno: fora da API genérica.
+    """
+    API_EXPOSED = False
+
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="code_sequences")
+    model = models.CharField(max_length=100)  # app_label.model_name
+    prefix = models.CharField(max_length=20)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Code Sequence"
+        verbose_name_plural = "Code Sequences"
+        constraints = [
+            models.UniqueConstraint(fields=["account", "model", "prefix"], name="uniq_codesequence_account_model_prefix"),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.prefix}-{self.last_value}"
@@ -1,9 +1,9 @@
 from __future__ import annotations
 from typing import Iterable, Sequence, Dict, Any
-from django.apps import apps
 from django.db.models import QuerySet, Model
 from rest_framework import serializers
 from .export_mixin import ExportAwareSerializerMixin
+from .model_registry import model_registry
 
 # Heurística leve (ajuste conforme precisar)
 SENSITIVE_NAME_PARTS = {"password", "secret", "token", "apikey", "api_key", "salt", "private", "credential"}
@@ -19,14 +19,12 @@ def get_model_by_name(name: str):
     """
     Resolve 'app_label.Model' ou apenas 'Model' (case-insensitive).
     """
-    if "." in name:
-        return apps.get_model(name)
-    cands = [m for m in apps.get_models() if m.__name__.lower() == name.lower()]
-    if not cands:
-        raise LookupError(f"Modelo '{name}' não encontrado.")
-    if len(cands) > 1:
+    if "." not in name and model_registry.is_ambiguous(name):
         raise LookupError(f"Modelo '{name}' é ambíguo. Use app_label.ModelName.")
-    return cands[0]
+    model = model_registry.get_model(name)
+    if model is None:
+        raise LookupError(f"Modelo '{name}' não encontrado.")
+    return model
 
 
 class DynamicSerializerFactory:
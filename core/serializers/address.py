@@ -10,6 +10,10 @@ def _to_float_or_none(v):
         return None
 
 class AddressSerializer(serializers.ModelSerializer):
+    # create() só injeta o tenant e update() é o padrão: bulk_add/bulk_update gravam direto em lote
+    BULK_CREATE = True
+    BULK_UPDATE = True
+
     class Meta:
         model = Address
         fields = [
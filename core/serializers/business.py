@@ -20,6 +20,10 @@ class BusinessTypeMiniSerializer(serializers.ModelSerializer):
 
 
 class BusinessTypeSerializer(serializers.ModelSerializer):
+    # create() só injeta o tenant e update() só atribui campos: bulk_add/bulk_update gravam direto em lote
+    BULK_CREATE = True
+    BULK_UPDATE = True
+
     code = serializers.CharField(read_only=True)
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
@@ -105,6 +109,8 @@ class BusinessSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        # sem prefetch_related de children: pré-carregar traria todos os filhos de
+        # cada registro para mostrar só uma página; get_children consulta a página
         
     def get_children(self, obj: Business):
         """
@@ -159,7 +165,7 @@ class BusinessSerializer(serializers.ModelSerializer):
             except Exception:
                 pass
 
-        qs = obj.children.all().order_by("created_at")[offset : offset + limit]
+        qs = obj.children.select_related("business_type").order_by("created_at")[offset : offset + limit]
         items = BusinessMiniSerializer(qs, many=True, context=self.context).data
 
         return {
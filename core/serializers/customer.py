@@ -43,6 +43,10 @@ class CustomerMiniSerializer(serializers.ModelSerializer):
 
 
 class CustomerSerializer(serializers.ModelSerializer):
+    # bulk_add/bulk_update gravam em lote; itens com vínculos vão pelo create()/update(), que os sincroniza
+    BULK_UPDATE = True
+    BULK_SIDE_EFFECT_KEYS = ("addresses_links", "contacts_links", "addresses", "contacts")
+
     preferred_store     = BusinessMiniSerializer(read_only=True)
     preferred_store_id  = serializers.UUIDField(write_only=True, required=False, allow_null=True)
 
@@ -127,15 +131,12 @@ class CustomerSerializer(serializers.ModelSerializer):
             CustomerContact.objects.bulk_create(bulk)
 
 
-    def create(self, validated):
+    def build_instance(self, validated) -> Customer:
+        """Customer pronto para gravar (sem save()); usado pelo create e pelo bulk_add."""
         self._inject_tenant(validated)
-
-        addresses_payload = self.initial_data.get("addresses_links") or self.initial_data.get("addresses") or []
-        contacts_payload  = self.initial_data.get("contacts_links")  or self.initial_data.get("contacts")  or []
-
         obj = Customer(
             Account                   = validated.get("Account"),
-            customer_type             = validated.get("customer_type"),
+            customer_type             = validated.get("customer_type", Customer._meta.get_field("customer_type").default),
             full_name                 = validated.get("full_name"),
             fantasy_name              = validated.get("fantasy_name"),
             document                  = validated.get("document"),
@@ -143,7 +144,7 @@ class CustomerSerializer(serializers.ModelSerializer):
             municipal_registration    = validated.get("municipal_registration"),
             primary_email             = validated.get("primary_email"),
             primary_phone             = validated.get("primary_phone"),
-            payment_term              = validated.get("payment_term"),
+            payment_term              = validated.get("payment_term", Customer._meta.get_field("payment_term").default),
             credit_limit              = validated.get("credit_limit", 0),
             is_blocked                = validated.get("is_blocked", False),
             notes_erp                 = validated.get("notes_erp"),
@@ -158,6 +159,13 @@ class CustomerSerializer(serializers.ModelSerializer):
             is_active                 = validated.get("is_active", True),
         )
         self._apply_store_fk(obj, validated)
+        return obj
+
+    def create(self, validated):
+        addresses_payload = self.initial_data.get("addresses_links") or self.initial_data.get("addresses") or []
+        contacts_payload  = self.initial_data.get("contacts_links")  or self.initial_data.get("contacts")  or []
+
+        obj = self.build_instance(validated)
         obj.save()
 
         # sincroniza throughs (se vierem)
@@ -1,7 +1,6 @@
 from rest_framework import serializers
-from django.db.models import Q
-from django.contrib.auth.models import Permission
 from core.models import User
+from core.utils.permission_cache import user_codenames
 from .files import FilesMiniSerializer
 
 class UserSerializer(serializers.ModelSerializer):
@@ -35,13 +34,7 @@ class UserSerializer(serializers.ModelSerializer):
         Retorna apenas uma lista de codenames únicos
         vindos dos grupos + permissões diretas.
         """
-        qs = (
-            Permission.objects
-            .filter(Q(group__user=obj) | Q(user=obj))
-            .distinct()
-            .order_by("codename")
-        )
-        return list(qs.values_list("codename", flat=True))
+        return user_codenames(obj)
 
     def create(self, validated_data):
         request = self.context.get("request")
@@ -1,2 +1,9 @@
 from .seed import seed_initial
-from .signals_groups import enforce_same_account_group
\ No newline at end of file
+from .signals_groups import enforce_same_account_group
+from .permission_cache import (
+    invalidate_perms_on_user_groups,
+    invalidate_perms_on_user_permissions,
+    invalidate_perms_on_group_permissions,
+    invalidate_perms_on_group_change,
+)
+from .account_cache import invalidate_account_cache
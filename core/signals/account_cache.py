@@ -0,0 +1,11 @@
+# core/signals/account_cache.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import Account
+from core.utils.account_cache import bump_account_version
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_account_cache(sender, **kwargs):
+    bump_account_version()
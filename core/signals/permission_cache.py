@@ -0,0 +1,51 @@
+# core/signals/permission_cache.py
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from core.models import AccountGroup
+from core.utils.permission_cache import (
+    bump_global_permission_version,
+    bump_user_permission_version,
+)
+
+User = get_user_model()
+
+
+def _bump_users_or_all(instance, reverse, pk_set):
+    """Lado User: invalida o usuário. Lado Group/Permission: os usuários afetados (ou todos, no clear)."""
+    if not reverse:
+        bump_user_permission_version(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            bump_user_permission_version(user_id)
+    else:
+        bump_global_permission_version()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_perms_on_user_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    if action.startswith("post_"):
+        _bump_users_or_all(instance, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_perms_on_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    if action.startswith("post_"):
+        _bump_users_or_all(instance, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_perms_on_group_permissions(sender, action, **kwargs):
+    """Permissões de grupo valem para todos os membros: versão global."""
+    if action.startswith("post_"):
+        bump_global_permission_version()
+
+
+@receiver(post_save, sender=AccountGroup)
+@receiver(post_delete, sender=AccountGroup)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_perms_on_group_change(sender, **kwargs):
+    bump_global_permission_version()
+
@@ -1,5 +1,14 @@
 # core/throttling.py
-from rest_framework.throttling import SimpleRateThrottle, ScopedRateThrottle
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from functools import lru_cache
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle, ScopedRateThrottle
 
 def get_account_slug(request):
     """
@@ -36,3 +45,260 @@ class AccountScopedRateThrottle(ScopedRateThrottle):
         # self.scope vem da view (throttle_scope = "algum:escopo")
         ident = f"acct:{slug}:{self.scope}"
         return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+# ---------------------------------------------------------------------------
+# Throttle multi-janela (sliding log)
+# ---------------------------------------------------------------------------
+
+_WINDOW_RE = re.compile(r"^(\d+)\s*(second|minute|hour|day)s?$")
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# KEYS: uma key base por ident (user/account). ARGV[1] = member desta request; depois
+# quádruplas (índice da key, janela em ms, limite, modo). Modo 0 = sliding log (sorted
+# set na própria key, score = timestamp em ms do relógio do Redis). Modo 1 = sliding
+# window counter: dois contadores inteiros por janela ("<key>:<janela>:<bucket>"),
+# estimativa = anterior * fração restante + atual. Tudo numa execução atômica: só
+# registra a request se todas as janelas passarem. Retorna {permitido, espera_ms}.
+SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local longest = {}
+for i = 2, #ARGV, 4 do
+  local k = tonumber(ARGV[i])
+  local win = tonumber(ARGV[i + 1])
+  if ARGV[i + 3] == '0' and (longest[k] or 0) < win then longest[k] = win end
+end
+for k, win in pairs(longest) do
+  redis.call('ZREMRANGEBYSCORE', KEYS[k], '-inf', now - win)
+end
+local wait = 0
+local incr = {}
+for i = 2, #ARGV, 4 do
+  local k = tonumber(ARGV[i])
+  local win = tonumber(ARGV[i + 1])
+  local limit = tonumber(ARGV[i + 2])
+  local w = 0
+  if ARGV[i + 3] == '0' then
+    local floor = '(' .. (now - win)
+    local count = redis.call('ZCOUNT', KEYS[k], floor, '+inf')
+    if count >= limit then
+      local hit = redis.call('ZRANGEBYSCORE', KEYS[k], floor, '+inf', 'WITHSCORES', 'LIMIT', count - limit, 1)
+      w = tonumber(hit[2]) + win - now
+    end
+  else
+    local bucket = math.floor(now / win)
+    local base = KEYS[k] .. ':' .. win .. ':'
+    local curr = tonumber(redis.call('GET', base .. bucket) or '0')
+    local prev = tonumber(redis.call('GET', base .. (bucket - 1)) or '0')
+    local elapsed = now - bucket * win
+    if prev * (win - elapsed) / win + curr >= limit then
+      if curr >= limit then
+        w = win - elapsed + math.ceil(win * (1 - limit / curr))
+      elseif prev == 0 then
+        w = win - elapsed
+      else
+        w = math.max(1, math.ceil(win * (1 - (limit - curr) / prev) - elapsed))
+      end
+    end
+    table.insert(incr, {base .. bucket, win})
+  end
+  if w > wait then wait = w end
+end
+if wait > 0 then return {0, wait} end
+for k, win in pairs(longest) do
+  redis.call('ZADD', KEYS[k], now, ARGV[1])
+  redis.call('PEXPIRE', KEYS[k], win)
+end
+for _, c in ipairs(incr) do
+  redis.call('INCR', c[1])
+  redis.call('PEXPIRE', c[1], c[2] * 2)
+end
+return {1, 0}
+"""
+
+LOG = 0
+COUNTER = 1
+
+
+def parse_window(scope: str, rate: str):
+    """
+    'account:5minutes' + '500/minute' -> (300, 500).
+    A duração vem do sufixo do escopo; sem sufixo reconhecível, do período da rate (como no DRF).
+    """
+    num, period = rate.split("/")
+    suffix = scope.split(":", 1)[-1]
+    match = _WINDOW_RE.match(suffix)
+    if match:
+        seconds = int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+    else:
+        seconds = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+    return seconds, int(num)
+
+
+@lru_cache(maxsize=32)
+def _windows_by_prefix(rates, prefixes):
+    """{prefixo: [(segundos, limite), ...]} a partir dos itens de DEFAULT_THROTTLE_RATES."""
+    return {
+        prefix: [parse_window(scope, rate) for scope, rate in rates if rate and scope.startswith(f"{prefix}:")]
+        for prefix in prefixes
+    }
+
+
+def counter_wait(prev: float, curr: float, limit: int, window: float, elapsed: float) -> float:
+    """
+    Sliding window counter: estimativa = prev * (window - elapsed) / window + curr.
+    Retorna 0 se cabe mais uma request, senão quanto falta para a estimativa cair abaixo do limite.
+    """
+    if prev * (window - elapsed) / window + curr < limit:
+        return 0.0
+    if curr >= limit:
+        # no próximo bucket este vira o anterior e precisa decair abaixo do limite
+        return window - elapsed + window * (1 - limit / curr)
+    if not prev:
+        return window - elapsed
+    return max(0.001, window * (1 - (limit - curr) / prev) - elapsed)
+
+
+class _LocalSlidingLog:
+    """Fallback em memória do processo (dev/testes, ou Redis fora do ar). Mesma semântica do script."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._logs = {}
+        self._counters = {}
+
+    def hit(self, checks):
+        now = time.time()
+        with self._lock:
+            longest = {}
+            for key, window, _, mode in checks:
+                if mode == LOG:
+                    longest[key] = max(longest.get(key, 0), window)
+            for key, window in longest.items():
+                log = self._logs.get(key, [])
+                self._logs[key] = log[bisect_right(log, now - window):]
+
+            wait = 0.0
+            incr = []
+            for key, window, limit, mode in checks:
+                if mode == LOG:
+                    log = self._logs[key]
+                    in_window = log[bisect_right(log, now - window):]
+                    if len(in_window) >= limit:
+                        wait = max(wait, in_window[len(in_window) - limit] + window - now)
+                    continue
+                bucket = int(now // window)
+                curr = self._counters.get((key, window, bucket), 0)
+                prev = self._counters.get((key, window, bucket - 1), 0)
+                wait = max(wait, counter_wait(prev, curr, limit, window, now - bucket * window))
+                incr.append((key, window, bucket))
+            if wait > 0:
+                return False, wait
+
+            for key in longest:
+                self._logs[key].append(now)
+            for key, window, bucket in incr:
+                self._counters[(key, window, bucket)] = self._counters.get((key, window, bucket), 0) + 1
+                self._counters.pop((key, window, bucket - 2), None)
+            return True, 0.0
+
+    def clear(self):
+        with self._lock:
+            self._logs.clear()
+            self._counters.clear()
+
+
+_local_log = _LocalSlidingLog()
+
+
+class MultiWindowRateThrottle(BaseThrottle):
+    """
+    Aplica, de uma vez, todas as janelas de DEFAULT_THROTTLE_RATES cujos escopos
+    começam com os prefixos de `scope_prefixes` ('user:*' por usuário e 'account:*'
+    por Account). Com Redis é um único EVALSHA atômico (sem a leitura-modifica-escreve
+    de lista do SimpleRateThrottle); com outro backend de cache (locmem em DEBUG) usa
+    um log em memória do processo.
+
+    Janelas de usuário são sliding log exato. As de `counter_prefixes` (Account, key
+    compartilhada por todos os usuários do tenant) usam sliding window counter: dois
+    inteiros por janela em vez de um timestamp por request, com erro limitado à
+    suposição de distribuição uniforme dentro do bucket anterior.
+    """
+
+    scope_prefixes = ("user", "account")
+    counter_prefixes = ("account",)
+    cache_format = "throttle_mw_%(prefix)s_%(ident)s"
+    THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+
+    def __init__(self):
+        self.windows = _windows_by_prefix(tuple((self.THROTTLE_RATES or {}).items()), self.scope_prefixes)
+        self._wait = None
+
+    def get_idents(self, request):
+        user = getattr(request, "user", None)
+        idents = {}
+        if "user" in self.windows:
+            if user is not None and user.is_authenticated:
+                idents["user"] = str(user.pk)
+            else:
+                idents["user"] = f"anon:{self.get_ident(request)}"
+        if "account" in self.windows:
+            slug = get_account_slug(request)
+            if slug:
+                idents["account"] = slug
+        return idents
+
+    def build_checks(self, request):
+        checks = []
+        for prefix, ident in self.get_idents(request).items():
+            key = self.cache_format % {"prefix": prefix, "ident": ident}
+            mode = COUNTER if prefix in self.counter_prefixes else LOG
+            checks.extend((key, seconds, limit, mode) for seconds, limit in self.windows.get(prefix, []))
+        return checks
+
+    def allow_request(self, request, view):
+        checks = self.build_checks(request)
+        if not checks:
+            return True
+        allowed, self._wait = self._hit(checks)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+    def _hit(self, checks):
+        client = _redis_client()
+        if client is None:
+            return _local_log.hit(checks)
+
+        keys = []
+        args = [uuid.uuid4().hex]
+        for key, seconds, limit, mode in checks:
+            full_key = caches["default"].make_key(key)
+            if full_key not in keys:
+                keys.append(full_key)
+            args.extend((keys.index(full_key) + 1, seconds * 1000, limit, mode))
+        try:
+            allowed, wait_ms = _sliding_log_script(client)(keys=keys, args=args, client=client)
+        except Exception:
+            return _local_log.hit(checks)
+        return bool(allowed), (int(wait_ms) / 1000.0 if not allowed else 0.0)
+
+
+_script = None
+
+
+def _sliding_log_script(client):
+    global _script
+    if _script is None:
+        _script = client.register_script(SLIDING_WINDOW_LUA)
+    return _script
+
+
+def _redis_client():
+    """Cliente redis-py do cache 'default', ou None quando o backend não é Redis."""
+    backend = caches["default"]
+    if not isinstance(backend, RedisCache):
+        return None
+    return backend._cache.get_client(write=True)
@@ -0,0 +1,112 @@
+# core/utils/account_cache.py
+"""
+Cache da resolução de Account usada pelo AccountResolverMiddleware, em dois níveis:
+- local (LRU do processo, TTL curto)
+- compartilhado (django cache: Redis em produção, locmem em DEBUG)
+
+Guarda slug -> Account e id -> Account (o id vem de user.Account_id, que já
+chega com o próprio User, então user -> account não precisa de consulta).
+As chaves embutem uma versão global, trocada a cada save/delete de Account:
+renomear slug, desativar ou editar uma conta invalida todos os processos de uma
+vez. Contas inexistentes/inativas também são cacheadas (como "ausente") para
+um slug inválido não ir ao banco a cada request.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = "acct:ver"
+SLUG_KEY = "acct:slug:{slug}:v{version}"
+ID_KEY = "acct:id:{account_id}:v{version}"
+
+_MISSING = "__missing__"
+_LOCAL: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_LOCAL_MAX_ENTRIES = 1024
+
+
+def _local_ttl() -> float:
+    return float(getattr(settings, "ACCOUNT_CACHE_LOCAL_TTL", 5))
+
+
+def _shared_timeout() -> int:
+    return int(getattr(settings, "ACCOUNT_CACHE_TIMEOUT", 600))
+
+
+def bump_account_version() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        if not cache.add(VERSION_KEY, 2, timeout=None):
+            cache.incr(VERSION_KEY)
+    _LOCAL.clear()
+
+
+def _version() -> int:
+    return int(cache.get(VERSION_KEY) or 1)
+
+
+def _local_get(key: str):
+    entry = _LOCAL.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        _LOCAL.pop(key, None)
+        return None
+    _LOCAL.move_to_end(key)
+    return entry[1]
+
+
+def _local_set(key: str, value) -> None:
+    _LOCAL[key] = (time.monotonic() + _local_ttl(), value)
+    _LOCAL.move_to_end(key)
+    while len(_LOCAL) > _LOCAL_MAX_ENTRIES:
+        _LOCAL.popitem(last=False)
+
+
+def _cached_account(key: str, load):
+    value = _local_get(key)
+    if value is None:
+        value = cache.get(key)
+        if value is None:
+            value = load() or _MISSING
+            cache.set(key, value, timeout=_shared_timeout())
+        _local_set(key, value)
+    return None if value == _MISSING else value
+
+
+def _account_model():
+    from core.models import Account
+    return Account
+
+
+def get_account_by_slug(slug) -> Optional[Any]:
+    """Account ativo com esse slug (case-insensitive), ou None."""
+    slug = str(slug or "").strip().lower()
+    if not slug:
+        return None
+    Account = _account_model()
+    key = SLUG_KEY.format(slug=slug, version=_version())
+    return _cached_account(key, lambda: Account.objects.filter(slug=slug, is_active=True).first())
+
+
+def get_account_by_id(account_id) -> Optional[Any]:
+    """Account com esse id (ativo ou não, como o FK do usuário), ou None."""
+    if not account_id:
+        return None
+    Account = _account_model()
+    key = ID_KEY.format(account_id=account_id, version=_version())
+    return _cached_account(key, lambda: Account.objects.filter(pk=account_id).first())
+
+
+def get_user_account(user) -> Optional[Any]:
+    """Account do usuário a partir do FK já carregado (account_id/Account_id), sem tocar no relacionamento."""
+    if not user:
+        return None
+    for fk_id_attr in ("account_id", "Account_id"):
+        account_id = getattr(user, fk_id_attr, None)
+        if account_id:
+            return get_account_by_id(account_id)
+    return None
@@ -1,5 +1,79 @@
 # core/utils.py
-from django.db import transaction
+"""
+Códigos PREFIX-N por Account (ADR-1, BST-2, BUS-3...).
+
+O próximo número vem de uma linha de CodeSequence por (account, model, prefixo),
+avançada com UPDATE ... SET last_value = last_value + n: o UPDATE trava a linha
+até o fim da transação, então inserts concorrentes recebem números distintos sem
+varrer a tabela do model. Na primeira vez a sequência parte do maior N já usado.
+Um bloco de N códigos custa o mesmo que um (reserve_codes, usado no bulk_add).
+"""
+
+import re
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def _tenant_field(model_class) -> str:
+    """Nome do FK do tenant no model ('Account' na maioria, 'account' em Address/Contact)."""
+    account_model = apps.get_model("core", "Account")
+    for f in model_class._meta.concrete_fields:
+        if f.is_relation and f.related_model is account_model:
+            return f.name
+    raise ValueError(f"{model_class.__name__} não tem FK para Account.")
+
+
+def _highest_used(model_class, account_id, prefix: str, tenant_field: str) -> int:
+    """Maior N em códigos PREFIX-N já gravados (ponto de partida de uma sequência nova)."""
+    pattern = re.compile(rf"^{re.escape(prefix)}-(\d+)$")
+    codes = (
+        model_class._base_manager
+        .filter(**{f"{tenant_field}_id": account_id, "code__startswith": f"{prefix}-"})
+        .values_list("code", flat=True)
+    )
+    return max((int(m.group(1)) for m in map(pattern.match, codes) if m), default=0)
+
+
+def _advance(model_class, account_id, prefix: str, count: int, tenant_field: str) -> int:
+    """Avança a sequência em `count` e devolve o primeiro número do bloco."""
+    CodeSequence = apps.get_model("core", "CodeSequence")
+    key = {"account_id": account_id, "model": model_class._meta.label_lower, "prefix": prefix}
+    with transaction.atomic():
+        if not CodeSequence.objects.filter(**key).update(last_value=F("last_value") + count):
+            start = _highest_used(model_class, account_id, prefix, tenant_field)
+            try:
+                with transaction.atomic():
+                    CodeSequence.objects.create(**key, last_value=start + count)
+            except IntegrityError:
+                # outra transação criou a sequência no meio do caminho
+                CodeSequence.objects.filter(**key).update(last_value=F("last_value") + count)
+        last = CodeSequence.objects.filter(**key).values_list("last_value", flat=True).get()
+    return last - count + 1
+
+
+def reserve_codes(model_class, account, count: int, prefix: str = "AA"):
+    """
+    Reserva `count` códigos PREFIX-N consecutivos no Account (instância ou id) com
+    um único avanço da sequência. Números ocupados por códigos digitados à mão são pulados.
+    """
+    if count <= 0:
+        return []
+    account_id = getattr(account, "pk", account)
+    if not account_id:
+        raise ValueError("Instance must have a valid Account.")
+    tenant_field = _tenant_field(model_class)
+    scoped = model_class._base_manager.filter(**{f"{tenant_field}_id": account_id})
+
+    codes = []
+    while len(codes) < count:
+        missing = count - len(codes)
+        first = _advance(model_class, account_id, prefix, missing, tenant_field)
+        candidates = [f"{prefix}-{n}" for n in range(first, first + missing)]
+        taken = set(scoped.filter(code__in=candidates).values_list("code", flat=True))
+        codes.extend(code for code in candidates if code not in taken)
+    return codes
+
 
 def generate_unique_code(instance, model_class, prefix='AA'):
     """
@@ -7,32 +81,10 @@ def generate_unique_code(instance, model_class, prefix='AA'):
     Ex.: BST-1, BST-2, ...
 
     Requisitos:
-      - Modelo deve ter FK 'Account'
+      - Modelo deve ter FK para Account ('Account' ou 'account')
       - Campo de código chama-se 'code'
-      - Unicidade (Account, code) garantida por constraint no DB
     """
-    if not hasattr(instance, 'Account') or not instance.Account:
-        raise ValueError("Instance must have a valid 'Account' attribute.")
-
-    account = instance.Account
-    base = f"{prefix}-"
-
-    with transaction.atomic():
-        try:
-            current = model_class.objects.filter(Account=account).count()
-        except Exception:
-            current = 0
-
-        n = max(1, current + 1)
-
-        while True:
-            code = f"{base}{n}"
-            exists = (
-                model_class.objects
-                .filter(Account=account, code=code)
-                .exclude(id=getattr(instance, 'id', None))
-                .exists()
-            )
-            if not exists:
-                return code
-            n += 1
+    account_id = getattr(instance, f"{_tenant_field(model_class)}_id", None)
+    if not account_id:
+        raise ValueError("Instance must have a valid Account.")
+    return reserve_codes(model_class, account_id, 1, prefix=prefix)[0]
@@ -0,0 +1,107 @@
+# core/utils/permission_cache.py
+"""
+Cache de permissões por usuário, em dois níveis:
+- local (dicionário do processo, TTL curto)
+- compartilhado (django cache: Redis em produção, locmem em DEBUG)
+
+A chave embute duas versões: uma global (muda quando um grupo ganha/perde
+permissões, quando um AccountGroup é salvo/removido) e uma por usuário (muda
+quando os grupos/permissões diretas do usuário mudam). Bump de versão
+invalida todos os processos de uma vez, sem apagar nada. is_active/is_superuser
+não entram no cache: são lidos do próprio user a cada checagem.
+
+O conjunto guardado é o de ModelBackend.get_all_permissions: "app_label.codename".
+"""
+
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+GLOBAL_VERSION_KEY = "perm:ver"
+USER_VERSION_KEY = "perm:ver:user:{user_id}"
+PERMS_KEY = "perm:set:{user_id}:g{global_version}:u{user_version}"
+
+_LOCAL: Dict[str, Tuple[float, FrozenSet[str]]] = {}
+_LOCAL_MAX_ENTRIES = 2048
+
+
+def _local_ttl() -> float:
+    return float(getattr(settings, "PERMISSION_CACHE_LOCAL_TTL", 5))
+
+
+def _shared_timeout() -> int:
+    return int(getattr(settings, "PERMISSION_CACHE_TIMEOUT", 3600))
+
+
+def _bump(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 2, timeout=None):
+            cache.incr(key)
+
+
+def bump_global_permission_version() -> None:
+    _bump(GLOBAL_VERSION_KEY)
+
+
+def bump_user_permission_version(user_id) -> None:
+    _bump(USER_VERSION_KEY.format(user_id=user_id))
+
+
+def _versions(user_id) -> Tuple[int, int]:
+    user_key = USER_VERSION_KEY.format(user_id=user_id)
+    found = cache.get_many([GLOBAL_VERSION_KEY, user_key])
+    return int(found.get(GLOBAL_VERSION_KEY) or 1), int(found.get(user_key) or 1)
+
+
+def _load_permissions(user) -> FrozenSet[str]:
+    from django.contrib.auth.models import Permission
+
+    rows = (
+        Permission.objects
+        .filter(Q(group__user=user) | Q(user=user))
+        .values_list("content_type__app_label", "codename")
+        .distinct()
+    )
+    return frozenset(f"{app_label}.{codename}" for app_label, codename in rows)
+
+
+def get_user_permissions(user) -> FrozenSet[str]:
+    """Permissões (diretas + grupos) do usuário, passando pelos dois níveis de cache."""
+    if not user or not getattr(user, "is_authenticated", False) or user.pk is None:
+        return frozenset()
+
+    global_version, user_version = _versions(user.pk)
+    key = PERMS_KEY.format(user_id=user.pk, global_version=global_version, user_version=user_version)
+
+    now = time.monotonic()
+    local = _LOCAL.get(key)
+    if local is not None and local[0] > now:
+        return local[1]
+
+    perms: Optional[FrozenSet[str]] = cache.get(key)
+    if perms is None:
+        perms = _load_permissions(user)
+        cache.set(key, perms, timeout=_shared_timeout())
+
+    if len(_LOCAL) >= _LOCAL_MAX_ENTRIES:
+        _LOCAL.clear()
+    _LOCAL[key] = (now + _local_ttl(), perms)
+    return perms
+
+
+def user_has_perm(user, perm: str) -> bool:
+    """Mesmas regras do ModelBackend (inativo nega, superuser libera), sem ir ao banco a cada request."""
+    if not user or not getattr(user, "is_active", False):
+        return False
+    if getattr(user, "is_superuser", False):
+        return True
+    return perm in get_user_permissions(user)
+
+
+def user_codenames(user) -> list:
+    """Só os codenames, ordenados (formato de UserSerializer.groups_permissions)."""
+    return sorted({perm.split(".", 1)[1] for perm in get_user_permissions(user)})
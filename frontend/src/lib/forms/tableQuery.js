@@ -63,6 +63,19 @@ export function buildListParams(schema, params) {
     }
   }
 
+  // === CAMPOS (sparse fieldset) ===
+  // Só quando a tabela pede (server.sparseFields: true): a API responde 400 para
+  // nome fora do serializer, e ListFields pode ter colunas calculadas.
+  // server.fields fixa a lista; sem ela vai ListFields (ex.: 'business_type.name' -> 'business_type')
+  if (schema.server?.sparseFields === true) {
+    const source = Array.isArray(schema.server?.fields) ? schema.server.fields : schema.ListFields;
+    const names = (Array.isArray(source) ? source : []).map((f) => String(f).split('.')[0]).filter(Boolean);
+    if (names.length) {
+      const fieldsKey = schema.server?.fieldsParam || 'fields';
+      queryParams[fieldsKey] = [...new Set(names)].join(',');
+    }
+  }
+
   // === FILTROS ===
   if (filters && typeof filters === 'object') {
     const filterParams = buildFilterParams(schema, filters);
@@ -299,6 +312,10 @@ export function calculatePaginationMeta(total, first, rows) {
  *   
  *   searchParam: 'search',
  *   
+ *   sparseFields: true,        // envia ?fields= (desligado por padrão)
+ *   fields: ['full_name', 'document'], // colunas do serializer; padrão: ListFields
+ *   fieldsParam: 'fields',
+ *   
  *   startParam: 'start_date',
  *   endParam: 'end_date',
  *   